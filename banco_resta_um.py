@@ -0,0 +1,413 @@
+#encoding: utf-8
+
+import argparse
+import array
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import enumeracao_resta_um
+import resta_um
+
+if not enumeracao_resta_um.no_numpy:
+    import numpy as np
+
+# Cabeçalho: identificador, versão do formato, número de estados, exigência
+# da peça final, posição alvo (-1 sem alvo) e estado inicial compactado
+MAGICO = b'RESTA1DB'
+VERSAO_FORMATO = 2
+CABECALHO = struct.Struct('<8sIQ?bbQ')
+
+# Depois do cabeçalho vêm um índice com o primeiro estado de cada valor dos
+# BITS_INDICE bits mais altos da chave (uint32), as chaves ordenadas com
+# BYTES_CHAVE bytes cada e um bit de solução por estado, na ordem das chaves
+BYTES_CHAVE = (len(resta_um.COORDS_VALIDAS) + 7) // 8
+BITS_INDICE = 16
+_DESLOCAMENTO_INDICE = len(resta_um.COORDS_VALIDAS) - BITS_INDICE
+_ENTRADA_INDICE = struct.Struct('<2I')
+
+
+def enumerar_estados(jogo, progresso=None):
+    """Enumera todas as posições alcançáveis a partir do estado atual do jogo
+    e calcula quais ainda têm solução.
+
+    As posições são guardadas pela forma canônica sob as simetrias do jogo,
+    uma camada por número de peças.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro na posição inicial da enumeração
+
+    Keyword Arguments:
+        progresso {function} -- chamada com (fase, número de peças, estados da
+        camada) a cada camada (default: {None})
+
+    Returns:
+        dict -- estado canônico -> True se tem solução, False caso contrário
+    """
+    chave = resta_um.TabelaTransposicao(resta_um.simetrias_do_jogo(jogo)).chave
+    saltos = [(salto.mascara, salto.origem_saltada) for salto in resta_um.SALTOS]
+    if jogo.peca_final_no_buraco_inicial:
+        final = resta_um.BITS[tuple(jogo.pos_inicial)]
+        solucionado = lambda bits: bits == final
+    else:
+        solucionado = lambda bits: bits & (bits - 1) == 0
+
+    # camadas em ordem decrescente de peças
+    camadas = [{chave(jogo.compactar())}]
+    while camadas[-1]:
+        proxima = set()
+        for bits in camadas[-1]:
+            for mascara, origem_saltada in saltos:
+                if bits & mascara == origem_saltada:
+                    proxima.add(chave(bits ^ mascara))
+        if progresso:
+            progresso('enumeracao', bin(next(iter(camadas[-1]))).count('1'), len(camadas[-1]))
+        camadas.append(proxima)
+    camadas.pop()
+
+    resultado = {}
+    vencedores = set()
+    for camada in reversed(camadas):
+        vencedores_camada = set()
+        for bits in camada:
+            vence = solucionado(bits)
+            if not vence:
+                for mascara, origem_saltada in saltos:
+                    if bits & mascara == origem_saltada and chave(bits ^ mascara) in vencedores:
+                        vence = True
+                        break
+            if vence:
+                vencedores_camada.add(bits)
+            resultado[bits] = vence
+        if progresso:
+            progresso('solucao', bin(next(iter(camada))).count('1'), len(camada))
+        vencedores = vencedores_camada
+    return resultado
+
+
+def construir_banco(jogo, caminho: str, progresso=None, vetorizado=None):
+    """Enumera as posições alcançáveis a partir do jogo e grava o arquivo do banco.
+
+    O arquivo guarda as chaves canônicas ordenadas, com BYTES_CHAVE bytes
+    cada, e um bit de solução por estado: cerca de 5,1 bytes por estado. A
+    consulta faz uma busca binária só entre as chaves com os mesmos bits
+    altos, localizadas pelo índice do início do arquivo. O conteúdo só
+    depende dos estados, então os dois caminhos de construção gravam
+    arquivos idênticos.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro na posição inicial da enumeração
+        caminho {str} -- arquivo a ser gravado
+
+    Keyword Arguments:
+        progresso {function} -- ver enumerar_estados (default: {None})
+        vetorizado {bool} -- usar enumeracao_resta_um; None usa sempre que o
+        NumPy estiver disponível (default: {None})
+
+    Returns:
+        int -- número de estados gravados
+    """
+    if vetorizado is None:
+        vetorizado = not enumeracao_resta_um.no_numpy
+    if vetorizado:
+        indice, chaves, vitorias, total = _conteudo_vetorizado(jogo, progresso)
+    else:
+        indice, chaves, vitorias, total = _conteudo(jogo, progresso)
+
+    alvo = tuple(jogo.pos_inicial) if jogo.peca_final_no_buraco_inicial else (-1, -1)
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO_FORMATO, total, jogo.peca_final_no_buraco_inicial,
+                                     *alvo, jogo.compactar()))
+        arquivo.write(indice)
+        arquivo.write(chaves)
+        arquivo.write(vitorias)
+    return total
+
+
+def _conteudo(jogo, progresso=None):
+    """Monta as seções do arquivo com a enumeração em Python puro.
+
+    Returns:
+        tuple -- (índice, chaves, bits de solução) em bytes e número de estados
+    """
+    estados = enumerar_estados(jogo, progresso)
+    chaves = sorted(estados)
+
+    indice = array.array('I', bytes(4 * ((1 << BITS_INDICE) + 1)))
+    for chave in chaves:
+        indice[(chave >> _DESLOCAMENTO_INDICE) + 1] += 1
+    for grupo in range(1 << BITS_INDICE):
+        indice[grupo + 1] += indice[grupo]
+    if sys.byteorder != 'little':
+        indice.byteswap()
+
+    vitorias = bytearray((len(chaves) + 7) // 8)
+    for posicao, chave in enumerate(chaves):
+        if estados[chave]:
+            vitorias[posicao >> 3] |= 1 << (posicao & 7)
+    return (indice.tobytes(), b''.join(chave.to_bytes(BYTES_CHAVE, 'little') for chave in chaves),
+            bytes(vitorias), len(chaves))
+
+
+def _conteudo_vetorizado(jogo, progresso=None):
+    """Monta as seções do arquivo com a enumeração vetorizada.
+
+    Returns:
+        tuple -- (índice, chaves, bits de solução) em bytes e número de estados
+    """
+    camadas = enumeracao_resta_um.enumerar_camadas(jogo, progresso=progresso)
+    solucionaveis = enumeracao_resta_um.calcular_solucionaveis(jogo, camadas, progresso=progresso)
+    chaves = np.concatenate([np.asarray(camada) for camada in camadas])
+    vitorias = np.concatenate(solucionaveis)
+    ordem = np.argsort(chaves, kind='stable')
+    chaves, vitorias = chaves[ordem], vitorias[ordem]
+
+    grupos = np.arange((1 << BITS_INDICE) + 1, dtype=np.uint64) << np.uint64(_DESLOCAMENTO_INDICE)
+    indice = np.searchsorted(chaves, grupos).astype('<u4')
+    bytes_chaves = chaves.astype('<u8').view(np.uint8).reshape(-1, 8)[:, :BYTES_CHAVE]
+    return (indice.tobytes(), bytes_chaves.tobytes(), np.packbits(vitorias, bitorder='little').tobytes(),
+            len(chaves))
+
+
+class BancoSolucoes:
+    """
+    Banco de posições com solução, lido de um arquivo mapeado em memória.
+
+    Cada consulta calcula a forma canônica do tabuleiro e lê poucas chaves
+    do arquivo, sem busca no jogo e sem carregar o arquivo inteiro na memória.
+    """
+    def __init__(self, caminho: str):
+        """Abre o arquivo do banco.
+
+        Arguments:
+            caminho {str} -- arquivo gravado por construir_banco
+
+        Raises:
+            ValueError -- se o arquivo não for um banco válido
+        """
+        self.caminho = caminho
+        with open(caminho, 'rb') as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mapa) < CABECALHO.size:
+            self._mapa.close()
+            raise ValueError(f"Arquivo de banco inválido: {caminho}")
+        magico, versao, self.estados, self.peca_final_no_buraco_inicial, \
+            linha, coluna, self.estado_inicial = CABECALHO.unpack_from(self._mapa)
+        self._inicio_chaves = CABECALHO.size + 4 * ((1 << BITS_INDICE) + 1)
+        self._inicio_vitorias = self._inicio_chaves + BYTES_CHAVE * self.estados
+        if magico != MAGICO or versao != VERSAO_FORMATO \
+                or len(self._mapa) != self._inicio_vitorias + (self.estados + 7) // 8:
+            self._mapa.close()
+            raise ValueError(f"Arquivo de banco inválido: {caminho}")
+
+        self.alvo = (linha, coluna) if self.peca_final_no_buraco_inicial else None
+        jogo = resta_um.TabuleiroBits(self.alvo, self.peca_final_no_buraco_inicial, self.estado_inicial)
+        self._chave = resta_um.TabelaTransposicao(resta_um.simetrias_do_jogo(jogo)).chave
+
+    def __repr__(self):
+        return f"BancoSolucoes({self.caminho!r}, {self.estados} estados)"
+
+    def fechar(self):
+        """Libera o mapeamento do arquivo."""
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def chave(self, indice: int):
+        """Retorna o estado canônico guardado em uma posição do arquivo.
+
+        Arguments:
+            indice {int} -- posição entre 0 e estados - 1, na ordem das chaves
+
+        Returns:
+            int -- estado canônico
+        """
+        inicio = self._inicio_chaves + BYTES_CHAVE * indice
+        return int.from_bytes(self._mapa[inicio:inicio + BYTES_CHAVE], 'little')
+
+    def vence(self, indice: int):
+        """Retorna se o estado de uma posição do arquivo tem solução.
+
+        Arguments:
+            indice {int} -- posição entre 0 e estados - 1, na ordem das chaves
+
+        Returns:
+            bool -- True se o estado tem solução
+        """
+        return bool(self._mapa[self._inicio_vitorias + (indice >> 3)] >> (indice & 7) & 1)
+
+    def consultar(self, bits: int):
+        """Consulta se um tabuleiro compactado tem solução.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            bool -- True se tem solução, False se não tem, None se a posição
+            não é alcançável a partir do estado inicial do banco
+        """
+        chave = self._chave(bits)
+        inicio, fim = _ENTRADA_INDICE.unpack_from(self._mapa, CABECALHO.size + 4 * (chave >> _DESLOCAMENTO_INDICE))
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            chave_meio = self.chave(meio)
+            if chave_meio < chave:
+                inicio = meio + 1
+            elif chave_meio > chave:
+                fim = meio
+            else:
+                return self.vence(meio)
+        return None
+
+    def estados_guardados(self):
+        """Percorre todos os estados do banco.
+
+        Returns:
+            generator -- pares (estado canônico, tem solução), em ordem crescente
+        """
+        for indice in range(self.estados):
+            yield self.chave(indice), self.vence(indice)
+
+    def compativel(self, jogo):
+        """Verifica se o banco foi construído para o mesmo objetivo do jogo.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Returns:
+            bool -- True se a exigência e a posição alvo são as mesmas
+        """
+        if jogo.peca_final_no_buraco_inicial != self.peca_final_no_buraco_inicial:
+            return False
+        return not self.peca_final_no_buraco_inicial or tuple(jogo.pos_inicial) == self.alvo
+
+
+def verificar_banco(banco: BancoSolucoes, amostras=100, semente=None, recursivo=True, **opcoes):
+    """Compara o banco com buscas novas do SolucionadorResta1.
+
+    Arguments:
+        banco {BancoSolucoes} -- banco a verificar
+
+    Keyword Arguments:
+        amostras {int} -- número de estados sorteados do banco, além do
+        estado inicial; None verifica todos (default: {100})
+        semente {int} -- semente do sorteio (default: {None})
+        recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+        opcoes -- argumentos de resta_um.SolucionadorResta1
+
+    Returns:
+        list -- (estado, valor no banco, valor da busca) de cada divergência
+    """
+    if amostras is None or amostras >= banco.estados:
+        indices = range(banco.estados)
+    else:
+        indices = random.Random(semente).sample(range(banco.estados), amostras)
+    estados = [(banco.chave(indice), banco.vence(indice)) for indice in indices]
+    estados.append((banco.estado_inicial, banco.consultar(banco.estado_inicial)))
+
+    divergencias = []
+    for estado, esperado in estados:
+        jogo = resta_um.TabuleiroBits(banco.alvo, banco.peca_final_no_buraco_inicial, estado)
+        obtido = resta_um.SolucionadorResta1(jogo, **opcoes).solucionar(recursivo)
+        if obtido != esperado:
+            divergencias.append((estado, esperado, obtido))
+    return divergencias
+
+
+def comparar_construcoes(jogo, diretorio: str):
+    """Constrói o banco pelos dois caminhos, em Python puro e com NumPy, e
+    verifica se os arquivos são idênticos.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro na posição inicial da enumeração
+        diretorio {str} -- diretório onde os dois arquivos são gravados
+
+    Returns:
+        bool -- True se os arquivos são idênticos
+    """
+    caminhos = [os.path.join(diretorio, nome) for nome in ('banco_python.bin', 'banco_numpy.bin')]
+    for caminho, vetorizado in zip(caminhos, (False, True)):
+        construir_banco(jogo, caminho, vetorizado=vetorizado)
+    with open(caminhos[0], 'rb') as python, open(caminhos[1], 'rb') as numpy:
+        return python.read() == numpy.read()
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Banco de posições com solução do resta 1')
+    comandos = parser_argumentos.add_subparsers(dest='comando', required=True)
+
+    construir = comandos.add_parser('construir', help='Enumera as posições alcançáveis e grava o banco')
+    construir.add_argument('arquivo', help='Arquivo do banco')
+    construir.add_argument('--posicao', '-p', nargs=2, default=[3, 3], type=int,
+                           help='Posição inicial na forma linha coluna')
+    construir.add_argument('--exigente', '-e', action='store_true',
+                           help='Exige que a última peça termine na posição do buraco inicial')
+    construir.add_argument('--estado', default=None,
+                           help='Começar de uma posição qualquer (33 caracteres 0/1 na ordem de COORDS_VALIDAS)')
+    construir.add_argument('--alvo', nargs=2, default=None, type=int,
+                           help='Posição onde a última peça deve terminar, com --estado')
+
+    comparar = comandos.add_parser('comparar',
+                                   help='Confere se as construções em Python puro e com NumPy gravam o mesmo arquivo')
+    comparar.add_argument('--estado', default='001100000010000101001111111111111',
+                          help='Posição do jogo de onde as construções partem (pequena, o caminho em Python é lento)')
+    comparar.add_argument('--alvo', nargs=2, default=[3, 3], type=int,
+                          help='Posição onde a última peça deve terminar')
+
+    verificar = comandos.add_parser('verificar', help='Compara o banco com buscas do solucionador')
+    verificar.add_argument('arquivo', help='Arquivo do banco')
+    verificar.add_argument('--amostras', type=int, default=100,
+                           help='Número de estados sorteados do banco (0 verifica todos)')
+    verificar.add_argument('--semente', type=int, default=None, help='Semente do sorteio')
+
+    return parser_argumentos
+
+
+if __name__ == "__main__":
+    argumentos = setup_parser_argumentos().parse_args()
+
+    if argumentos.comando == 'construir':
+        if argumentos.estado is not None:
+            jogo = resta_um.TabuleiroBits.de_estado(argumentos.estado, argumentos.alvo)
+        else:
+            if tuple(argumentos.posicao) not in resta_um.COORDS_VALIDAS:
+                print("Posição inicial inválida")
+                sys.exit(1)
+            jogo = resta_um.TabuleiroBits(tuple(argumentos.posicao), argumentos.exigente)
+
+        def exibir_progresso(fase, pecas, estados):
+            print(f"{fase}: {pecas} peças, {estados} estados", flush=True)
+
+        tempo_inicio = time.time()
+        total = construir_banco(jogo, argumentos.arquivo, exibir_progresso)
+        print(f"{total} estados gravados em {argumentos.arquivo} "
+              f"({os.path.getsize(argumentos.arquivo)} bytes, {time.time() - tempo_inicio:.1f} segundos)")
+    elif argumentos.comando == 'comparar':
+        if enumeracao_resta_um.no_numpy:
+            print("A comparação precisa do módulo NumPy")
+            sys.exit(1)
+        jogo = resta_um.TabuleiroBits.de_estado(argumentos.estado, argumentos.alvo)
+        with tempfile.TemporaryDirectory() as diretorio:
+            if not comparar_construcoes(jogo, diretorio):
+                print("As construções em Python puro e com NumPy gravaram arquivos diferentes.")
+                sys.exit(1)
+        print("As construções em Python puro e com NumPy gravaram arquivos idênticos.")
+    else:
+        with BancoSolucoes(argumentos.arquivo) as banco:
+            print(banco)
+            divergencias = verificar_banco(banco, argumentos.amostras or None, argumentos.semente,
+                                           transposicao=True)
+            for estado, esperado, obtido in divergencias:
+                print(f"Divergência no estado {estado}: banco {esperado}, solucionador {obtido}")
+            if divergencias:
+                sys.exit(1)
+            print("Banco verificado sem divergências.")
@@ -0,0 +1,251 @@
+#encoding: utf-8
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import tracemalloc
+
+import lote_resta_um
+import resta_um
+
+MODOS = ('recursivo', 'iterativo')
+TABULEIROS = {'lista': resta_um.Tabuleiro, 'bits': resta_um.TabuleiroBits}
+
+# nós por execução: a maior parte das posições iniciais leva minutos para
+# terminar, então cada caso mede um prefixo fixo da busca
+MAX_NOS_PADRAO = 20000
+
+# aumento relativo tolerado por comparar antes de apontar uma regressão
+LIMITE_PADRAO = 0.10
+
+
+def percentil(valores, percentual: float):
+    """Retorna o percentil pelo método do posto mais próximo.
+
+    Arguments:
+        valores {list} -- amostras
+        percentual {float} -- de 0 a 100
+
+    Returns:
+        float -- menor amostra com ao menos percentual % das amostras menores
+        ou iguais a ela
+    """
+    ordenados = sorted(valores)
+    posto = max(1, -(-len(ordenados) * percentual // 100))
+    return ordenados[int(posto) - 1]
+
+
+def casos(todas_posicoes=False, modos=MODOS, tabuleiros=tuple(TABULEIROS)):
+    """Gera os casos do benchmark.
+
+    Keyword Arguments:
+        todas_posicoes {bool} -- medir todas as posições de COORDS_VALIDAS em
+        vez de só uma por classe de simetria (default: {False})
+        modos {tuple} -- nomes em MODOS (default: {MODOS})
+        tabuleiros {tuple} -- nomes em TABULEIROS (default: {todos})
+
+    Returns:
+        list -- dicts com nome, modo, tabuleiro, posicao e exigente
+    """
+    posicoes = resta_um.COORDS_VALIDAS
+    if not todas_posicoes:
+        posicoes = sorted({lote_resta_um.representante(posicao)[0] for posicao in posicoes})
+    return [{'nome': f"{modo}/{tabuleiro}/{linha},{coluna}/{'exigente' if exigente else 'livre'}",
+             'modo': modo, 'tabuleiro': tabuleiro, 'posicao': [linha, coluna], 'exigente': exigente}
+            for modo in modos for tabuleiro in tabuleiros
+            for linha, coluna in posicoes for exigente in (False, True)]
+
+
+def _executar(caso: dict, max_nos: int):
+    jogo = TABULEIROS[caso['tabuleiro']](tuple(caso['posicao']), caso['exigente'])
+    solver = resta_um.SolucionadorResta1(jogo)
+    gc.collect()
+    solver.solucionar(caso['modo'] == 'recursivo', max_nos=max_nos)
+    return solver
+
+
+def medir_caso(caso: dict, max_nos=MAX_NOS_PADRAO, aquecimento=1, repeticoes=5):
+    """Mede um caso do benchmark.
+
+    O pico de memória é medido em uma execução a mais, com tracemalloc, que
+    fica fora dos tempos por deixar a busca bem mais lenta.
+
+    Arguments:
+        caso {dict} -- caso gerado por casos()
+
+    Keyword Arguments:
+        max_nos {int} -- nós por execução (default: {MAX_NOS_PADRAO})
+        aquecimento {int} -- execuções descartadas antes das medidas (default: {1})
+        repeticoes {int} -- execuções medidas (default: {5})
+
+    Returns:
+        dict -- o caso com situacao, nos, tempos, mediana, p95,
+        nos_por_segundo e pico_memoria (bytes)
+    """
+    for _ in range(aquecimento):
+        _executar(caso, max_nos)
+    tempos = []
+    for _ in range(repeticoes):
+        solver = _executar(caso, max_nos)
+        tempos.append(solver.tempo)
+
+    tracemalloc.start()
+    try:
+        _executar(caso, max_nos)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    mediana = statistics.median(tempos)
+    return dict(caso, situacao=solver.situacao, nos=solver.total_de_movimentos, tempos=tempos,
+                mediana=mediana, p95=percentil(tempos, 95),
+                nos_por_segundo=solver.total_de_movimentos / mediana if mediana else None,
+                pico_memoria=pico)
+
+
+def medir(lista_casos, max_nos=MAX_NOS_PADRAO, aquecimento=1, repeticoes=5, progresso=None):
+    """Mede vários casos.
+
+    Arguments:
+        lista_casos {list} -- casos gerados por casos()
+
+    Keyword Arguments:
+        max_nos {int} -- nós por execução (default: {MAX_NOS_PADRAO})
+        aquecimento {int} -- execuções descartadas por caso (default: {1})
+        repeticoes {int} -- execuções medidas por caso (default: {5})
+        progresso {function} -- chamada com o resultado de cada caso (default: {None})
+
+    Returns:
+        dict -- ambiente, parâmetros e resultados, pronto para JSON
+    """
+    resultados = []
+    for caso in lista_casos:
+        resultado = medir_caso(caso, max_nos, aquecimento, repeticoes)
+        resultados.append(resultado)
+        if progresso is not None:
+            progresso(resultado)
+    return {'versao_solucionador': resta_um.VERSAO_SOLUCIONADOR,
+            'python': platform.python_version(), 'plataforma': platform.platform(),
+            'max_nos': max_nos, 'aquecimento': aquecimento, 'repeticoes': repeticoes,
+            'casos': resultados}
+
+
+def comparar(base: dict, atual: dict, limite=LIMITE_PADRAO):
+    """Compara duas medições caso a caso.
+
+    A mediana e o pico de memória regridem quando crescem mais que limite em
+    relação à base. Um número de nós diferente não é regressão, mas indica
+    que a busca mudou e que os tempos não são comparáveis.
+
+    Arguments:
+        base {dict} -- medição de referência, de medir()
+        atual {dict} -- medição nova, de medir()
+
+    Keyword Arguments:
+        limite {float} -- aumento relativo tolerado (default: {LIMITE_PADRAO})
+
+    Returns:
+        list -- (nome, métrica, valor base, valor atual) de cada diferença;
+        métrica é 'mediana' ou 'pico_memoria' para regressões e 'nos' para
+        buscas diferentes
+    """
+    casos_base = {caso['nome']: caso for caso in base['casos']}
+    diferencas = []
+    for caso in atual['casos']:
+        anterior = casos_base.get(caso['nome'])
+        if anterior is None:
+            continue
+        if caso['nos'] != anterior['nos']:
+            diferencas.append((caso['nome'], 'nos', anterior['nos'], caso['nos']))
+        for metrica in ('mediana', 'pico_memoria'):
+            if caso[metrica] > anterior[metrica] * (1 + limite):
+                diferencas.append((caso['nome'], metrica, anterior[metrica], caso[metrica]))
+    return diferencas
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Benchmark do solucionador do resta 1')
+    comandos = parser_argumentos.add_subparsers(dest='comando', required=True)
+
+    medicao = comandos.add_parser('medir', help='Mede os casos e grava os resultados em JSON')
+    medicao.add_argument('arquivo', help='Arquivo JSON dos resultados')
+    medicao.add_argument('--max-nos', type=int, default=MAX_NOS_PADRAO,
+                         help='Nós por execução de cada caso')
+    medicao.add_argument('--aquecimento', type=int, default=1, help='Execuções descartadas por caso')
+    medicao.add_argument('--repeticoes', type=int, default=5, help='Execuções medidas por caso')
+    medicao.add_argument('--todas-posicoes', action='store_true',
+                         help='Medir todas as posições iniciais, não só uma por classe de simetria')
+    medicao.add_argument('--modos', nargs='+', choices=MODOS, default=list(MODOS),
+                         help='Algoritmos medidos')
+    medicao.add_argument('--tabuleiros', nargs='+', choices=list(TABULEIROS), default=list(TABULEIROS),
+                         help='Implementações do tabuleiro medidas')
+    medicao.add_argument('--comparar', default=None, metavar='BASE',
+                         help='Comparar com os resultados em BASE ao final')
+    medicao.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                         help='Aumento relativo tolerado na comparação')
+
+    comparacao = comandos.add_parser('comparar', help='Compara dois arquivos de resultados')
+    comparacao.add_argument('base', help='Resultados de referência')
+    comparacao.add_argument('atual', help='Resultados novos')
+    comparacao.add_argument('--limite', type=float, default=LIMITE_PADRAO,
+                            help='Aumento relativo tolerado')
+
+    return parser_argumentos
+
+
+def exibir_comparacao(base: dict, atual: dict, limite: float):
+    """Mostra as diferenças entre duas medições.
+
+    Arguments:
+        base {dict} -- medição de referência, de medir()
+        atual {dict} -- medição nova, de medir()
+        limite {float} -- aumento relativo tolerado
+
+    Returns:
+        bool -- True se houve regressão
+    """
+    regressao = False
+    for nome, metrica, anterior, valor in comparar(base, atual, limite):
+        if metrica == 'nos':
+            print(f"{nome}: número de nós mudou de {anterior} para {valor}")
+        else:
+            regressao = True
+            print(f"{nome}: regressão em {metrica}, de {anterior:.6g} para {valor:.6g} "
+                  f"(+{(valor / anterior - 1) * 100:.1f}%)")
+    if not regressao:
+        print(f"Nenhuma regressão acima de {limite * 100:.0f}%.")
+    return regressao
+
+
+if __name__ == "__main__":
+    argumentos = setup_parser_argumentos().parse_args()
+
+    if argumentos.comando == 'medir':
+        def exibir_progresso(resultado):
+            print(f"{resultado['nome']}: mediana {resultado['mediana'] * 1000:.1f} ms, "
+                  f"p95 {resultado['p95'] * 1000:.1f} ms, {resultado['nos']} nós "
+                  f"({resultado['nos_por_segundo']:.0f}/s), pico {resultado['pico_memoria'] / 1024:.0f} KiB",
+                  flush=True)
+
+        lista_casos = casos(argumentos.todas_posicoes, argumentos.modos, argumentos.tabuleiros)
+        resultados = medir(lista_casos, argumentos.max_nos, argumentos.aquecimento, argumentos.repeticoes,
+                           exibir_progresso)
+        with open(argumentos.arquivo, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2)
+        print(f"{len(lista_casos)} casos gravados em {argumentos.arquivo}")
+        if argumentos.comparar is not None:
+            with open(argumentos.comparar, encoding='utf-8') as arquivo:
+                base = json.load(arquivo)
+            if exibir_comparacao(base, resultados, argumentos.limite):
+                sys.exit(1)
+    else:
+        with open(argumentos.base, encoding='utf-8') as arquivo:
+            base = json.load(arquivo)
+        with open(argumentos.atual, encoding='utf-8') as arquivo:
+            atual = json.load(arquivo)
+        if exibir_comparacao(base, atual, argumentos.limite):
+            sys.exit(1)
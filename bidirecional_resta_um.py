@@ -0,0 +1,148 @@
+#encoding: utf-8
+
+import time
+
+import enumeracao_resta_um
+import resta_um
+
+if not enumeracao_resta_um.no_numpy:
+    import numpy as np
+
+
+def _contem(camada, chave: int):
+    """Verifica se um estado canônico está em uma camada ordenada.
+
+    Arguments:
+        camada {numpy.ndarray} -- estados canônicos ordenados (uint64)
+        chave {int} -- forma canônica do estado
+
+    Returns:
+        bool -- True se o estado está na camada
+    """
+    posicao = int(np.searchsorted(camada, np.uint64(chave)))
+    return posicao < len(camada) and int(camada[posicao]) == chave
+
+
+class SolucionadorBidirecional:
+    """
+    Solucionador que encontra a solução pelo meio.
+
+    Cresce em largura uma fronteira a partir do estado inicial, realizando
+    saltos, e outra a partir das posições finais possíveis, desfazendo saltos,
+    ambas camada a camada com enumeracao_resta_um e guardadas pela forma
+    canônica das simetrias do jogo. Um estado comum às duas fronteiras liga o
+    início ao fim, e os movimentos das duas metades são refeitos no jogo.
+
+    Como a fronteira reversa contém todos os estados que alcançam o objetivo
+    no número de saltos restantes, fronteiras sem estado comum provam que o
+    jogo não tem solução.
+    """
+    def __init__(self, jogo, profundidade_reversa=None, bloco=enumeracao_resta_um.BLOCO_PADRAO):
+        """Inicializa o solucionador para o jogo.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Keyword Arguments:
+            profundidade_reversa {int} -- número de saltos desfeitos a partir
+            das posições finais; None expande sempre a fronteira com menos
+            estados, o que em geral leva as duas a cerca de metade dos saltos
+            (default: {None})
+            bloco {int} -- ver enumeracao_resta_um.expandir_camada
+            (default: {enumeracao_resta_um.BLOCO_PADRAO})
+        """
+        self.jogo = jogo
+        self.profundidade_reversa = profundidade_reversa
+        self.bloco = bloco
+        self.total_de_movimentos = 0
+        self.tempo = 0
+        self.podas = []
+        # número de estados de cada camada das duas fronteiras, da mais rasa à mais funda
+        self.camadas_diretas = []
+        self.camadas_reversas = []
+
+    def solucionar(self):
+        """Soluciona o jogo se possível, a partir do seu estado inicial.
+
+        Raises:
+            ModuleNotFoundError -- se o NumPy não estiver disponível
+
+        Returns:
+            bool -- Retorna True se encontrar uma solução, False caso contrário.
+        """
+        if enumeracao_resta_um.no_numpy:
+            raise ModuleNotFoundError("O solucionador bidirecional precisa do módulo NumPy")
+        jogo = self.jogo
+        jogo.reset()
+        tempo_inicio = time.time()
+        simetrias = resta_um.simetrias_do_jogo(jogo)
+        tabelas = enumeracao_resta_um.tabelas_simetrias(simetrias)
+        chave = resta_um.TabelaTransposicao(simetrias).chave
+
+        inicio = jogo.compactar()
+        saltos_restantes = bin(inicio).count('1') - 1
+        finais = [resta_um.BITS[posicao] for posicao in resta_um.posicoes_finais_possiveis(jogo)]
+        diretas = [np.array([chave(inicio)], dtype=np.uint64)]
+        reversas = [np.unique(np.array([chave(final) for final in finais], dtype=np.uint64))]
+
+        profundidade_reversa = self.profundidade_reversa
+        if profundidade_reversa is not None:
+            profundidade_reversa = min(profundidade_reversa, saltos_restantes)
+        while len(diretas) + len(reversas) - 2 < saltos_restantes and len(diretas[-1]) and len(reversas[-1]):
+            if profundidade_reversa is None:
+                reverso = len(reversas[-1]) < len(diretas[-1])
+            else:
+                reverso = len(reversas) - 1 < profundidade_reversa
+            fronteira = reversas if reverso else diretas
+            fronteira.append(enumeracao_resta_um.expandir_camada(fronteira[-1], tabelas, self.bloco,
+                                                                 reverso=reverso))
+
+        self.camadas_diretas = [len(camada) for camada in diretas]
+        self.camadas_reversas = [len(camada) for camada in reversas]
+        self.total_de_movimentos = sum(self.camadas_diretas) + sum(self.camadas_reversas)
+        comuns = np.intersect1d(diretas[-1], reversas[-1])
+        tem_solucao = bool(len(comuns))
+        if tem_solucao:
+            self._refazer(int(comuns[0]), diretas, reversas, chave)
+        self.tempo = time.time() - tempo_inicio
+        return tem_solucao
+
+    def _refazer(self, meio: int, diretas, reversas, chave):
+        """Realiza no jogo os movimentos do início até o estado comum e dele
+        até o fim.
+
+        Cada metade é refeita saltando sempre para um estado da camada
+        seguinte da sua fronteira, o que nunca leva a um beco sem saída.
+
+        Arguments:
+            meio {int} -- estado canônico presente nas duas fronteiras
+            diretas {list} -- camadas da fronteira a partir do início
+            reversas {list} -- camadas da fronteira a partir do fim
+            chave {function} -- forma canônica, TabelaTransposicao.chave
+        """
+        jogo = self.jogo
+
+        # desfaz saltos do meio até uma imagem do estado inicial por simetria
+        bits = meio
+        desfeitos = []
+        for camada in reversed(diretas[:-1]):
+            for salto in resta_um.SALTOS:
+                if bits & salto.mascara == salto.bit_destino and _contem(camada, chave(bits ^ salto.mascara)):
+                    desfeitos.append(salto)
+                    bits ^= salto.mascara
+                    break
+        inicio = jogo.compactar()
+        simetria = next(simetria for simetria in resta_um.simetrias_do_jogo(jogo)
+                        if simetria.aplicar(bits) == inicio)
+        for salto in reversed(desfeitos):
+            jogo.saltar(simetria.salto(salto))
+
+        # as simetrias do jogo preservam o objetivo, então a partir da imagem
+        # do meio basta seguir a fronteira reversa até uma posição final
+        bits = jogo.compactar()
+        for camada in reversed(reversas[:-1]):
+            for salto in resta_um.SALTOS:
+                if bits & salto.mascara == salto.origem_saltada and _contem(camada, chave(bits ^ salto.mascara)):
+                    jogo.saltar(salto)
+                    bits ^= salto.mascara
+                    break
@@ -0,0 +1,236 @@
+#encoding: utf-8
+
+import collections
+import concurrent.futures
+import json
+import time
+
+import resta_um
+
+# Tabelas de transposição de cada processo, por posição alvo. Um estado sem
+# solução para um alvo continua sem solução em qualquer consulta com o mesmo
+# alvo, então a tabela é reaproveitada entre consultas.
+_tabelas_do_processo = {}
+
+# Bancos de soluções abertos em cada processo por carregar_bancos(). Uma
+# consulta cujo estado está em um banco compatível é respondida seguindo as
+# dicas do banco, sem busca.
+_bancos_do_processo = []
+
+# Capacidade das tabelas quando nenhuma é informada. Elas duram enquanto o
+# processo atende consultas, então sem limite cresceriam a cada consulta.
+CAPACIDADE_PADRAO = 500000
+
+
+def _orcamento(consulta: dict, nome: str, tipos: tuple, padrao):
+    """Lê da consulta um limite da busca, positivo.
+
+    Arguments:
+        consulta {dict} -- consulta JSON
+        nome {str} -- campo do limite
+        tipos {tuple} -- tipos aceitos
+        padrao -- valor usado se o campo não estiver na consulta
+
+    Raises:
+        ValueError -- se o valor não for um número positivo dos tipos aceitos
+
+    Returns:
+        valor do limite, ou padrao
+    """
+    valor = consulta.get(nome, padrao)
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, tipos) or valor <= 0:
+        raise ValueError(f"{nome} deve ser um número positivo: {valor!r}")
+    return valor
+
+
+def carregar_bancos(caminhos):
+    """Abre bancos de soluções para as consultas do processo.
+
+    Usada também como inicializador dos processos de trabalho.
+
+    Arguments:
+        caminhos {list} -- arquivos gravados por banco_resta_um.construir_banco
+    """
+    import banco_resta_um
+    for caminho in caminhos:
+        _bancos_do_processo.append(banco_resta_um.BancoSolucoes(caminho))
+
+
+def ler_jogo(consulta: dict):
+    """Cria o tabuleiro de uma consulta.
+
+    Arguments:
+        consulta {dict} -- 'posicao' [linha, coluna] do buraco inicial e
+        'exigente' opcional, como nos argumentos de resta_um.Tabuleiro; ou
+        'estado' com uma posição qualquer do jogo e 'alvo' opcional
+
+    Raises:
+        KeyError -- se a consulta não tiver nem posicao nem estado
+        TypeError, ValueError -- se os campos forem inválidos
+
+    Returns:
+        TabuleiroBits -- tabuleiro da consulta
+    """
+    if 'posicao' in consulta:
+        posicao = tuple(consulta['posicao'])
+        exigente = consulta.get('exigente', False)
+        if posicao not in resta_um.BITS:
+            raise ValueError(f"Posição inicial inválida: {consulta['posicao']!r}")
+        if not isinstance(exigente, bool):
+            raise ValueError(f"exigente deve ser true ou false: {exigente!r}")
+        return resta_um.TabuleiroBits(posicao, exigente)
+    return resta_um.TabuleiroBits.de_estado(consulta['estado'], consulta.get('alvo'))
+
+
+def _resolver_pelo_banco(jogo):
+    """Responde pelo primeiro banco compatível que conhece o estado do jogo.
+
+    Arguments:
+        jogo {TabuleiroBits} -- tabuleiro da consulta, que recebe os
+        movimentos da solução
+
+    Returns:
+        bool -- se o jogo tem solução, None se nenhum banco conhece o estado
+    """
+    for banco in _bancos_do_processo:
+        if not banco.compativel(jogo):
+            continue
+        solucionavel = jogo.esta_solucionado() or banco.consultar(jogo.compactar())
+        if solucionavel is None:
+            continue
+        while solucionavel and not jogo.esta_solucionado():
+            jogo.mover(jogo.dica(banco))
+        return bool(solucionavel)
+    return None
+
+
+def resolver_consulta(consulta: dict, recursivo=True, timeout=None, max_nos=None, **opcoes):
+    """Responde se uma posição do jogo tem solução e qual é ela.
+
+    Arguments:
+        consulta {dict} -- posição do jogo como em ler_jogo(), 'timeout' e
+        'max_nos' opcionais que substituem os da chamada e 'id' opcional,
+        devolvido na resposta
+
+    Keyword Arguments:
+        recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+        timeout {float} -- segundos de busca por consulta (default: {None})
+        max_nos {int} -- nós de busca por consulta (default: {None})
+        opcoes -- argumentos de resta_um.SolucionadorResta1; sem
+        capacidade_cache nem capacidade_cache_mb a tabela de transposição
+        fica limitada a CAPACIDADE_PADRAO estados
+
+    Returns:
+        dict -- id, situacao (ver resta_um.SITUACOES), solucionavel (None se
+        a busca foi interrompida), movimentos como [linha, coluna, direcao]
+        da solução ou, se a busca foi interrompida, da melhor posição
+        alcançada, pecas_restantes ao fim dos movimentos, tempo e nos (0
+        quando a resposta veio de um banco de soluções); ou id e erro se a
+        consulta for inválida
+    """
+    resposta = {'id': consulta.get('id')}
+    try:
+        jogo = ler_jogo(consulta)
+        timeout = _orcamento(consulta, 'timeout', (int, float), timeout)
+        max_nos = _orcamento(consulta, 'max_nos', (int,), max_nos)
+    except (KeyError, TypeError, ValueError) as erro:
+        resposta['erro'] = f"Consulta inválida: {erro}"
+        return resposta
+
+    inicio = time.perf_counter()
+    solucionavel = _resolver_pelo_banco(jogo)
+    if solucionavel is not None:
+        resposta['situacao'] = 'solucionado' if solucionavel else 'sem_solucao'
+        resposta['solucionavel'] = solucionavel
+        resposta['movimentos'] = [[*mov.posicao, mov.direcao] for mov in jogo.movimentos]
+        resposta['pecas_restantes'] = jogo.pecas_restantes if solucionavel else None
+        resposta['tempo'] = time.perf_counter() - inicio
+        resposta['nos'] = 0
+        return resposta
+
+    if opcoes.get('capacidade_cache') is None and opcoes.get('capacidade_cache_mb') is None:
+        opcoes = dict(opcoes, capacidade_cache=CAPACIDADE_PADRAO)
+    solver = resta_um.SolucionadorResta1(jogo, **opcoes)
+    solver.tabela_transposicao = _tabelas_do_processo.get(jogo.pos_inicial)
+    solucionavel = solver.solucionar(recursivo, continuar=True, timeout=timeout, max_nos=max_nos)
+    if solver.tabela_transposicao is not None:
+        _tabelas_do_processo[jogo.pos_inicial] = solver.tabela_transposicao
+
+    interrompida = solver.situacao == 'interrompido'
+    resposta['situacao'] = solver.situacao
+    resposta['solucionavel'] = None if interrompida else solucionavel
+    resposta['movimentos'] = [[*mov.posicao, mov.direcao] for mov in jogo.movimentos] \
+        if solucionavel or interrompida else []
+    resposta['pecas_restantes'] = jogo.pecas_restantes if solucionavel or interrompida else None
+    resposta['tempo'] = solver.tempo
+    resposta['nos'] = solver.total_de_movimentos
+    return resposta
+
+
+def _resolver_linha(linha: str, recursivo, opcoes):
+    """Interpreta uma linha JSONL e resolve a consulta.
+
+    Arguments:
+        linha {str} -- objeto JSON com a consulta
+        recursivo {bool} -- usar o algoritmo recursivo
+        opcoes {dict} -- timeout, max_nos e argumentos de resta_um.SolucionadorResta1
+
+    Returns:
+        dict -- resposta de resolver_consulta()
+    """
+    try:
+        consulta = json.loads(linha)
+    except ValueError as erro:
+        return {'id': None, 'erro': f"JSON inválido: {erro}"}
+    if not isinstance(consulta, dict):
+        return {'id': None, 'erro': "A consulta deve ser um objeto JSON"}
+    return resolver_consulta(consulta, recursivo, **opcoes)
+
+
+def processar_fluxo(entrada, saida, trabalhadores=0, em_voo=None, recursivo=True, **opcoes):
+    """Lê uma consulta por linha JSONL e escreve as respostas na mesma ordem,
+    uma por linha, assim que ficam prontas.
+
+    Arguments:
+        entrada {file} -- arquivo de texto com uma consulta JSON por linha
+        saida {file} -- arquivo de texto para as respostas
+
+    Keyword Arguments:
+        trabalhadores {int} -- número de processos; 0 resolve no próprio
+        processo (default: {0})
+        em_voo {int} -- máximo de consultas enviadas e ainda não escritas,
+        limitando a memória usada quando a entrada é maior que a capacidade
+        dos processos (default: {2 * trabalhadores})
+        recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+        opcoes -- timeout e max_nos de resolver_consulta e argumentos de
+        resta_um.SolucionadorResta1
+
+    Returns:
+        int -- número de consultas respondidas
+    """
+    def escrever(resposta):
+        saida.write(json.dumps(resposta) + '\n')
+        saida.flush()
+
+    respondidas = 0
+    linhas = (linha for linha in entrada if linha.strip())
+    if not trabalhadores:
+        for linha in linhas:
+            escrever(_resolver_linha(linha, recursivo, opcoes))
+            respondidas += 1
+        return respondidas
+
+    em_voo = em_voo or 2 * trabalhadores
+    with concurrent.futures.ProcessPoolExecutor(trabalhadores) as executor:
+        pendentes = collections.deque()
+        for linha in linhas:
+            pendentes.append(executor.submit(_resolver_linha, linha, recursivo, opcoes))
+            if len(pendentes) >= em_voo:
+                escrever(pendentes.popleft().result())
+                respondidas += 1
+        while pendentes:
+            escrever(pendentes.popleft().result())
+            respondidas += 1
+    return respondidas
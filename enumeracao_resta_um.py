@@ -0,0 +1,395 @@
+#encoding: utf-8
+
+import argparse
+import os
+import sys
+import time
+
+try:
+    import numpy as np
+    no_numpy = False
+except ModuleNotFoundError:
+    no_numpy = True
+
+import resta_um
+
+# Número de estados expandidos de uma vez, limitando a memória temporária
+# usada pelos filhos de cada bloco
+BLOCO_PADRAO = 1 << 20
+
+
+def _exigir_numpy():
+    if no_numpy:
+        raise ModuleNotFoundError("A enumeração vetorizada precisa do módulo NumPy")
+
+
+def _mascaras_saltos():
+    """Retorna as máscaras de SALTOS como escalares uint64.
+
+    Returns:
+        list -- pares (mascara, origem_saltada) de cada salto
+    """
+    return [(np.uint64(salto.mascara), np.uint64(salto.origem_saltada)) for salto in resta_um.SALTOS]
+
+
+def tabelas_simetrias(simetrias):
+    """Converte as tabelas por byte das simetrias para um array NumPy.
+
+    Arguments:
+        simetrias {tuple} -- instâncias de resta_um.Simetria
+
+    Returns:
+        numpy.ndarray -- uint64 com forma (simetrias, grupos de 8 bits, 256)
+    """
+    _exigir_numpy()
+    return np.array([simetria.tabelas for simetria in simetrias], dtype=np.uint64)
+
+
+def canonicos(estados, tabelas):
+    """Calcula a forma canônica de vários tabuleiros compactados de uma vez.
+
+    O resultado é o mesmo de resta_um.TabelaTransposicao.chave: o menor
+    tabuleiro entre as imagens pelas simetrias.
+
+    Arguments:
+        estados {numpy.ndarray} -- tabuleiros compactados (uint64)
+        tabelas {numpy.ndarray} -- retorno de tabelas_simetrias()
+
+    Returns:
+        numpy.ndarray -- formas canônicas (uint64), na mesma ordem
+    """
+    grupos = [((estados >> np.uint64(8 * grupo)) & np.uint64(255)).astype(np.intp)
+              for grupo in range(tabelas.shape[1])]
+    resultado = None
+    for tabelas_simetria in tabelas:
+        imagem = tabelas_simetria[0][grupos[0]]
+        for tabela, grupo in zip(tabelas_simetria[1:], grupos[1:]):
+            imagem |= tabela[grupo]
+        resultado = imagem if resultado is None else np.minimum(resultado, imagem)
+    return resultado
+
+
+def expandir_camada(camada, tabelas, bloco=BLOCO_PADRAO, caminho=None, reverso=False):
+    """Aplica os 76 saltos a todos os estados de uma camada.
+
+    Arguments:
+        camada {numpy.ndarray} -- estados canônicos com o mesmo número de peças
+        tabelas {numpy.ndarray} -- retorno de tabelas_simetrias()
+
+    Keyword Arguments:
+        bloco {int} -- número de estados expandidos de uma vez (default: {BLOCO_PADRAO})
+        caminho {str} -- arquivo .npy da camada seguinte. Se informado, os
+        filhos de cada bloco são gravados ordenados em arquivos próprios e
+        intercalados no arquivo final, de modo que a memória usada depende só
+        do bloco e nunca do tamanho da camada (default: {None})
+        reverso {bool} -- desfazer os saltos em vez de realizá-los, levando à
+        camada com uma peça a mais. Desfazer um salto é o mesmo que realizá-lo
+        no tabuleiro complementar. (default: {False})
+
+    Returns:
+        numpy.ndarray -- estados canônicos da camada seguinte, ordenados e sem
+        repetição; mapeado do arquivo quando caminho é informado
+    """
+    saltos = _mascaras_saltos()
+    cheio = np.uint64(resta_um.TABULEIRO_CHEIO)
+    partes = []
+    for inicio in range(0, len(camada), bloco):
+        estados = np.asarray(camada[inicio:inicio + bloco])
+        if reverso:
+            estados = estados ^ cheio
+        filhos = np.concatenate([estados[(estados & mascara) == origem_saltada] ^ mascara
+                                 for mascara, origem_saltada in saltos])
+        if reverso:
+            filhos ^= cheio
+        filhos = np.unique(canonicos(filhos, tabelas))
+        if caminho is not None:
+            parte = f'{os.path.splitext(caminho)[0]}_parte_{len(partes)}.npy'
+            np.save(parte, filhos)
+            filhos = parte
+        partes.append(filhos)
+    if caminho is not None:
+        return _intercalar(partes, caminho, bloco)
+    if not partes:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(np.concatenate(partes))
+
+
+def _intercalar(partes, caminho: str, bloco: int):
+    """Intercala arquivos .npy ordenados em um único arquivo ordenado e sem
+    repetição, lendo no máximo cerca de bloco estados por vez.
+
+    Arguments:
+        partes {list} -- arquivos .npy com arrays uint64 ordenados, apagados no fim
+        caminho {str} -- arquivo .npy de saída
+        bloco {int} -- número de estados lidos de uma vez, somando todas as partes
+
+    Returns:
+        numpy.ndarray -- o array mapeado do arquivo de saída
+    """
+    leitores = [np.load(parte, mmap_mode='r') for parte in partes]
+    posicoes = [0] * len(leitores)
+    passo = max(1, bloco // max(1, len(leitores)))
+    temporario = caminho + '.tmp'
+    total = 0
+    with open(temporario, 'wb') as saida:
+        while True:
+            janelas = [(indice, leitor[posicao:posicao + passo])
+                       for indice, (leitor, posicao) in enumerate(zip(leitores, posicoes))
+                       if posicao < len(leitor)]
+            if not janelas:
+                break
+            # todos os estados até o menor dos últimos das janelas já foram
+            # lidos de todas as partes, então podem ser escritos
+            limite = min(janela[-1] for _, janela in janelas)
+            pedacos = []
+            for indice, janela in janelas:
+                quantidade = int(np.searchsorted(janela, limite, side='right'))
+                pedacos.append(np.asarray(janela[:quantidade]))
+                posicoes[indice] += quantidade
+            estados = np.unique(np.concatenate(pedacos))
+            estados.astype('<u8').tofile(saida)
+            total += len(estados)
+    del leitores
+    for parte in partes:
+        os.remove(parte)
+
+    if not total:
+        os.remove(temporario)
+        return np.empty(0, dtype=np.uint64)
+    camada = np.lib.format.open_memmap(caminho, mode='w+', dtype='<u8', shape=(total,))
+    bruto = np.memmap(temporario, dtype='<u8', mode='r')
+    for inicio in range(0, total, bloco):
+        camada[inicio:inicio + bloco] = bruto[inicio:inicio + bloco]
+    camada.flush()
+    del camada, bruto
+    os.remove(temporario)
+    return np.load(caminho, mmap_mode='r')
+
+
+def _guardar_camada(camada, pecas: int, diretorio, limite_mb):
+    """Mantém a camada mapeada de um arquivo .npy se ela passar do limite, ou
+    na memória caso contrário.
+
+    Uma camada mapeada que cabe no limite é copiada para a memória, mas o
+    arquivo não é apagado aqui: quem chama ainda tem a referência ao mapa e
+    deve apagá-lo depois de soltá-la.
+
+    Returns:
+        numpy.ndarray -- a camada na memória ou o array mapeado do arquivo
+    """
+    if diretorio is None:
+        return camada
+    grande = limite_mb is None or camada.nbytes > limite_mb * 2**20
+    if isinstance(camada, np.memmap):
+        return camada if grande else np.array(camada)
+    if not grande:
+        return camada
+    caminho = os.path.join(diretorio, f'camada_{pecas:02d}.npy')
+    np.save(caminho, camada)
+    return np.load(caminho, mmap_mode='r')
+
+
+def enumerar_camadas(jogo, diretorio=None, limite_mb=None, bloco=BLOCO_PADRAO, progresso=None):
+    """Enumera em largura todas as posições alcançáveis a partir do estado
+    atual do jogo, uma camada por número de peças.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro na posição inicial da enumeração
+
+    Keyword Arguments:
+        diretorio {str} -- diretório onde camadas grandes são gravadas como
+        .npy e lidas mapeadas em memória, None para manter tudo na memória.
+        Com diretório cada camada é montada por intercalação externa, então
+        nem mesmo a camada em construção precisa caber na memória.
+        (default: {None})
+        limite_mb {float} -- tamanho a partir do qual uma camada vai para o
+        diretório; None grava todas (default: {None})
+        bloco {int} -- ver expandir_camada (default: {BLOCO_PADRAO})
+        progresso {function} -- chamada com ('enumeracao', número de peças,
+        estados da camada) a cada camada (default: {None})
+
+    Returns:
+        list -- arrays uint64 ordenados de estados canônicos sob as simetrias
+        do jogo, em ordem decrescente de peças
+    """
+    _exigir_numpy()
+    if diretorio is not None:
+        os.makedirs(diretorio, exist_ok=True)
+    tabelas = tabelas_simetrias(resta_um.simetrias_do_jogo(jogo))
+    pecas = bin(jogo.compactar()).count('1')
+
+    camada = canonicos(np.array([jogo.compactar()], dtype=np.uint64), tabelas)
+    camadas = []
+    while len(camada):
+        if progresso:
+            progresso('enumeracao', pecas, len(camada))
+        mapeada = camada.filename if isinstance(camada, np.memmap) else None
+        camada = _guardar_camada(camada, pecas, diretorio, limite_mb)
+        if mapeada is not None and not isinstance(camada, np.memmap):
+            # o mapa anterior foi solto ao substituir camada, então o
+            # arquivo pode ser apagado em qualquer sistema
+            os.remove(mapeada)
+        camadas.append(camada)
+        caminho = None
+        if diretorio is not None:
+            caminho = os.path.join(diretorio, f'camada_{pecas - 1:02d}.npy')
+        camada = expandir_camada(camadas[-1], tabelas, bloco, caminho)
+        pecas -= 1
+    return camadas
+
+
+def calcular_solucionaveis(jogo, camadas, bloco=BLOCO_PADRAO, progresso=None):
+    """Calcula quais estados de cada camada têm solução, da última camada
+    para a primeira.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro usado em enumerar_camadas(), que define
+        o objetivo do jogo
+        camadas {list} -- retorno de enumerar_camadas()
+
+    Keyword Arguments:
+        bloco {int} -- ver expandir_camada (default: {BLOCO_PADRAO})
+        progresso {function} -- chamada com ('solucao', número de peças,
+        estados da camada) a cada camada (default: {None})
+
+    Returns:
+        list -- um array bool por camada, True nos estados com solução
+    """
+    _exigir_numpy()
+    tabelas = tabelas_simetrias(resta_um.simetrias_do_jogo(jogo))
+    saltos = _mascaras_saltos()
+    final = np.uint64(resta_um.BITS[tuple(jogo.pos_inicial)]) if jogo.peca_final_no_buraco_inicial else None
+
+    solucionaveis = [None] * len(camadas)
+    vencedores = np.empty(0, dtype=np.uint64)
+    for indice in reversed(range(len(camadas))):
+        camada = camadas[indice]
+        partes = []
+        for inicio in range(0, len(camada), bloco):
+            estados = np.asarray(camada[inicio:inicio + bloco])
+            if final is None:
+                vence = (estados & (estados - np.uint64(1))) == 0
+            else:
+                vence = estados == final
+            if len(vencedores):
+                for mascara, origem_saltada in saltos:
+                    validos = np.nonzero((estados & mascara) == origem_saltada)[0]
+                    filhos = canonicos(estados[validos] ^ mascara, tabelas)
+                    posicoes = np.minimum(np.searchsorted(vencedores, filhos), len(vencedores) - 1)
+                    vence[validos[vencedores[posicoes] == filhos]] = True
+            partes.append(vence)
+        solucionaveis[indice] = np.concatenate(partes) if partes else np.zeros(0, dtype=bool)
+        vencedores = np.asarray(camada)[solucionaveis[indice]]
+        if progresso:
+            progresso('solucao', bin(int(camada[0])).count('1'), len(camada))
+    return solucionaveis
+
+
+def calcular_contagens(jogo, camadas, bloco=BLOCO_PADRAO, progresso=None):
+    """Calcula o número de soluções de cada estado, da última camada para a
+    primeira.
+
+    O número de soluções de um estado é a soma dos números dos estados
+    alcançados por seus saltos, e como as camadas estão ordenadas a posição
+    de cada filho na camada seguinte sai de uma busca binária vetorizada. As
+    contagens são as mesmas de SolucionadorResta1.contar_solucoes e cabem em
+    uint64 no tabuleiro inglês (o maior total, do tabuleiro cheio, fica abaixo
+    de 10**17).
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro usado em enumerar_camadas(), que define
+        o objetivo do jogo
+        camadas {list} -- retorno de enumerar_camadas()
+
+    Keyword Arguments:
+        bloco {int} -- ver expandir_camada (default: {BLOCO_PADRAO})
+        progresso {function} -- chamada com ('contagem', número de peças,
+        estados da camada) a cada camada (default: {None})
+
+    Returns:
+        list -- um array uint64 por camada, com o número de soluções de cada estado
+    """
+    _exigir_numpy()
+    tabelas = tabelas_simetrias(resta_um.simetrias_do_jogo(jogo))
+    saltos = _mascaras_saltos()
+    final = np.uint64(resta_um.BITS[tuple(jogo.pos_inicial)]) if jogo.peca_final_no_buraco_inicial else None
+
+    contagens = [None] * len(camadas)
+    seguinte = None
+    for indice in reversed(range(len(camadas))):
+        camada = camadas[indice]
+        partes = []
+        for inicio in range(0, len(camada), bloco):
+            estados = np.asarray(camada[inicio:inicio + bloco])
+            if final is None:
+                conta = ((estados & (estados - np.uint64(1))) == 0).astype(np.uint64)
+            else:
+                conta = (estados == final).astype(np.uint64)
+            if seguinte is not None:
+                for mascara, origem_saltada in saltos:
+                    validos = np.nonzero((estados & mascara) == origem_saltada)[0]
+                    filhos = canonicos(estados[validos] ^ mascara, tabelas)
+                    np.add.at(conta, validos, contagens[indice + 1][np.searchsorted(seguinte, filhos)])
+            partes.append(conta)
+        contagens[indice] = np.concatenate(partes) if partes else np.zeros(0, dtype=np.uint64)
+        seguinte = camada
+        if progresso:
+            progresso('contagem', bin(int(camada[0])).count('1'), len(camada))
+    return contagens
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Enumeração em largura das posições do resta 1')
+    parser_argumentos.add_argument('--posicao', '-p', nargs=2, default=[3, 3], type=int,
+                                   help='Posição inicial na forma linha coluna')
+    parser_argumentos.add_argument('--exigente', '-e', action='store_true',
+                                   help='Exige que a última peça termine na posição do buraco inicial')
+    parser_argumentos.add_argument('--estado', default=None,
+                                   help='Começar de uma posição qualquer (33 caracteres 0/1 na ordem de COORDS_VALIDAS)')
+    parser_argumentos.add_argument('--alvo', nargs=2, default=None, type=int,
+                                   help='Posição onde a última peça deve terminar, com --estado')
+    parser_argumentos.add_argument('--diretorio', default=None,
+                                   help='Diretório para gravar as camadas como .npy')
+    parser_argumentos.add_argument('--limite-mb', type=float, default=None,
+                                   help='Só grava no diretório as camadas maiores que esse tamanho')
+    parser_argumentos.add_argument('--solucionaveis', '-s', action='store_true',
+                                   help='Calcula também quantos estados de cada camada têm solução')
+    parser_argumentos.add_argument('--contar', '-c', action='store_true',
+                                   help='Conta também as soluções a partir do estado inicial')
+    return parser_argumentos
+
+
+if __name__ == "__main__":
+    argumentos = setup_parser_argumentos().parse_args()
+    if no_numpy:
+        print("A enumeração vetorizada precisa do módulo NumPy")
+        sys.exit(1)
+
+    if argumentos.estado is not None:
+        jogo = resta_um.TabuleiroBits.de_estado(argumentos.estado, argumentos.alvo)
+    else:
+        if tuple(argumentos.posicao) not in resta_um.COORDS_VALIDAS:
+            print("Posição inicial inválida")
+            sys.exit(1)
+        jogo = resta_um.TabuleiroBits(tuple(argumentos.posicao), argumentos.exigente)
+
+    tempo_inicio = time.time()
+    camadas = enumerar_camadas(jogo, argumentos.diretorio, argumentos.limite_mb)
+    print(f"Enumeração: {time.time() - tempo_inicio:.1f} segundos")
+    solucionaveis = calcular_solucionaveis(jogo, camadas) if argumentos.solucionaveis else None
+    if solucionaveis is not None:
+        print(f"Solução: {time.time() - tempo_inicio:.1f} segundos")
+    contagens = calcular_contagens(jogo, camadas) if argumentos.contar else None
+    if contagens is not None:
+        print(f"Contagem: {time.time() - tempo_inicio:.1f} segundos")
+
+    pecas = bin(jogo.compactar()).count('1')
+    for indice, camada in enumerate(camadas):
+        linha = f"{pecas - indice:2d} peças: {len(camada)} estados"
+        if solucionaveis is not None:
+            linha += f", {int(solucionaveis[indice].sum())} com solução"
+        print(linha)
+    print(f"Total: {sum(len(camada) for camada in camadas)} estados canônicos")
+    if contagens is not None:
+        print(f"Soluções a partir do estado inicial: {int(contagens[0][0])}")
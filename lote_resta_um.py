@@ -0,0 +1,214 @@
+#encoding: utf-8
+
+import csv
+import json
+import os
+
+import resta_um
+
+ARQUIVO_CACHE_PADRAO = 'resta_um_cache.json'
+
+
+def representante(posicao: tuple):
+    """Retorna a posição canônica equivalente por simetria a uma posição inicial.
+
+    Arguments:
+        posicao {tuple} -- (linha, coluna) do buraco inicial
+
+    Returns:
+        tuple -- (representante, simetria), onde simetria leva o representante
+        à posição informada
+    """
+    posicao = tuple(posicao)
+    canonica = min(simetria.posicao(posicao) for simetria in resta_um.SIMETRIAS)
+    for simetria in resta_um.SIMETRIAS:
+        if simetria.posicao(canonica) == posicao:
+            return canonica, simetria
+
+
+def _chave_cache(posicao: tuple, exigente: bool, recursivo: bool, opcoes: dict):
+    """Retorna a chave de um resultado no cache.
+
+    A chave inclui as opções do solucionador, já que o tempo e o número de
+    nós (e a solução encontrada) dependem delas.
+
+    Arguments:
+        posicao {tuple} -- (linha, coluna) do buraco inicial
+        exigente {bool} -- se a última peça deve ficar no buraco inicial
+        recursivo {bool} -- usar o algoritmo recursivo
+        opcoes {dict} -- argumentos de resta_um.SolucionadorResta1
+
+    Returns:
+        str -- chave do cache
+    """
+    linha, coluna = posicao
+    podas = '+'.join(poda.nome for poda in opcoes.get('podas', ())) or '-'
+    return (f"{linha},{coluna},{int(exigente)},{resta_um.VERSAO_SOLUCIONADOR},"
+            f"{'r' if recursivo else 'i'},{int(bool(opcoes.get('transposicao')))},"
+            f"{opcoes.get('capacidade_cache')},{opcoes.get('capacidade_cache_mb')},"
+            f"{opcoes.get('politica_cache', 'lru')},{podas},"
+            f"{opcoes.get('ordenacao') or 'fixa'},{opcoes.get('largura_feixe')}")
+
+
+def ler_cache(caminho: str):
+    """Lê os resultados já calculados.
+
+    Arguments:
+        caminho {str} -- arquivo JSON do cache
+
+    Returns:
+        dict -- resultados por chave (posição, exigente, versão); vazio se o
+        arquivo não existir
+    """
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def salvar_cache(cache: dict, caminho: str):
+    """Grava o cache de forma atômica, para não perdê-lo se o processo for interrompido.
+
+    Arguments:
+        cache {dict} -- resultados por chave
+        caminho {str} -- arquivo JSON do cache
+    """
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(cache, arquivo)
+    os.replace(temporario, caminho)
+
+
+def solucionar_posicao(posicao: tuple, exigente: bool, recursivo=True, contar=False, **opcoes):
+    """Soluciona o jogo para um buraco inicial.
+
+    Arguments:
+        posicao {tuple} -- (linha, coluna) do buraco inicial
+        exigente {bool} -- se a última peça deve ficar no buraco inicial
+
+    Keyword Arguments:
+        recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+        contar {bool} -- contar também todas as soluções (default: {False})
+        opcoes -- argumentos de resta_um.SolucionadorResta1
+
+    Returns:
+        dict -- solucionavel (None se a busca em feixe não encontrou
+        solução), índices de resta_um.SALTOS da solução, tempo e nós; com
+        contar, também solucoes e solucoes_distintas
+    """
+    jogo = resta_um.TabuleiroBits(posicao, exigente)
+    solver = resta_um.SolucionadorResta1(jogo, **opcoes)
+    solucionavel = solver.solucionar(recursivo)
+    saltos = [resta_um.SALTO_POR_MOVIMENTO[(mov.posicao, mov.direcao)].indice for mov in jogo.movimentos]
+    if solver.situacao == 'interrompido':
+        # a busca em feixe é incompleta: sem solução encontrada, não se sabe
+        solucionavel = None
+    resultado = {'solucionavel': solucionavel, 'saltos': saltos if solucionavel else [],
+                 'tempo': solver.tempo, 'nos': solver.total_de_movimentos}
+    if contar:
+        resultado.update(contar_posicao(posicao, exigente, opcoes.get('podas', ())))
+    return resultado
+
+
+def contar_posicao(posicao: tuple, exigente: bool, podas=()):
+    """Conta as soluções do jogo para um buraco inicial.
+
+    Arguments:
+        posicao {tuple} -- (linha, coluna) do buraco inicial
+        exigente {bool} -- se a última peça deve ficar no buraco inicial
+
+    Keyword Arguments:
+        podas {list} -- instâncias de resta_um.Poda usadas na contagem (default: {()})
+
+    Returns:
+        dict -- solucoes e solucoes_distintas
+    """
+    contador = resta_um.SolucionadorResta1(resta_um.TabuleiroBits(posicao, exigente), podas=podas)
+    return {'solucoes': contador.contar_solucoes(), 'solucoes_distintas': contador.contar_solucoes_distintas()}
+
+
+def solucionar_todas(recursivo=True, arquivo_cache=ARQUIVO_CACHE_PADRAO, progresso=None, contar=False, **opcoes):
+    """Soluciona todas as posições iniciais, com e sem a exigência da última
+    peça no buraco inicial.
+
+    Apenas as posições canônicas por simetria são solucionadas; as demais
+    recebem a solução da canônica transformada pela simetria e são marcadas
+    como derivadas, sem tempo e sem número de nós, que não foram medidos para
+    elas. Resultados já presentes no cache para as mesmas opções não são
+    recalculados.
+
+    Keyword Arguments:
+        recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+        arquivo_cache {str} -- arquivo JSON do cache, None para não usar cache
+        (default: {ARQUIVO_CACHE_PADRAO})
+        progresso {function} -- chamada com (posicao, exigente, calculado) a
+        cada posição canônica (default: {None})
+        contar {bool} -- contar também todas as soluções de cada posição; as
+        contagens valem sem mudança para as posições simétricas (default: {False})
+        opcoes -- argumentos de resta_um.SolucionadorResta1
+
+    Returns:
+        list -- um dicionário de resultado por posição inicial e exigência;
+        tempo e nos são None nos resultados derivados
+    """
+    cache = ler_cache(arquivo_cache) if arquivo_cache else {}
+    resultados = []
+    for exigente in (False, True):
+        for posicao in resta_um.COORDS_VALIDAS:
+            canonica, simetria = representante(posicao)
+            chave = _chave_cache(canonica, exigente, recursivo, opcoes)
+            calculado = True
+            if chave not in cache:
+                cache[chave] = solucionar_posicao(canonica, exigente, recursivo, contar, **opcoes)
+            elif contar and 'solucoes' not in cache[chave]:
+                # a solução já está no cache, só as contagens faltam
+                cache[chave].update(contar_posicao(canonica, exigente, opcoes.get('podas', ())))
+            else:
+                calculado = False
+            if calculado and arquivo_cache:
+                salvar_cache(cache, arquivo_cache)
+            if progresso and canonica == posicao:
+                progresso(posicao, exigente, calculado)
+
+            resultado = cache[chave]
+            derivado = canonica != posicao
+            saltos = [resta_um.SALTOS[simetria.saltos[indice]] for indice in resultado['saltos']]
+            resultados.append({
+                'posicao': list(posicao),
+                'exigente': exigente,
+                'solucionavel': resultado['solucionavel'],
+                'movimentos': [[*salto.origem, salto.movimento.direcao] for salto in saltos],
+                'tempo': None if derivado else resultado['tempo'],
+                'nos': None if derivado else resultado['nos'],
+                'representante': list(canonica),
+                'simetria': simetria.nome,
+                'derivado': derivado,
+            })
+            if contar:
+                resultados[-1]['solucoes'] = resultado['solucoes']
+                resultados[-1]['solucoes_distintas'] = resultado['solucoes_distintas']
+    return resultados
+
+
+def salvar_resultados(resultados: list, caminho: str):
+    """Grava os resultados em JSON ou CSV, conforme a extensão do arquivo.
+
+    Arguments:
+        resultados {list} -- retorno de solucionar_todas()
+        caminho {str} -- arquivo .json ou .csv
+    """
+    if caminho.lower().endswith('.csv'):
+        campos = ['posicao', 'exigente', 'solucionavel', 'tempo', 'nos', 'representante', 'simetria', 'derivado',
+                  'solucoes', 'solucoes_distintas', 'movimentos']
+        with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            escritor = csv.DictWriter(arquivo, campos, restval='')
+            escritor.writeheader()
+            for resultado in resultados:
+                linha = dict(resultado)
+                linha['posicao'] = '{},{}'.format(*resultado['posicao'])
+                linha['representante'] = '{},{}'.format(*resultado['representante'])
+                linha['movimentos'] = ' '.join('{},{},{}'.format(*mov) for mov in resultado['movimentos'])
+                escritor.writerow(linha)
+    else:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump({'versao': resta_um.VERSAO_SOLUCIONADOR, 'resultados': resultados}, arquivo, indent=1)
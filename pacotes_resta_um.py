@@ -0,0 +1,376 @@
+#encoding: utf-8
+
+import resta_um
+
+# Blocos limpos pelos pacotes, em posições relativas: 3 posições em linha e
+# retângulos 2x3, deitados; os de pé são obtidos transpondo os padrões
+BLOCOS = {
+    3: ((0, 0), (0, 1), (0, 2)),
+    6: ((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)),
+}
+
+# direção de cada movimento depois de trocar linhas por colunas
+TRANSPOSTAS = {'N': 'O', 'S': 'L', 'L': 'S', 'O': 'N'}
+
+
+class Padrao:
+    """
+    Pacote em posições relativas: uma sequência de saltos que limpa um bloco
+    e deixa as outras posições que toca como estavam, desde que elas comecem
+    com os valores exigidos (as peças catalisadoras e os buracos usados).
+    """
+    __slots__ = ('bloco', 'exigidas', 'movimentos')
+
+    def __init__(self, bloco, exigidas, movimentos):
+        """Inicializa o padrão.
+
+        Arguments:
+            bloco {tuple} -- posições (linha, coluna) limpas pelo pacote
+            exigidas {tuple} -- pares ((linha, coluna), valor) com o valor,
+            1 para peça e 0 para buraco, de cada posição tocada pelos saltos
+            movimentos {tuple} -- pares ((linha, coluna), direção) dos saltos
+        """
+        self.bloco = bloco
+        self.exigidas = exigidas
+        self.movimentos = movimentos
+
+    def __repr__(self):
+        return f"Padrao({len(self.bloco)} posições, {len(self.movimentos)} saltos)"
+
+    def transposto(self):
+        """Retorna o mesmo padrão com linhas e colunas trocadas."""
+        return Padrao(tuple((coluna, linha) for linha, coluna in self.bloco),
+                      tuple(((coluna, linha), valor) for (linha, coluna), valor in self.exigidas),
+                      tuple(((coluna, linha), TRANSPOSTAS[direcao])
+                            for (linha, coluna), direcao in self.movimentos))
+
+
+def gerar_padroes(bloco):
+    """Gera os pacotes que limpam um bloco usando só as posições vizinhas a ele.
+
+    Cada sequência de tantos saltos quantas são as posições do bloco é
+    simulada sem fixar o tabuleiro: a primeira vez que um salto toca uma
+    posição fixa o valor que ela precisa ter no início, e sequências que
+    exigiriam valores contraditórios são descartadas. Sobram as que trocam
+    o valor só das posições do bloco, todas inicialmente com peças.
+    Sequências diferentes com as mesmas exigências dão um único padrão.
+
+    Arguments:
+        bloco {tuple} -- posições (linha, coluna) relativas, não negativas
+
+    Returns:
+        list -- Padrao encontrados
+    """
+    regiao = {(linha + 1 + dl, coluna + 1 + dc) for linha, coluna in bloco
+              for dl in (-1, 0, 1) for dc in (-1, 0, 1)}
+    geometria = resta_um.compilar_tabuleiro(sorted(regiao), f'vizinhança de {len(bloco)}')
+    mascara_bloco = sum(geometria.bits[(linha + 1, coluna + 1)] for linha, coluna in bloco)
+    saltos = geometria.saltos
+    total = len(bloco)
+    encontrados = {}
+    visitados = set()
+    caminho = []
+
+    def buscar(trocadas, conhecidas, valores):
+        restantes = total - len(caminho)
+        if not restantes:
+            if trocadas == mascara_bloco and valores & mascara_bloco == mascara_bloco:
+                encontrados.setdefault((conhecidas, valores), list(caminho))
+            return
+        # cada salto troca o valor de três posições
+        if bin(trocadas ^ mascara_bloco).count('1') > 3 * restantes:
+            return
+        estado = (restantes, trocadas, conhecidas, valores)
+        if estado in visitados:
+            return
+        visitados.add(estado)
+        for salto in saltos:
+            mascara = salto.mascara
+            # valor que cada posição do salto precisa ter no início
+            exigidos = (salto.origem_saltada ^ trocadas) & mascara
+            if (valores ^ exigidos) & conhecidas & mascara:
+                continue
+            caminho.append(salto)
+            buscar(trocadas ^ mascara, conhecidas | mascara, (valores & ~mascara) | exigidos)
+            caminho.pop()
+
+    buscar(0, 0, 0)
+    padroes = []
+    for (conhecidas, valores), sequencia in encontrados.items():
+        exigidas = tuple(((linha - 1, coluna - 1), 1 if valores & bit else 0)
+                         for (linha, coluna), bit in geometria.bits.items() if conhecidas & bit)
+        movimentos = tuple(((salto.origem[0] - 1, salto.origem[1] - 1), salto.movimento.direcao)
+                           for salto in sequencia)
+        padroes.append(Padrao(tuple(bloco), exigidas, movimentos))
+    return padroes
+
+
+# padrões de cada tamanho de bloco, nas duas orientações, gerados na primeira consulta
+_PADROES = {}
+
+
+def padroes(tamanho: int):
+    """Retorna os padrões que limpam os blocos de um tamanho, deitados e de pé.
+
+    Arguments:
+        tamanho {int} -- uma das chaves de BLOCOS
+
+    Returns:
+        list -- Padrao
+    """
+    if tamanho not in _PADROES:
+        deitados = gerar_padroes(BLOCOS[tamanho])
+        _PADROES[tamanho] = deitados + [padrao.transposto() for padrao in deitados]
+    return _PADROES[tamanho]
+
+
+class Pacote:
+    """
+    Padrao posicionado em um tabuleiro: aplicável quando
+    bits & mascara == exigido, e então limpa as posições de bloco com os saltos.
+    """
+    __slots__ = ('bloco', 'mascara', 'exigido', 'saltos')
+
+    def __init__(self, bloco: int, mascara: int, exigido: int, saltos: tuple):
+        self.bloco = bloco
+        self.mascara = mascara
+        self.exigido = exigido
+        self.saltos = saltos
+
+    def __repr__(self):
+        return f"Pacote({', '.join(str(salto.movimento) for salto in self.saltos)})"
+
+
+def _dominantes(pacotes):
+    """Descarta os pacotes de um bloco cujas exigências incluem as de outro.
+
+    Um pacote que exige as mesmas posições com os mesmos valores de outro,
+    e mais algumas, só se aplica quando o outro também se aplica.
+
+    Arguments:
+        pacotes {iterable} -- Pacote que limpam o mesmo bloco
+
+    Returns:
+        list -- pacotes restantes, dos que exigem menos posições aos que exigem mais
+    """
+    restantes = []
+    for pacote in sorted(pacotes, key=lambda pacote: bin(pacote.mascara).count('1')):
+        if not any(outro.mascara & pacote.mascara == outro.mascara
+                   and pacote.exigido & outro.mascara == outro.exigido for outro in restantes):
+            restantes.append(pacote)
+    return restantes
+
+
+class Biblioteca:
+    """
+    Pacotes de um tabuleiro agrupados pelo bloco que limpam.
+
+    Todos os pacotes de um bloco levam ao mesmo estado, então basta achar um
+    aplicável; os blocos sem todas as posições ocupadas são descartados com
+    uma única comparação de máscara antes de consultar seus pacotes.
+    """
+    def __init__(self, geometria, tamanhos=tuple(BLOCOS)):
+        """Posiciona os padrões em todos os lugares do tabuleiro onde cabem.
+
+        Arguments:
+            geometria {Geometria} -- tabuleiro
+
+        Keyword Arguments:
+            tamanhos {tuple} -- tamanhos de bloco, chaves de BLOCOS (default: {todos})
+        """
+        self.geometria = geometria
+        bits = geometria.bits
+        por_bloco = {}
+        for tamanho in tamanhos:
+            for padrao in padroes(tamanho):
+                for linha in range(-1, geometria.altura + 1):
+                    for coluna in range(-1, geometria.largura + 1):
+                        exigidas = [((l + linha, c + coluna), valor) for (l, c), valor in padrao.exigidas]
+                        if any(posicao not in bits for posicao, _ in exigidas):
+                            continue
+                        bloco = sum(bits[(l + linha, c + coluna)] for l, c in padrao.bloco)
+                        mascara = sum(bits[posicao] for posicao, _ in exigidas)
+                        exigido = sum(bits[posicao] for posicao, valor in exigidas if valor)
+                        pacotes = por_bloco.setdefault(bloco, {})
+                        if (mascara, exigido) not in pacotes:
+                            saltos = tuple(geometria.salto_por_movimento[((l + linha, c + coluna), direcao)]
+                                           for (l, c), direcao in padrao.movimentos)
+                            pacotes[(mascara, exigido)] = Pacote(bloco, mascara, exigido, saltos)
+        # (máscara do bloco, pacotes que o limpam), na ordem das posições
+        self.blocos = [(bloco, _dominantes(pacotes.values())) for bloco, pacotes in sorted(por_bloco.items())]
+
+    def __len__(self):
+        return sum(len(pacotes) for _, pacotes in self.blocos)
+
+    def __repr__(self):
+        return f"Biblioteca({self.geometria.nome}: {len(self)} pacotes em {len(self.blocos)} blocos)"
+
+    def aplicaveis(self, bits: int):
+        """Retorna um pacote aplicável para cada bloco que pode ser limpo.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            list -- Pacote, um por bloco
+        """
+        resultado = []
+        for bloco, pacotes in self.blocos:
+            if bits & bloco == bloco:
+                for pacote in pacotes:
+                    if bits & pacote.mascara == pacote.exigido:
+                        resultado.append(pacote)
+                        break
+        return resultado
+
+
+_BIBLIOTECAS = {}
+
+
+def biblioteca(geometria, tamanhos=tuple(BLOCOS)):
+    """Retorna a biblioteca de pacotes do tabuleiro, montada uma única vez.
+
+    Arguments:
+        geometria {Geometria} -- tabuleiro
+
+    Keyword Arguments:
+        tamanhos {tuple} -- tamanhos de bloco, chaves de BLOCOS (default: {todos})
+
+    Returns:
+        Biblioteca -- pacotes do tabuleiro
+    """
+    chave = (geometria, tuple(sorted(tamanhos)))
+    if chave not in _BIBLIOTECAS:
+        _BIBLIOTECAS[chave] = Biblioteca(geometria, tamanhos)
+    return _BIBLIOTECAS[chave]
+
+
+class SolucionadorPacotes(resta_um.SolucionadorResta1):
+    """
+    Busca em profundidade em que cada aresta é um pacote inteiro.
+
+    Em cada estado são tentados os blocos que algum pacote limpa, ordenados
+    pela avaliação da ordenação no estado resultante; só quando nenhum
+    pacote se aplica a busca recorre aos saltos simples. Os saltos de cada
+    pacote são feitos um a um no jogo, então a solução fica em
+    jogo.movimentos como na busca comum, um Movimento por salto.
+
+    Restrita aos pacotes, a busca pode deixar de encontrar soluções que
+    existem: se algum pacote foi usado e a busca falhou, a situação é
+    'interrompido'. Com completo=True os saltos simples também são tentados
+    depois dos pacotes e a busca volta a ser exaustiva.
+    """
+    def __init__(self, jogo, completo=False, tamanhos=tuple(BLOCOS), **opcoes):
+        """Inicializa o solucionador para o jogo.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Keyword Arguments:
+            completo {bool} -- tentar também os saltos simples em estados com
+            pacotes aplicáveis (default: {False})
+            tamanhos {tuple} -- tamanhos de bloco dos pacotes, chaves de
+            BLOCOS (default: {todos})
+            opcoes -- argumentos de SolucionadorResta1, exceto largura_feixe
+
+        Raises:
+            ValueError -- se largura_feixe for informado
+        """
+        if opcoes.get('largura_feixe'):
+            raise ValueError("A busca por pacotes não faz busca em feixe")
+        super().__init__(jogo, **opcoes)
+        self.completo = completo
+        self.tamanhos = tamanhos
+        self.biblioteca = None
+        # arestas da última busca que foram pacotes, e se ela terminou sem
+        # solução por só ter tentado os pacotes onde eles se aplicavam
+        self.pacotes_usados = 0
+        self.restrita_esgotada = False
+
+    def solucionar(self, recursivo=True, continuar=False, timeout=None, max_nos=None):
+        self.biblioteca = biblioteca(self.jogo.geometria, self.tamanhos)
+        self.pacotes_usados = 0
+        self.restrita_esgotada = False
+        inicio = 0 if not continuar else len(self.jogo.movimentos)
+        tem_solucao = super().solucionar(recursivo, continuar, timeout, max_nos)
+        if self.situacao == 'sem_solucao' and self.pacotes_usados and not self.completo:
+            # estados com pacotes não tiveram os saltos simples tentados
+            self.situacao = 'interrompido'
+            self.restrita_esgotada = True
+            for movimento in self.melhor_movimentos[inicio:]:
+                self.jogo.mover(movimento)
+        return tem_solucao
+
+    def _arestas_do_no(self):
+        """Retorna as arestas a tentar no estado atual.
+
+        Returns:
+            list -- tuplas de saltos, uma por pacote aplicável seguidas, se não
+            houver pacotes ou com completo, de uma por salto válido
+        """
+        jogo = self.jogo
+        bits = jogo.compactar()
+        pacotes = self.biblioteca.aplicaveis(bits)
+        if len(pacotes) > 1 and self._ordenacao_por_no is not None:
+            avaliar = self.ordenacao.avaliar
+            pacotes.sort(key=lambda pacote: avaliar(bits ^ pacote.bloco))
+        arestas = [pacote.saltos for pacote in pacotes]
+        if not arestas or self.completo:
+            arestas += [(salto,) for salto in self._saltos_do_no()]
+        return arestas
+
+    def _solucionar(self):
+        """Tenta solucionar o jogo utilizando backtracking sobre os pacotes.
+
+        Returns:
+            bool -- True se existe solução, False se não existe solução.
+        """
+        jogo = self.jogo
+        if jogo.pecas_restantes == 1:
+            if jogo.esta_solucionado():
+                return True
+
+        if jogo.pecas_restantes <= self.melhor_pecas:
+            self._registrar_melhor(jogo.pecas_restantes, jogo.compactar(), jogo.movimentos)
+        if self.total_de_movimentos >= self._proxima_verificacao:
+            self._verificar_limites()
+        tabela = self.tabela_transposicao
+        estatisticas = self.estatisticas
+        if self._podas_por_no or tabela is not None:
+            bits = jogo.compactar()
+            for poda in self._podas_por_no:
+                if poda.podar(bits):
+                    if estatisticas is not None:
+                        estatisticas.no_podado(jogo.pecas_restantes)
+                    return False
+            if tabela is not None:
+                chave = tabela.chave(bits)
+                if tabela.contem(chave):
+                    if estatisticas is not None:
+                        estatisticas.acerto(jogo.pecas_restantes)
+                    return False
+
+        arestas = self._arestas_do_no()
+        if estatisticas is not None:
+            estatisticas.no_expandido(jogo.pecas_restantes, len(arestas), self.total_de_movimentos)
+        for saltos in arestas:
+            for salto in saltos:
+                jogo.saltar(salto)
+            self.total_de_movimentos += 1
+            if len(saltos) > 1:
+                self.pacotes_usados += 1
+            if self._solucionar():
+                return True
+            for _ in saltos:
+                jogo.desfazer_movimento()
+
+        if tabela is not None:
+            tabela.adicionar(chave, self._posicoes - jogo.pecas_restantes)
+        if estatisticas is not None:
+            estatisticas.retrocesso(jogo.pecas_restantes, self.total_de_movimentos, jogo.movimentos)
+        return False
+
+    def _solucionar_nao_recursivo(self):
+        # cada nível da recursão remove ao menos uma peça, então a
+        # profundidade é limitada pelo tamanho do tabuleiro
+        return self._solucionar()
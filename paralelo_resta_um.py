@@ -0,0 +1,289 @@
+#encoding: utf-8
+
+import multiprocessing
+import queue
+import threading
+import time
+
+import resta_um
+
+# Tabelas de transposição de cada processo trabalhador, por objetivo do jogo.
+# Os estados sem solução continuam sem solução em qualquer subárvore, então a
+# tabela é reaproveitada entre as tarefas que o mesmo processo executa. As
+# contagens de soluções são reaproveitadas da mesma forma.
+_tabelas_do_processo = {}
+_contagens_do_processo = {}
+
+# Número de processos ociosos, mantido pelo processo principal, e fila por
+# onde os trabalhadores enviam os prefixos que cedem a eles. Recebidos em
+# _iniciar_processo.
+_ociosos = None
+_cedidos = None
+
+
+def _iniciar_processo(ociosos, cedidos):
+    """Guarda os objetos compartilhados no processo trabalhador.
+
+    Arguments:
+        ociosos {multiprocessing.Value} -- número de processos sem tarefa
+        cedidos {multiprocessing.Queue} -- fila de listas de prefixos cedidos
+    """
+    global _ociosos, _cedidos
+    _ociosos = ociosos
+    _cedidos = cedidos
+
+
+def _observador_ceder(cedidos: list):
+    """Cria o observador que cede trabalho a processos ociosos.
+
+    Registrado com SolucionadorResta1.observar(a_cada_nos=limite_nos), o
+    observador verifica se há processos ociosos e, se houver, retira da busca
+    os saltos ainda não tentados do estado mais raso do caminho atual e envia
+    os prefixos correspondentes ao processo principal.
+
+    Arguments:
+        cedidos {list} -- recebe o número de prefixos cedidos a cada cessão
+
+    Returns:
+        function -- observador para o SolucionadorResta1
+    """
+    def observador(solver):
+        with _ociosos.get_lock():
+            if _ociosos.value <= 0:
+                return
+            movimentos, saltos = solver.ceder_saltos()
+            if not saltos:
+                return
+            _ociosos.value = max(0, _ociosos.value - len(saltos))
+        prefixo = tuple(resta_um.SALTO_POR_MOVIMENTO[(mov.posicao, mov.direcao)].indice for mov in movimentos)
+        _cedidos.put([prefixo + (salto.indice,) for salto in saltos])
+        cedidos.append(len(saltos))
+
+    return observador
+
+
+def expandir_prefixos(jogo, profundidade: int, deduplicar=True):
+    """Expande a árvore de busca até a profundidade informada.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro no estado de onde a expansão começa
+        profundidade {int} -- número de saltos de cada prefixo
+
+    Keyword Arguments:
+        deduplicar {bool} -- descartar prefixos que levam a estados
+        equivalentes por simetria a um já expandido. Suas subárvores têm
+        soluções equivalentes, então o descarte só serve para encontrar uma
+        solução, não para enumerá-las. (default: {True})
+
+    Returns:
+        list -- prefixos, cada um uma tupla de índices de resta_um.SALTOS.
+        Prefixos mais curtos aparecem quando o jogo acaba antes da profundidade.
+    """
+    tabela = resta_um.TabelaTransposicao(resta_um.simetrias_do_jogo(jogo))
+    prefixos = []
+
+    def expandir(prefixo):
+        if deduplicar:
+            chave = tabela.chave(jogo.compactar())
+            if tabela.contem(chave):
+                return
+            tabela.adicionar(chave)
+
+        saltos = jogo.saltos_validos()
+        if len(prefixo) == profundidade or not saltos:
+            prefixos.append(prefixo)
+            return
+        for salto in saltos:
+            jogo.saltar(salto)
+            expandir(prefixo + (salto.indice,))
+            jogo.desfazer_movimento()
+
+    expandir(())
+    return prefixos
+
+
+def _resolver_prefixo(pos_inicial, peca_final_no_buraco_inicial, estado, prefixo, opcoes, limite_nos,
+                      contar=False):
+    """Soluciona a subárvore de um prefixo. Executado nos processos trabalhadores.
+
+    Arguments:
+        pos_inicial {tuple} -- posição do buraco inicial
+        peca_final_no_buraco_inicial {bool} -- objetivo do jogo
+        estado {int} -- posição inicial compactada, None para o tabuleiro cheio
+        prefixo {tuple} -- índices de resta_um.SALTOS a partir do início do jogo
+        opcoes {dict} -- argumentos de resta_um.SolucionadorResta1
+        limite_nos {int} -- número de nós entre as verificações de processos
+        ociosos, None para nunca ceder trabalho (ver _observador_ceder)
+
+    Keyword Arguments:
+        contar {bool} -- explorar a subárvore inteira, contando todas as
+        soluções em vez de parar na primeira (default: {False})
+
+    Returns:
+        dict -- situação ('solucao' ou 'sem_solucao'), saltos da (primeira)
+        solução, número de soluções, número de prefixos cedidos a outros
+        processos e contadores da busca
+    """
+    jogo = resta_um.TabuleiroBits(pos_inicial, peca_final_no_buraco_inicial, estado)
+    for indice in prefixo:
+        jogo.saltar(resta_um.SALTOS[indice])
+
+    cedidos = []
+    ceder = limite_nos is not None and not contar
+    solver = resta_um.SolucionadorResta1(jogo, **opcoes)
+    if ceder:
+        solver.observar(_observador_ceder(cedidos), a_cada_nos=limite_nos)
+    alvo = tuple(pos_inicial) if peca_final_no_buraco_inicial else None
+    chave_tabela = (alvo, peca_final_no_buraco_inicial)
+    solver.tabela_transposicao = _tabelas_do_processo.get(chave_tabela)
+
+    resultado = {'prefixo': prefixo, 'saltos': [], 'solucoes': 0}
+    if contar:
+        solver.contagens = _contagens_do_processo.get(chave_tabela)
+        resultado['solucoes'] = solver.contar_solucoes(continuar=True)
+        _contagens_do_processo[chave_tabela] = solver.contagens
+        if resultado['solucoes']:
+            resultado['situacao'] = 'solucao'
+            primeira = next(solver.gerar_solucoes())
+            resultado['saltos'] = list(prefixo) + [resta_um.SALTO_POR_MOVIMENTO[(mov.posicao, mov.direcao)].indice
+                                                   for mov in primeira]
+        else:
+            resultado['situacao'] = 'sem_solucao'
+    else:
+        # só a busca não recursiva expõe os saltos ainda não tentados do caminho
+        if solver.solucionar(recursivo=not ceder, continuar=True):
+            resultado['situacao'] = 'solucao'
+            resultado['saltos'] = [resta_um.SALTO_POR_MOVIMENTO[(mov.posicao, mov.direcao)].indice
+                                   for mov in jogo.movimentos]
+        else:
+            resultado['situacao'] = 'sem_solucao'
+        if solver.tabela_transposicao is not None:
+            _tabelas_do_processo[chave_tabela] = solver.tabela_transposicao
+
+    resultado['cedidos'] = sum(cedidos)
+    resultado['total_de_movimentos'] = solver.total_de_movimentos
+    resultado['podados'] = [poda.podados for poda in solver.podas]
+    return resultado
+
+
+class SolucionadorParalelo:
+    """
+    Solucionador que divide a árvore de busca em prefixos de movimentos e
+    soluciona as subárvores em um conjunto de processos.
+    """
+    def __init__(self, jogo, trabalhadores: int, profundidade_prefixo=3, limite_nos=None, **opcoes):
+        """Inicializa o solucionador paralelo.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+            trabalhadores {int} -- número de processos
+
+        Keyword Arguments:
+            profundidade_prefixo {int} -- número de saltos expandidos antes de
+            distribuir as subárvores (default: {3})
+            limite_nos {int} -- se informado, a cada esse número de nós
+            cada processo verifica se há processos ociosos e, se houver, cede
+            a eles os saltos ainda não tentados do estado mais raso do seu
+            caminho, para que nenhum processo fique com todo o trabalho
+            restante. Sem processos ociosos nada é dividido. (default: {None})
+            opcoes -- demais argumentos de resta_um.SolucionadorResta1, usados
+            em cada processo (transposicao, capacidade_cache, podas...)
+        """
+        self.jogo = jogo
+        self.trabalhadores = trabalhadores
+        self.profundidade_prefixo = profundidade_prefixo
+        self.limite_nos = limite_nos
+        self.opcoes = opcoes
+        self.podas = list(opcoes.get('podas', ()))
+        self.total_de_movimentos = 0
+        self.subarvores = 0
+        self.divisoes = 0
+        self.tempo = 0
+        self.solucoes = []
+        self.total_solucoes = 0
+
+    def solucionar(self, parar_na_primeira=True):
+        """Soluciona o jogo se possível.
+
+        Keyword Arguments:
+            parar_na_primeira {bool} -- Se True todos os processos são
+            interrompidos assim que uma solução é encontrada, e o jogo fica com
+            os movimentos dessa solução. Se False cada prefixo, sem descarte
+            por simetria, é explorado até o fim: total_solucoes recebe o
+            número de todas as soluções e a primeira solução de cada subárvore
+            solucionável é guardada em solucoes. Nesse modo os processos não
+            cedem trabalho por limite_nos. (default: {True})
+
+        Returns:
+            bool -- Retorna True se encontrar uma solução, False caso contrário.
+        """
+        self.jogo.reset()
+        self.total_de_movimentos = 0
+        self.subarvores = 0
+        self.divisoes = 0
+        self.solucoes = []
+        self.total_solucoes = 0
+        for poda in self.podas:
+            poda.podados = 0
+        tempo_inicio = time.time()
+
+        prefixos = expandir_prefixos(self.jogo, self.profundidade_prefixo, parar_na_primeira)
+        resultados = queue.Queue()
+        ociosos = multiprocessing.Value('i', 0)
+        cedidos = multiprocessing.Queue()
+
+        def encaminhar_cedidos():
+            for filhos in iter(cedidos.get, None):
+                resultados.put({'situacao': 'cedidos', 'filhos': filhos})
+
+        threading.Thread(target=encaminhar_cedidos, name="Cedidos", daemon=True).start()
+        # pendentes inclui os prefixos cedidos ainda não recebidos, que
+        # só chegam depois do resultado da tarefa que os cedeu
+        pendentes = 0
+        em_execucao = 0
+        with multiprocessing.Pool(self.trabalhadores, _iniciar_processo, (ociosos, cedidos)) as pool:
+            def enviar(prefixo):
+                args = (self.jogo.pos_inicial, self.jogo.peca_final_no_buraco_inicial,
+                        self.jogo.estado, prefixo, self.opcoes, self.limite_nos, not parar_na_primeira)
+                pool.apply_async(_resolver_prefixo, args,
+                                 callback=resultados.put, error_callback=resultados.put)
+
+            for prefixo in prefixos:
+                enviar(prefixo)
+            pendentes = em_execucao = len(prefixos)
+
+            while pendentes:
+                ociosos.value = max(0, self.trabalhadores - em_execucao)
+                resultado = resultados.get()
+                if isinstance(resultado, BaseException):
+                    pool.terminate()
+                    raise resultado
+
+                if resultado['situacao'] == 'cedidos':
+                    self.divisoes += 1
+                    for filho in resultado['filhos']:
+                        enviar(filho)
+                    em_execucao += len(resultado['filhos'])
+                    continue
+
+                pendentes += resultado['cedidos'] - 1
+                em_execucao -= 1
+                self.subarvores += 1
+                self.total_de_movimentos += resultado['total_de_movimentos']
+                self.total_solucoes += resultado['solucoes']
+                for poda, podados in zip(self.podas, resultado['podados']):
+                    poda.podados += podados
+
+                if resultado['situacao'] == 'solucao':
+                    self.solucoes.append([resta_um.SALTOS[indice].movimento
+                                          for indice in resultado['saltos']])
+                    if parar_na_primeira:
+                        pool.terminate()
+                        break
+        cedidos.put(None)
+
+        if self.solucoes:
+            for movimento in self.solucoes[0]:
+                self.jogo.mover(movimento)
+        self.tempo = time.time() - tempo_inicio
+        return bool(self.solucoes)
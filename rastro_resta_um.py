@@ -0,0 +1,280 @@
+#encoding: utf-8
+
+import mmap
+import os
+import struct
+
+import resta_um
+
+# Cabeçalho do arquivo: identificação, versão do formato, situação da busca
+# (0 em andamento, senão 1 + índice em resta_um.SITUACOES), profundidade máxima
+# guardada em cada ponto de controle, número de saltos da tabela SALTOS,
+# eventos entre pontos de controle e o tabuleiro compactado no início da busca
+CABECALHO = struct.Struct('<4sBBBBHxxQ')
+IDENTIFICACAO = b'R1RT'
+VERSAO_FORMATO = 1
+
+# Evento que desfaz o último salto; os outros eventos são o Salto.indice do salto
+DESFAZER = 0xFF
+
+INTERVALO_PADRAO = 4096
+
+
+class GravadorRastro:
+    """
+    Grava em arquivo os saltos e os saltos desfeitos de uma busca.
+
+    Cada evento ocupa um byte: o índice do salto em SALTOS, ou DESFAZER. Os
+    eventos são gravados em blocos de intervalo eventos, cada um precedido de
+    um ponto de controle com os saltos do caminho no início do bloco, de modo
+    que LeitorRastro chega a qualquer evento refazendo no máximo um bloco.
+
+    É registrado como observador por salto do solucionador:
+
+        gravador = GravadorRastro('busca.rastro', jogo)
+        solver.observar(gravador)
+        solver.solucionar()
+        gravador.fechar(solver.situacao)
+    """
+    def __init__(self, arquivo: str, jogo, intervalo=INTERVALO_PADRAO):
+        """Cria o arquivo do rastro a partir do estado atual do jogo.
+
+        Arguments:
+            arquivo {str} -- caminho do arquivo do rastro
+            jogo {Tabuleiro} -- tabuleiro que será alterado pela busca
+
+        Keyword Arguments:
+            intervalo {int} -- eventos entre pontos de controle (default: {INTERVALO_PADRAO})
+
+        Raises:
+            ValueError -- se intervalo não couber no cabeçalho ou se os índices
+            de SALTOS não couberem em um byte
+        """
+        if not 0 < intervalo <= 0xFFFF:
+            raise ValueError(f"Intervalo entre pontos de controle inválido: {intervalo}")
+        if len(resta_um.SALTOS) > DESFAZER:
+            raise ValueError("Os índices de SALTOS não cabem em um byte")
+        self.intervalo = intervalo
+        self.inicial = jogo.compactar()
+        self.capacidade = bin(self.inicial).count('1')
+        self.eventos = 0
+        self._base = len(jogo.movimentos)
+        self._pilha = bytearray()
+        self._bloco = bytearray()
+        self._arquivo = open(arquivo, 'wb')
+        self._escrever_cabecalho(0)
+        # o cabeçalho já fica visível para quem lê o rastro durante a busca
+        self._arquivo.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def __call__(self, solver):
+        """Grava o evento que acabou de acontecer no tabuleiro do solucionador.
+
+        Arguments:
+            solver {SolucionadorResta1} -- solucionador que notificou o evento
+        """
+        movimentos = solver.jogo.movimentos
+        if len(movimentos) - self._base > len(self._pilha):
+            movimento = movimentos[-1]
+            self.salto(resta_um.SALTO_POR_MOVIMENTO[(tuple(movimento.posicao), movimento.direcao)].indice)
+        else:
+            self.desfazer()
+
+    def salto(self, indice: int):
+        """Grava um salto.
+
+        Arguments:
+            indice {int} -- índice do salto em SALTOS
+        """
+        self._evento(indice)
+        self._pilha.append(indice)
+
+    def desfazer(self):
+        """Grava o desfazer do último salto."""
+        self._evento(DESFAZER)
+        self._pilha.pop()
+
+    def _evento(self, evento: int):
+        bloco = self._bloco
+        if not bloco:
+            self._arquivo.write(self._ponto_de_controle())
+        bloco.append(evento)
+        self.eventos += 1
+        if len(bloco) == self.intervalo:
+            self._arquivo.write(bloco)
+            self._arquivo.flush()
+            bloco.clear()
+
+    def _ponto_de_controle(self):
+        """Retorna o ponto de controle do caminho atual: profundidade e índices
+        dos saltos, completado com zeros até a capacidade."""
+        pilha = self._pilha
+        return bytes([len(pilha)]) + pilha + bytes(self.capacidade - len(pilha))
+
+    def _escrever_cabecalho(self, situacao: int):
+        self._arquivo.write(CABECALHO.pack(IDENTIFICACAO, VERSAO_FORMATO, situacao, self.capacidade,
+                                           len(resta_um.SALTOS), self.intervalo, self.inicial))
+
+    def fechar(self, situacao=None):
+        """Grava os eventos pendentes e a situação final da busca e fecha o arquivo.
+
+        Keyword Arguments:
+            situacao {str} -- uma de resta_um.SITUACOES, None se a busca não
+            terminou (default: {None})
+        """
+        arquivo = self._arquivo
+        if arquivo.closed:
+            return
+        arquivo.write(self._bloco)
+        self._bloco.clear()
+        arquivo.seek(0)
+        self._escrever_cabecalho(0 if situacao is None else resta_um.SITUACOES.index(situacao) + 1)
+        arquivo.close()
+
+
+class LeitorRastro:
+    """
+    Lê um rastro gravado por GravadorRastro mapeando o arquivo em memória.
+
+    O rastro pode ser lido enquanto ainda é gravado: atualizar() passa a ver
+    os blocos gravados desde a última leitura.
+    """
+    def __init__(self, arquivo: str):
+        """Abre o rastro.
+
+        Arguments:
+            arquivo {str} -- caminho do arquivo do rastro
+
+        Raises:
+            ValueError -- se o arquivo não for um rastro compatível com SALTOS
+        """
+        self._arquivo = open(arquivo, 'rb')
+        self._mapa = None
+        self._tamanho = 0
+        cabecalho = self._arquivo.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            raise ValueError(f"{arquivo} não é um rastro do resta 1")
+        identificacao, versao, _, self.capacidade, saltos, self.intervalo, self.inicial = \
+            CABECALHO.unpack(cabecalho)
+        if identificacao != IDENTIFICACAO or versao != VERSAO_FORMATO:
+            raise ValueError(f"{arquivo} não é um rastro do resta 1 na versão {VERSAO_FORMATO}")
+        if saltos != len(resta_um.SALTOS):
+            raise ValueError(f"{arquivo} foi gravado com outra tabela de saltos")
+        self._bytes_bloco = 1 + self.capacidade + self.intervalo
+        self.situacao = None
+        self.eventos = 0
+        self.atualizar()
+
+    def __len__(self):
+        return self.eventos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        if self._mapa is not None:
+            self._mapa.close()
+        self._arquivo.close()
+
+    def atualizar(self):
+        """Passa a ver os eventos gravados desde a última leitura.
+
+        Returns:
+            int -- número de eventos do rastro
+        """
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        if tamanho != self._tamanho:
+            if self._mapa is not None:
+                self._mapa.close()
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            self._tamanho = tamanho
+        situacao = self._mapa[5]
+        self.situacao = resta_um.SITUACOES[situacao - 1] if situacao else None
+
+        corpo = tamanho - CABECALHO.size
+        blocos, resto = divmod(corpo, self._bytes_bloco)
+        self.eventos = blocos * self.intervalo + max(0, resto - 1 - self.capacidade)
+        return self.eventos
+
+    def _inicio_bloco(self, bloco: int):
+        return CABECALHO.size + bloco * self._bytes_bloco
+
+    def evento(self, indice: int):
+        """Retorna um evento do rastro.
+
+        Arguments:
+            indice {int} -- posição do evento, de 0 a len(self) - 1
+
+        Returns:
+            int -- índice do salto em SALTOS, ou DESFAZER
+        """
+        bloco, deslocamento = divmod(indice, self.intervalo)
+        return self._mapa[self._inicio_bloco(bloco) + 1 + self.capacidade + deslocamento]
+
+    def eventos_entre(self, inicio: int, fim: int):
+        """Gera os eventos de inicio (inclusive) a fim (exclusive), lendo um
+        bloco de cada vez."""
+        while inicio < fim:
+            bloco, deslocamento = divmod(inicio, self.intervalo)
+            quantos = min(fim - inicio, self.intervalo - deslocamento)
+            posicao = self._inicio_bloco(bloco) + 1 + self.capacidade + deslocamento
+            yield from self._mapa[posicao:posicao + quantos]
+            inicio += quantos
+
+    def caminho(self, indice: int):
+        """Retorna o caminho da busca depois dos primeiros eventos do rastro.
+
+        Arguments:
+            indice {int} -- número de eventos já acontecidos, de 0 a len(self)
+
+        Returns:
+            list -- índices em SALTOS dos saltos do caminho
+        """
+        if not 0 <= indice <= self.eventos:
+            raise IndexError(f"Evento fora do rastro: {indice}")
+        if indice == 0:
+            return []
+        # o ponto de controle do bloco do evento anterior dispensa um bloco
+        # inexistente quando indice é o fim de um bloco completo
+        bloco = (indice - 1) // self.intervalo
+        posicao = self._inicio_bloco(bloco)
+        profundidade = self._mapa[posicao]
+        pilha = list(self._mapa[posicao + 1:posicao + 1 + profundidade])
+        for evento in self.eventos_entre(bloco * self.intervalo, indice):
+            if evento == DESFAZER:
+                pilha.pop()
+            else:
+                pilha.append(evento)
+        return pilha
+
+    def solucao(self):
+        """Retorna o número de eventos até a solução, se a busca encontrou uma.
+
+        Returns:
+            int -- len(self) se a busca terminou solucionada, None caso contrário
+        """
+        return self.eventos if self.situacao == 'solucionado' else None
+
+
+def compactar_caminho(inicial: int, caminho):
+    """Retorna o tabuleiro compactado depois dos saltos de um caminho.
+
+    Arguments:
+        inicial {int} -- tabuleiro compactado no início da busca
+        caminho {list} -- índices em SALTOS
+
+    Returns:
+        int -- tabuleiro compactado
+    """
+    bits = inicial
+    for indice in caminho:
+        bits ^= resta_um.SALTOS[indice].mascara
+    return bits
@@ -1,14 +1,11 @@
 #encoding: utf-8
 
 import argparse
+import heapq
+import json
 import time
 import os
-
-try:
-    import visualizacao_resta_um
-    no_pygame = False
-except ModuleNotFoundError:
-    no_pygame = True
+from collections import OrderedDict
 
 """
      N
@@ -29,16 +26,106 @@ DELTAS_MOVER = {'N': -2, 'S': 2, 'O': -2, 'L': 2}
 # Distância da peça adjacente (será saltada)
 DELTAS_REMOVER = {'N': -1, 'S': 1, 'O': -1, 'L': 1}
 
-# Lista de coordenadas válidas para o tabuleiro
-COORDS_VALIDAS = (
-                    (0, 2), (0, 3), (0, 4),
-                    (1, 2), (1, 3), (1, 4),
-    (2, 0), (2, 1), (2, 2), (2, 3), (2, 4), (2, 5), (2, 6),
-    (3, 0), (3, 1), (3, 2), (3, 3), (3, 4), (3, 5), (3, 6),
-    (4, 0), (4, 1), (4, 2), (4, 3), (4, 4), (4, 5), (4, 6),
-                    (5, 2), (5, 3), (5, 4),
-                    (6, 2), (6, 3), (6, 4)
-    )
+# Versão do solucionador, usada para invalidar resultados guardados em disco
+# quando a busca ou o formato dos resultados mudam
+VERSAO_SOLUCIONADOR = '3'
+
+# Máscaras dos tabuleiros conhecidos, por nome (ver compilar_tabuleiro)
+MASCARAS_TABULEIROS = {
+    'ingles': (
+        '  ooo  ',
+        '  ooo  ',
+        'ooooooo',
+        'ooooooo',
+        'ooooooo',
+        '  ooo  ',
+        '  ooo  ',
+    ),
+    'frances': (
+        '  ooo  ',
+        ' ooooo ',
+        'ooooooo',
+        'ooooooo',
+        'ooooooo',
+        ' ooooo ',
+        '  ooo  ',
+    ),
+    'alemao': (
+        '   ooo   ',
+        '   ooo   ',
+        '   ooo   ',
+        'ooooooooo',
+        'ooooooooo',
+        'ooooooooo',
+        '   ooo   ',
+        '   ooo   ',
+        '   ooo   ',
+    ),
+    'diamante': (
+        '    o    ',
+        '   ooo   ',
+        '  ooooo  ',
+        ' ooooooo ',
+        'ooooooooo',
+        ' ooooooo ',
+        '  ooooo  ',
+        '   ooo   ',
+        '    o    ',
+    ),
+}
+
+# Caracteres de uma máscara: posições do tabuleiro e posições fora dele
+CARACTERES_POSICAO = 'oO*x1'
+CARACTERES_FORA = ' .-_'
+
+
+def ler_estado(estado, geometria=None):
+    """Converte uma posição do jogo para o tabuleiro compactado.
+
+    Arguments:
+        estado {str, list, int} -- uma string com um caractere '0'/'1' por
+        posição na ordem de COORDS_VALIDAS (33 no tabuleiro inglês), uma
+        string no formato de Tabuleiro.ident() (49 caracteres no inglês), uma
+        matriz como Tabuleiro.tabuleiro ou o próprio inteiro compactado
+
+    Keyword Arguments:
+        geometria {Geometria} -- tabuleiro do estado (default: {INGLES})
+
+    Raises:
+        ValueError -- se o estado não estiver em um formato válido ou não
+        tiver peças
+
+    Returns:
+        int -- tabuleiro compactado
+    """
+    geometria = geometria or INGLES
+    coords = geometria.coords_validas
+    if isinstance(estado, bool):
+        raise ValueError(f"Estado inválido: {estado!r}")
+    if isinstance(estado, int):
+        bits = estado
+        if not 0 <= bits <= geometria.tabuleiro_cheio:
+            raise ValueError(f"Tabuleiro compactado fora do intervalo: {estado}")
+    elif isinstance(estado, str):
+        texto = ''.join(estado.split())
+        if len(texto) == geometria.altura * geometria.largura:
+            texto = ''.join(texto[linha * geometria.largura + coluna] for linha, coluna in coords)
+        if len(texto) != len(coords) or set(texto) - {'0', '1'}:
+            raise ValueError(f"Estado inválido: {estado!r}")
+        bits = sum(bit for valor, bit in zip(texto, geometria.bits.values()) if valor == '1')
+    else:
+        try:
+            valores = [estado[linha][coluna] for linha, coluna in coords]
+        except (IndexError, KeyError, TypeError):
+            raise ValueError(f"Estado inválido: {estado!r}")
+        if set(valores) - {0, 1}:
+            raise ValueError(f"Estado inválido: {estado!r}")
+        bits = sum(bit for valor, bit in zip(valores, geometria.bits.values()) if valor == 1)
+
+    if not bits:
+        raise ValueError("O tabuleiro precisa ter pelo menos uma peça")
+    return bits
+
 
 class Movimento:
     def __init__(self, posicao: tuple, direcao: str):
@@ -50,7 +137,9 @@ class Movimento:
         """
         self.posicao = posicao
         self.direcao = direcao
-    
+        # Salto equivalente, nos movimentos das tabelas de saltos de uma Geometria
+        self.salto = None
+
     def __repr__(self):
         return f"[{self.posicao}, {self.direcao}]"
 
@@ -65,7 +154,7 @@ class Movimento:
         """
         Retorna a nova posição da peça.
 
-        Caso a coordenada da nova posição da peça seja inválida esta prorpriedade 
+        Caso a coordenada da nova posição da peça seja inválida esta prorpriedade
         retornará a própria posição da peça a ser movida.
 
         Returns:
@@ -76,7 +165,7 @@ class Movimento:
         else:
             pos = self.posicao[0], self.posicao[1]+DELTAS_MOVER[self.direcao]
         return self._fix(pos)
-    
+
     @property
     def saltada(self):
         """
@@ -93,7 +182,7 @@ class Movimento:
         else:
             pos = self.posicao[0], self.posicao[1]+DELTAS_REMOVER[self.direcao]
         return self._fix(pos)
-    
+
     def _fix(self, pos):
         """Faz com que posições fora dos limites sejam colocadas como a mesma
         que a posição da peça.
@@ -102,40 +191,492 @@ class Movimento:
             pos {tuple} -- Posição a ser verificada
 
         Returns:
-            tuple -- Nova posição para casos fora dos limites, posição recebida 
+            tuple -- Nova posição para casos fora dos limites, posição recebida
             para casos regulares
         """
-        if pos not in COORDS_VALIDAS:
+        # movimentos das tabelas de saltos são válidos no próprio tabuleiro,
+        # que pode não ser o inglês
+        if self.salto is None and pos not in COORDS_VALIDAS:
             return self.posicao
         return pos
 
+
+def _deslocar(posicao: tuple, direcao: str, deltas: dict):
+    """Retorna a posição deslocada na direção, pela distância em deltas."""
+    if direcao == 'N' or direcao == 'S':
+        return posicao[0] + deltas[direcao], posicao[1]
+    return posicao[0], posicao[1] + deltas[direcao]
+
+
+class Salto:
+    """
+    Salto geometricamente possível no tabuleiro, pré-calculado ao compilar a
+    Geometria.
+
+    Guarda as posições e as máscaras de bits envolvidas, além da instância
+    de Movimento equivalente, que é compartilhada por todos os tabuleiros.
+    """
+    __slots__ = ('indice', 'origem', 'saltada', 'destino',
+                 'origem_saltada', 'bit_destino', 'mascara', 'movimento',
+                 'bit', 'invalidados', 'candidatos')
+
+    def __init__(self, indice: int, movimento: Movimento, bits: dict):
+        """Inicializa o salto a partir de um movimento geometricamente válido.
+
+        Arguments:
+            indice {int} -- Posição do salto na tabela de saltos.
+            movimento {Movimento} -- Movimento equivalente ao salto.
+            bits {dict} -- bit de cada posição do tabuleiro, Geometria.bits
+        """
+        self.indice = indice
+        self.origem = movimento.posicao
+        self.saltada = _deslocar(self.origem, movimento.direcao, DELTAS_REMOVER)
+        self.destino = _deslocar(self.origem, movimento.direcao, DELTAS_MOVER)
+        self.origem_saltada = bits[self.origem] | bits[self.saltada]
+        self.bit_destino = bits[self.destino]
+        self.mascara = self.origem_saltada | self.bit_destino
+        self.movimento = movimento
+        movimento.salto = self
+
+        # bit do salto no conjunto de saltos válidos do tabuleiro, e saltos
+        # cuja validade o salto muda (preenchidos por _ligar_saltos)
+        self.bit = 1 << indice
+        self.invalidados = 0
+        self.candidatos = ()
+
+    def __repr__(self):
+        return f"Salto({self.origem} -> {self.saltada} -> {self.destino})"
+
+
+def _gerar_saltos(coords_validas, bits: dict):
+    """Gera a tabela de todos os saltos geometricamente possíveis.
+
+    Arguments:
+        coords_validas {tuple} -- posições do tabuleiro
+        bits {dict} -- bit de cada posição
+
+    Returns:
+        tuple -- Instâncias de Salto na ordem coords_validas x DIRECOES.
+    """
+    saltos = []
+    for posicao in coords_validas:
+        for direcao in DIRECOES:
+            if _deslocar(posicao, direcao, DELTAS_REMOVER) in bits \
+                    and _deslocar(posicao, direcao, DELTAS_MOVER) in bits:
+                saltos.append(Salto(len(saltos), Movimento(posicao, direcao), bits))
+    return tuple(saltos)
+
+
+def _ligar_saltos(saltos):
+    """Calcula, para cada salto, quais saltos mudam de validade quando ele é
+    realizado.
+
+    O salto esvazia a origem e a saltada e ocupa o destino. Todo salto que
+    precisa de peça na origem ou na saltada, ou de buraco no destino, deixa
+    de ser válido (invalidados). Só os saltos que precisam de buraco na origem
+    ou na saltada, ou de peça no destino, podem passar a ser válidos
+    (candidatos) e precisam ser verificados.
+
+    Arguments:
+        saltos {tuple} -- tabela de saltos
+    """
+    for salto in saltos:
+        vazias = salto.origem_saltada
+        for outro in saltos:
+            if outro.origem_saltada & vazias or outro.bit_destino & salto.bit_destino:
+                salto.invalidados |= outro.bit
+            elif outro.bit_destino & vazias or outro.origem_saltada & salto.bit_destino:
+                salto.candidatos += (outro,)
+
+
+def _saltos_do_conjunto(validos: int, saltos):
+    """Converte um conjunto de saltos em bits para a lista de saltos.
+
+    Arguments:
+        validos {int} -- um bit por salto, no bit Salto.indice
+        saltos {tuple} -- tabela de saltos do tabuleiro
+
+    Returns:
+        list -- Instâncias de Salto, na ordem da tabela
+    """
+    lista = []
+    while validos:
+        bit = validos & -validos
+        lista.append(saltos[bit.bit_length() - 1])
+        validos ^= bit
+    return lista
+
+
+def _tabelas_por_byte(valores):
+    """Gera tabelas que somam um valor por posição ocupada de um tabuleiro
+    compactado, consultando 8 bits por vez.
+
+    Arguments:
+        valores {list} -- valor de cada posição, na ordem de COORDS_VALIDAS
+
+    Returns:
+        list -- uma tabela de 256 somas para cada grupo de 8 posições
+    """
+    tabelas = []
+    for inicio in range(0, len(valores), 8):
+        grupo = valores[inicio:inicio+8]
+        tabela = []
+        for byte in range(256):
+            tabela.append(sum(valor for i, valor in enumerate(grupo) if byte >> i & 1))
+        tabelas.append(tabela)
+    return tabelas
+
+
+class Simetria:
+    """
+    Rotação ou reflexão do tabuleiro.
+
+    Pré-calcula tabelas que aplicam a simetria a um tabuleiro compactado
+    8 bits por vez, sem percorrer as posições uma a uma.
+    """
+    __slots__ = ('nome', 'transformar', 'tabelas', 'saltos', 'tabela_saltos')
+
+    def __init__(self, nome: str, transformar, coords_validas, bits: dict, saltos):
+        """Inicializa a simetria.
+
+        Arguments:
+            nome {str} -- Nome da simetria.
+            transformar {function} -- Função (linha, coluna) -> (linha, coluna).
+            coords_validas {tuple} -- posições do tabuleiro
+            bits {dict} -- bit de cada posição
+            saltos {tuple} -- tabela de saltos do tabuleiro
+        """
+        self.nome = nome
+        self.transformar = transformar
+        self.tabelas = _tabelas_por_byte([bits[transformar(*posicao)] for posicao in coords_validas])
+
+        # índice na tabela de saltos da imagem de cada salto
+        indices = {(salto.origem, salto.destino): salto.indice for salto in saltos}
+        self.saltos = tuple(indices[(transformar(*salto.origem), transformar(*salto.destino))]
+                            for salto in saltos)
+        self.tabela_saltos = saltos
+
+    def __repr__(self):
+        return f"Simetria({self.nome})"
+
+    def posicao(self, posicao: tuple):
+        """Retorna a posição correspondente após aplicar a simetria.
+
+        Arguments:
+            posicao {tuple} -- (linha, coluna) a ser transformada
+
+        Returns:
+            tuple -- (linha, coluna) transformada
+        """
+        return self.transformar(*posicao)
+
+    def salto(self, salto: Salto):
+        """Retorna o salto correspondente após aplicar a simetria.
+
+        Arguments:
+            salto {Salto} -- salto da tabela do tabuleiro a ser transformado
+
+        Returns:
+            Salto -- imagem do salto, da mesma tabela
+        """
+        return self.tabela_saltos[self.saltos[salto.indice]]
+
+    def aplicar(self, bits: int):
+        """Aplica a simetria a um tabuleiro compactado.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado (ver TabuleiroBits)
+
+        Returns:
+            int -- tabuleiro compactado transformado
+        """
+        resultado = 0
+        for tabela in self.tabelas:
+            resultado |= tabela[bits & 255]
+            bits >>= 8
+        return resultado
+
+
+def _transformacoes(coords_validas):
+    """Retorna as rotações e reflexões do retângulo que envolve as posições.
+
+    As quatro que trocam linhas por colunas só existem quando o retângulo
+    pode girar em torno do próprio centro, com lados de mesma paridade.
+
+    Arguments:
+        coords_validas {tuple} -- posições do tabuleiro
+
+    Returns:
+        list -- (nome, função (linha, coluna) -> (linha, coluna)), na ordem
+        das 8 simetrias do quadrado
+    """
+    linhas = [linha for linha, _ in coords_validas]
+    colunas = [coluna for _, coluna in coords_validas]
+    # somas dos limites: refletir uma linha é trocá-la por soma - linha
+    soma_l, soma_c = min(linhas) + max(linhas), min(colunas) + max(colunas)
+    transformacoes = [
+        ('identidade', lambda l, c: (l, c)),
+        ('rotacao_90', None),
+        ('rotacao_180', lambda l, c: (soma_l - l, soma_c - c)),
+        ('rotacao_270', None),
+        ('reflexao_horizontal', lambda l, c: (soma_l - l, c)),
+        ('reflexao_vertical', lambda l, c: (l, soma_c - c)),
+        ('reflexao_diagonal', None),
+        ('reflexao_antidiagonal', None),
+    ]
+    if (soma_l - soma_c) % 2 == 0:
+        meia_diferenca, meia_soma = (soma_l - soma_c) // 2, (soma_l + soma_c) // 2
+        transformacoes[1] = ('rotacao_90', lambda l, c: (c + meia_diferenca, meia_soma - l))
+        transformacoes[3] = ('rotacao_270', lambda l, c: (meia_soma - c, l - meia_diferenca))
+        transformacoes[6] = ('reflexao_diagonal', lambda l, c: (c + meia_diferenca, l - meia_diferenca))
+        transformacoes[7] = ('reflexao_antidiagonal', lambda l, c: (meia_soma - c, meia_soma - l))
+    return [(nome, transformar) for nome, transformar in transformacoes if transformar is not None]
+
+
+class Geometria:
+    """
+    Tabuleiro compilado de uma descrição (ver compilar_tabuleiro).
+
+    Reúne tudo o que depende do formato do tabuleiro: as posições e o bit de
+    cada uma no tabuleiro compactado, a tabela de saltos com as ligações que
+    mantêm o conjunto de saltos válidos, o grupo de simetrias e as máscaras
+    das classes de posição. Tabuleiro, TabuleiroBits e o solucionador só
+    consultam essas tabelas, então qualquer geometria é resolvida pelo mesmo
+    código que o tabuleiro inglês.
+    """
+    def __init__(self, nome: str, coords_validas):
+        """Compila as tabelas do tabuleiro.
+
+        Arguments:
+            nome {str} -- nome do tabuleiro
+            coords_validas {iterable} -- posições (linha, coluna) do
+            tabuleiro, não negativas
+        """
+        self.nome = nome
+        # posições em ordem de linha e coluna, e o bit de cada uma no tabuleiro compactado
+        self.coords_validas = tuple(sorted(set(coords_validas)))
+        self.bits = {coord: 1 << i for i, coord in enumerate(self.coords_validas)}
+        self.tabuleiro_cheio = (1 << len(self.coords_validas)) - 1
+        self.altura = max(linha for linha, _ in self.coords_validas) + 1
+        self.largura = max(coluna for _, coluna in self.coords_validas) + 1
+
+        self.saltos = _gerar_saltos(self.coords_validas, self.bits)
+        _ligar_saltos(self.saltos)
+        self.salto_por_movimento = {(salto.origem, salto.movimento.direcao): salto for salto in self.saltos}
+        self.saltos_por_posicao = {
+            posicao: tuple(salto for salto in self.saltos if posicao in (salto.origem, salto.saltada, salto.destino))
+            for posicao in self.coords_validas}
+
+        # só as rotações e reflexões que levam o tabuleiro nele mesmo
+        conjunto = set(self.coords_validas)
+        self.simetrias = tuple(Simetria(nome_simetria, transformar, self.coords_validas, self.bits, self.saltos)
+                               for nome_simetria, transformar in _transformacoes(self.coords_validas)
+                               if {transformar(*posicao) for posicao in conjunto} == conjunto)
+
+        # máscaras das três cores de (linha+coluna) % 3 seguidas das três de (linha-coluna) % 3
+        self.mascaras_diagonais = tuple(
+            sum(bit for (linha, coluna), bit in self.bits.items() if (linha + sentido * coluna) % 3 == cor)
+            for sentido in (1, -1) for cor in range(3))
+
+        # posição mais próxima do centro do retângulo que envolve o tabuleiro
+        meio = ((self.altura - 1 + min(linha for linha, _ in self.coords_validas)) / 2,
+                (self.largura - 1 + min(coluna for _, coluna in self.coords_validas)) / 2)
+        self.centro = min(self.coords_validas, key=lambda posicao: _distancia(posicao, meio))
+
+    def __repr__(self):
+        return (f"Geometria({self.nome}: {len(self.coords_validas)} posições, "
+                f"{len(self.saltos)} saltos, {len(self.simetrias)} simetrias)")
+
+    def mascara(self):
+        """Retorna a máscara do tabuleiro, aceita por compilar_tabuleiro.
+
+        Returns:
+            str -- uma linha por linha do tabuleiro, 'o' nas posições
+        """
+        return '\n'.join(''.join('o' if (linha, coluna) in self.bits else ' '
+                                 for coluna in range(self.largura)).rstrip()
+                         for linha in range(self.altura))
+
+
+# Geometrias já compiladas, pelas suas posições
+_GEOMETRIAS = {}
+
+
+def compilar_tabuleiro(descricao, nome=None):
+    """Compila um tabuleiro descrito por uma máscara ou por uma lista de posições.
+
+    Cada tabuleiro é compilado uma única vez: descrições com as mesmas
+    posições retornam a mesma Geometria.
+
+    Arguments:
+        descricao {str, list} -- o nome de um tabuleiro de
+        MASCARAS_TABULEIROS; uma máscara, como texto com uma linha por linha
+        do tabuleiro ou como lista dessas linhas, com um caractere de
+        CARACTERES_POSICAO em cada posição e de CARACTERES_FORA fora dele; ou
+        uma lista de posições (linha, coluna)
+
+    Keyword Arguments:
+        nome {str} -- nome do tabuleiro, se ainda não foi compilado
+        (default: {o nome em MASCARAS_TABULEIROS, ou 'personalizado'})
+
+    Raises:
+        ValueError -- se a descrição for inválida ou tiver menos de 3 posições
+
+    Returns:
+        Geometria -- tabuleiro compilado
+    """
+    if isinstance(descricao, str) and descricao in MASCARAS_TABULEIROS:
+        nome = nome or descricao
+        descricao = MASCARAS_TABULEIROS[descricao]
+    if isinstance(descricao, str):
+        descricao = descricao.splitlines()
+    descricao = list(descricao)
+
+    if all(isinstance(linha, str) for linha in descricao):
+        coords = []
+        for n_linha, linha in enumerate(descricao):
+            for n_coluna, caractere in enumerate(linha):
+                if caractere in CARACTERES_POSICAO:
+                    coords.append((n_linha, n_coluna))
+                elif caractere not in CARACTERES_FORA:
+                    raise ValueError(f"Caractere inválido na máscara do tabuleiro: {caractere!r}")
+    else:
+        try:
+            coords = [(int(linha), int(coluna)) for linha, coluna in descricao]
+        except (TypeError, ValueError):
+            raise ValueError(f"Posições inválidas para o tabuleiro: {descricao!r}")
+        if any(linha < 0 or coluna < 0 for linha, coluna in coords):
+            raise ValueError("As posições do tabuleiro não podem ser negativas")
+
+    chave = tuple(sorted(set(coords)))
+    if len(chave) < 3:
+        raise ValueError("O tabuleiro precisa ter pelo menos 3 posições")
+    if chave not in _GEOMETRIAS:
+        _GEOMETRIAS[chave] = Geometria(nome or 'personalizado', chave)
+    return _GEOMETRIAS[chave]
+
+
+def carregar_tabuleiro(descricao: str):
+    """Compila um tabuleiro pelo nome ou pelo arquivo que o descreve.
+
+    Arguments:
+        descricao {str} -- nome em MASCARAS_TABULEIROS, ou arquivo com uma
+        máscara ou com uma lista JSON de posições [linha, coluna]
+
+    Raises:
+        ValueError -- se o nome ou o arquivo forem inválidos
+
+    Returns:
+        Geometria -- tabuleiro compilado
+    """
+    if descricao in MASCARAS_TABULEIROS:
+        return compilar_tabuleiro(descricao)
+    if not os.path.isfile(descricao):
+        raise ValueError(f"Tabuleiro desconhecido: {descricao} (conhecidos: {', '.join(MASCARAS_TABULEIROS)})")
+    with open(descricao, encoding='utf-8') as arquivo:
+        texto = arquivo.read()
+    nome = os.path.splitext(os.path.basename(descricao))[0]
+    if texto.lstrip().startswith('['):
+        return compilar_tabuleiro(json.loads(texto), nome)
+    return compilar_tabuleiro(texto.strip('\n'), nome)
+
+
+def _distancia(posicao: tuple, outra: tuple):
+    """Retorna o quadrado da distância entre duas posições do tabuleiro."""
+    return (posicao[0] - outra[0]) ** 2 + (posicao[1] - outra[1]) ** 2
+
+
+# Tabuleiro inglês padrão, o usado quando nenhum outro é informado
+INGLES = compilar_tabuleiro('ingles')
+
+# Tabelas do tabuleiro inglês, usadas pelos módulos que só tratam dele.
+# Lista de coordenadas válidas para o tabuleiro
+COORDS_VALIDAS = INGLES.coords_validas
+
+# Bit de cada coordenada válida no tabuleiro compactado em um inteiro,
+# na mesma ordem de COORDS_VALIDAS
+BITS = INGLES.bits
+
+# Inteiro com todas as posições válidas ocupadas
+TABULEIRO_CHEIO = INGLES.tabuleiro_cheio
+
+# Tabela dos 76 saltos possíveis no tabuleiro inglês
+SALTOS = INGLES.saltos
+
+# Salto correspondente a cada par (posicao, direcao)
+SALTO_POR_MOVIMENTO = INGLES.salto_por_movimento
+
+# Saltos que usam cada posição, como origem, saltada ou destino
+SALTOS_POR_POSICAO = INGLES.saltos_por_posicao
+
+# As 8 simetrias do tabuleiro quadrado (rotações e reflexões)
+SIMETRIAS = INGLES.simetrias
+
+
+def simetrias_do_jogo(jogo):
+    """Retorna as simetrias que preservam o objetivo do jogo.
+
+    Quando é exigido que a peça final fique no buraco inicial apenas as
+    simetrias que mantêm pos_inicial fixa são válidas.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro do jogo
+
+    Returns:
+        tuple -- Instâncias de Simetria aplicáveis ao jogo
+    """
+    simetrias = jogo.geometria.simetrias
+    if not jogo.peca_final_no_buraco_inicial:
+        return simetrias
+    pos_inicial = tuple(jogo.pos_inicial)
+    return tuple(simetria for simetria in simetrias if simetria.posicao(pos_inicial) == pos_inicial)
+
+
 class Tabuleiro:
     """
     Classe que contém tabuleiro e implementa as regras do jogo.
     """
-    def __init__(self, pos_inicial = (3, 3), peca_final_no_buraco_inicial=True):
+    # banco de soluções usado por solucionavel() e dica() quando nenhum é informado
+    banco = None
+
+    # se True, saltos_validos() e tem_movimentos() conferem o conjunto de
+    # saltos válidos mantido a cada movimento com uma varredura da tabela de saltos
+    verificar_movimentos = False
+
+    # formato do tabuleiro, quando nenhum é informado
+    geometria = INGLES
+
+    def __init__(self, pos_inicial = (3, 3), peca_final_no_buraco_inicial=True, estado=None, geometria=None):
         """Inicializa o tabuleiro do jogo.
 
         Keyword Arguments:
             pos_inicial {tuple} -- Posição onde do primeiro buraco (default: {(3, 3)})
             peca_final_no_buraco_inicial {bool} -- Se True será exigido que a solução 
             tenha a peça restante na mesma posição do buraco inicial (default: {True})
+            estado {int} -- Tabuleiro compactado (ver compactar) para começar de
+            uma posição qualquer do jogo; nesse caso pos_inicial é só a posição
+            onde a última peça deve terminar e pode ser None. (default: {None})
+            geometria {Geometria} -- formato do tabuleiro, ver
+            compilar_tabuleiro (default: {INGLES})
         """
+        if geometria is not None:
+            self.geometria = geometria
+        geometria = self.geometria
 
         # valor 2 é posição inválida
         # valor 1 é uma peça
         # valor 0 é um burcao
-        self.tabuleiro = [
-            [2, 2, 1, 1, 1, 2, 2],
-            [2, 2, 1, 1, 1, 2, 2],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [1, 1, 1, 1, 1, 1, 1],
-            [2, 2, 1, 1, 1, 2, 2],
-            [2, 2, 1, 1, 1, 2, 2]
-        ]
+        self.tabuleiro = [[2] * geometria.largura for _ in range(geometria.altura)]
+        for linha, coluna in geometria.coords_validas:
+            self.tabuleiro[linha][coluna] = 1
         self.pos_inicial = pos_inicial
-        self.remover(self.pos_inicial)
+        self.estado = estado
+        self.validos = 0
+        if estado is None:
+            self.remover(self.pos_inicial)
+        else:
+            for (linha, coluna), bit in geometria.bits.items():
+                self.tabuleiro[linha][coluna] = 1 if estado & bit else 0
 
         self.pecas_restantes = 0
         for linha in self.tabuleiro:
@@ -146,13 +687,42 @@ class Tabuleiro:
         # pilha de movimentos realizados
         self.movimentos = []
 
+        # saltos válidos no estado atual, um bit por salto no bit Salto.indice,
+        # atualizado a cada movimento; e o conjunto antes de cada movimento
+        # da pilha, restaurado ao desfazê-lo
+        self.validos = self._varrer_validos()
+        self._validos_anteriores = []
+
     def reset(self):
         """ Reseta o jogo
         """
-        self.__init__(self.pos_inicial, self.peca_final_no_buraco_inicial)
+        self.__init__(self.pos_inicial, self.peca_final_no_buraco_inicial, self.estado, self.geometria)
+
+    @classmethod
+    def de_estado(cls, estado, alvo=None, geometria=None):
+        """Cria um tabuleiro a partir de uma posição qualquer do jogo.
+
+        Arguments:
+            estado {str, list, int} -- posição do jogo, em qualquer formato
+            aceito por ler_estado
+
+        Keyword Arguments:
+            alvo {tuple} -- posição onde a última peça deve terminar, None
+            para aceitar qualquer posição (default: {None})
+            geometria {Geometria} -- formato do tabuleiro (default: {INGLES})
+
+        Returns:
+            Tabuleiro -- tabuleiro na posição informada
+        """
+        geometria = geometria or cls.geometria
+        if alvo is not None:
+            alvo = tuple(alvo)
+            if alvo not in geometria.bits:
+                raise ValueError(f"Posição alvo inválida: {alvo}")
+        return cls(alvo, alvo is not None, ler_estado(estado, geometria), geometria)
 
     def __repr__(self):
-        repr_tabuleiro = '   0 1 2 3 4 5 6\n\n'
+        repr_tabuleiro = f"   {' '.join(str(coluna % 10) for coluna in range(self.geometria.largura))}\n\n"
         for n_linha, linha in enumerate(self.tabuleiro):
             repr_tabuleiro += f"{n_linha}  {' '.join([str(pos) for pos in linha]).replace('2', ' ')}\n"
         return repr_tabuleiro
@@ -175,6 +745,7 @@ class Tabuleiro:
             posicao {tuple} -- (linha, coluna) para inserir a peça
         """
         self.tabuleiro[posicao[0]][posicao[1]] = 1
+        self._reavaliar(posicao)
 
     def remover(self, posicao: tuple):
         """Remove uma peça (coloca valor 0) no tabuleiro na posição indicada
@@ -183,6 +754,50 @@ class Tabuleiro:
             posicao {tuple} -- (linha, coluna) da posição que terá a peça removida
         """
         self.tabuleiro[posicao[0]][posicao[1]] = 0
+        self._reavaliar(posicao)
+
+    def _reavaliar(self, posicao: tuple):
+        """Atualiza a validade dos saltos que usam uma posição alterada.
+
+        Arguments:
+            posicao {tuple} -- (linha, coluna) da posição alterada
+        """
+        saltos = self.geometria.saltos_por_posicao[tuple(posicao)]
+        self.validos &= ~sum(salto.bit for salto in saltos)
+        self.validos |= self._varrer_validos(saltos)
+
+    def _varrer_validos(self, saltos=None):
+        """Verifica um a um quais saltos são válidos no estado atual.
+
+        Keyword Arguments:
+            saltos {tuple} -- saltos verificados (default: {todos os da geometria})
+
+        Returns:
+            int -- um bit por salto válido, no bit Salto.indice
+        """
+        if saltos is None:
+            saltos = self.geometria.saltos
+        tabuleiro = self.tabuleiro
+        validos = 0
+        for salto in saltos:
+            (l_origem, c_origem), (l_saltada, c_saltada), (l_destino, c_destino) = \
+                salto.origem, salto.saltada, salto.destino
+            if tabuleiro[l_origem][c_origem] == 1 and tabuleiro[l_saltada][c_saltada] == 1 \
+                    and tabuleiro[l_destino][c_destino] == 0:
+                validos |= salto.bit
+        return validos
+
+    def _conferir_validos(self):
+        """Compara o conjunto de saltos válidos com uma varredura completa.
+
+        Raises:
+            RuntimeError -- se os dois forem diferentes
+        """
+        esperado = self._varrer_validos()
+        if esperado != self.validos:
+            sobrando = _saltos_do_conjunto(self.validos & ~esperado, self.geometria.saltos)
+            faltando = _saltos_do_conjunto(esperado & ~self.validos, self.geometria.saltos)
+            raise RuntimeError(f"Saltos válidos divergem da varredura: sobrando {sobrando}, faltando {faltando}")
 
     def _valido(self, movimento):
         """Verifica se um movimento é válido.
@@ -195,17 +810,15 @@ class Tabuleiro:
             bool -- Verdadeiro para movimento válido, e movimento inválido
         """
         valido = True
-        if not movimento:
-            valido = False
-        elif movimento.posicao == movimento.saltada:
-            valido = False
-        elif movimento.posicao == movimento.nova_posicao:
+        salto = self.geometria.salto_por_movimento.get((tuple(movimento.posicao), movimento.direcao)) \
+            if movimento else None
+        if salto is None:
             valido = False
-        elif self.get(movimento.posicao) in (0, 2):
+        elif self.get(salto.origem) in (0, 2):
             valido = False
-        elif self.get(movimento.nova_posicao) in (1, 2):
+        elif self.get(salto.destino) in (1, 2):
             valido = False
-        elif self.get(movimento.saltada) in (0, 2):
+        elif self.get(salto.saltada) in (0, 2):
             valido = False
 
         return valido
@@ -222,34 +835,61 @@ class Tabuleiro:
         """
         valido = self._valido(movimento)
         if valido:
-            pos_nova = movimento.nova_posicao
-            pos_anterior = movimento.posicao
-            peca_saltada = movimento.saltada
-
-            self.set(pos_nova)
-            self.remover(pos_anterior)
-            self.remover(peca_saltada)
-            self.pecas_restantes -= 1
-            
-            self.movimentos.append(movimento)
-            return True
+            return self.saltar(self.geometria.salto_por_movimento[(tuple(movimento.posicao), movimento.direcao)])
         return False
 
+    def saltar(self, salto):
+        """Realiza um salto da tabela de saltos da geometria se este for válido.
+
+        Arguments:
+            salto {Salto} -- salto a ser realizado.
+
+        Returns:
+            bool -- Retorna True caso o salto tenha sido realizado,
+            False caso contrário
+        """
+        if not self.validos & salto.bit:
+            return False
+
+        tabuleiro = self.tabuleiro
+        (l_origem, c_origem), (l_saltada, c_saltada), (l_destino, c_destino) = \
+            salto.origem, salto.saltada, salto.destino
+        tabuleiro[l_origem][c_origem] = 0
+        tabuleiro[l_saltada][c_saltada] = 0
+        tabuleiro[l_destino][c_destino] = 1
+        self.pecas_restantes -= 1
+
+        # só os candidatos do salto podem ter passado a ser válidos
+        self._validos_anteriores.append(self.validos)
+        validos = self.validos & ~salto.invalidados
+        for outro in salto.candidatos:
+            (l_origem, c_origem), (l_saltada, c_saltada), (l_destino, c_destino) = \
+                outro.origem, outro.saltada, outro.destino
+            if tabuleiro[l_origem][c_origem] == 1 and tabuleiro[l_saltada][c_saltada] == 1 \
+                    and tabuleiro[l_destino][c_destino] == 0:
+                validos |= outro.bit
+        self.validos = validos
+
+        self.movimentos.append(salto.movimento)
+        return True
+
+    def saltos_validos(self):
+        """Retorna uma lista de todos os saltos válidos no estado atual.
+
+        Returns:
+            list -- Lista de instâncias de Salto, na ordem da tabela de saltos
+        """
+        if self.verificar_movimentos:
+            self._conferir_validos()
+        return _saltos_do_conjunto(self.validos, self.geometria.saltos)
+
     def get_movimentos_validos(self):
         """Retorna uma lista de todos os movimentos válidos.
 
         Returns:
             list -- Lista de instâncias válidas de Movimento
         """
-        movimentos_validos = []
-        for linha, coluna in COORDS_VALIDAS:
-            if self.get((linha, coluna)) == 2:
-                continue
-            for direcao in DIRECOES:
-                movimento = Movimento((linha, coluna), direcao)
-                if self._valido(movimento):
-                    movimentos_validos.append(movimento)
-        return movimentos_validos
+        return [salto.movimento for salto in self.saltos_validos()]
 
     def tem_movimentos(self):
         """Verifica se o estado atual do tabuleiro é tem movimentos válidos.
@@ -257,7 +897,9 @@ class Tabuleiro:
         Returns:
             bool -- True caso o jogo tenha movimentos válidos, False caso contrário
         """
-        return len(self.get_movimentos_validos()) >= 1
+        if self.verificar_movimentos:
+            self._conferir_validos()
+        return self.validos != 0
 
     def esta_solucionado(self):
         """Verifica se o estado atual do jogo é uma solução.
@@ -276,14 +918,13 @@ class Tabuleiro:
         """Desfaz o último movimento realizado.
         """
 
-        movimento = self.movimentos.pop()
-        pos_nova = movimento.nova_posicao
-        pos_anterior = movimento.posicao
-        peca_saltada = movimento.saltada
+        salto = self.movimentos.pop().salto
 
-        self.remover(pos_nova)
-        self.set(pos_anterior)
-        self.set(peca_saltada)
+        tabuleiro = self.tabuleiro
+        tabuleiro[salto.destino[0]][salto.destino[1]] = 0
+        tabuleiro[salto.origem[0]][salto.origem[1]] = 1
+        tabuleiro[salto.saltada[0]][salto.saltada[1]] = 1
+        self.validos = self._validos_anteriores.pop()
 
         # como um movimento foi desfeito, a peça removida por ele voltou
         self.pecas_restantes += 1
@@ -300,154 +941,1903 @@ class Tabuleiro:
                 ident += str(item)
         return ident
 
+    def compactar(self):
+        """Retorna o tabuleiro compactado em um inteiro, como em TabuleiroBits.
 
-class SolucionadorResta1:
-    def __init__(self, jogo: Tabuleiro, callback_visualizacao = None):
-        """Inicializa o solucionador para o jogo.
-
-        A callback_visualizacao quando chamda recebe como parâmetro a instância 
-        do solucionador.
-        Atenção: a callback_visualizacao não deve alterar qualquer estrutura
-        de dados da instância recebida, para que não cause problemas.
-
-        Arguments:
-            jogo {Tabuleiro} -- tabuleiro do jogo
+        Returns:
+            int -- bits das posições ocupadas, na ordem de geometria.coords_validas.
+        """
+        bits = 0
+        tabuleiro = self.tabuleiro
+        for (linha, coluna), bit in self.geometria.bits.items():
+            if tabuleiro[linha][coluna] == 1:
+                bits |= bit
+        return bits
+
+    def _banco(self, banco):
+        banco = banco if banco is not None else self.banco
+        if banco is None:
+            raise ValueError("Nenhum banco de soluções informado")
+        if not banco.compativel(self):
+            raise ValueError("O banco de soluções foi construído para outro objetivo do jogo")
+        return banco
+
+    def solucionavel(self, banco=None):
+        """Consulta no banco de soluções se o estado atual tem solução, sem busca.
 
         Keyword Arguments:
-            callback_visualizacao {function} -- Função que será chamada
-            para cada alteração do tabuleiro. Está função tem assinatura
-            callback_visualizacao(solucionador). (default: {None})
+            banco {BancoSolucoes} -- banco de banco_resta_um com o mesmo
+            objetivo do jogo (default: {self.banco})
+
+        Returns:
+            bool -- True se tem solução, False se não tem, None se o estado
+            não está no banco
         """
-        self.jogo = jogo
-        nop = lambda *args: None
-        self.callback_visualizacao = callback_visualizacao or nop
-        self.total_de_movimentos = 0
-        self.tempo = 0
+        if self.esta_solucionado():
+            return True
+        return self._banco(banco).consultar(self.compactar())
 
-    def solucionar(self, recursivo=True):
-        """Soluciona o jogo se possível.
+    def dica(self, banco=None):
+        """Sugere um movimento que mantém o jogo solucionável, consultando o
+        banco de soluções.
 
         Keyword Arguments:
-            recursivo {bool} -- Define se será utilizado o algoritmo recursivo. (default: {True})
+            banco {BancoSolucoes} -- banco de banco_resta_um com o mesmo
+            objetivo do jogo (default: {self.banco})
+
+        Raises:
+            ValueError -- se o estado atual não está no banco, caso em que não
+            é possível saber se algum movimento leva a um estado com solução
 
         Returns:
-            bool -- Retorna True se encontrar uma solução, False caso contrário.
+            Movimento -- movimento sugerido, None se nenhum movimento leva a
+            um estado com solução
         """
-        self.jogo.reset()
-        self.total_de_movimentos = 0
-        tempo_inicio = time.time()
-        if recursivo:
-            tem_solucao = self._solucionar()
-        else:
-            tem_solucao = self._solucionar_nao_recursivo()
-        self.tempo = time.time() - tempo_inicio
-        return tem_solucao
+        banco = self._banco(banco)
+        # os estados seguintes a um estado do banco também estão no banco
+        if not self.esta_solucionado() and banco.consultar(self.compactar()) is None:
+            raise ValueError("O estado atual não está no banco de soluções")
+        for salto in self.saltos_validos():
+            self.saltar(salto)
+            solucionavel = self.esta_solucionado() or banco.consultar(self.compactar())
+            self.desfazer_movimento()
+            if solucionavel:
+                return salto.movimento
+        return None
+
+
+class TabuleiroBits(Tabuleiro):
+    """
+    Tabuleiro compactado em um único inteiro, um bit por posição válida.
 
-    def _solucionar(self, movimentos_realizados = 0):
-        """Tenta solucionar o jogo utilizando backtracking.
+    Tem a mesma interface de Tabuleiro, mas verifica e realiza movimentos com
+    operações de máscara e usa o próprio inteiro como identificador do estado.
+    """
+    def __init__(self, pos_inicial = (3, 3), peca_final_no_buraco_inicial=True, estado=None, geometria=None):
+        """Inicializa o tabuleiro do jogo.
 
         Keyword Arguments:
-            movimentos_realizados {int} -- Numero de movimentos realizados 
-            (deve ser utilizado apenas internamente para verificação da 
-            condição de parada) (default: {0})
-
-        Returns:
-            bool -- True se existe solução, False se não existe solução.
+            pos_inicial {tuple} -- Posição onde do primeiro buraco (default: {(3, 3)})
+            peca_final_no_buraco_inicial {bool} -- Se True será exigido que a solução
+            tenha a peça restante na mesma posição do buraco inicial (default: {True})
+            estado {int} -- Tabuleiro compactado para começar de uma posição
+            qualquer do jogo, como em Tabuleiro (default: {None})
+            geometria {Geometria} -- formato do tabuleiro, como em Tabuleiro
+            (default: {INGLES})
         """
-        if movimentos_realizados == 31:
-            if self.jogo.esta_solucionado():
-                return True
+        if geometria is not None:
+            self.geometria = geometria
+        geometria = self.geometria
+        self.pos_inicial = pos_inicial
+        self.estado = estado
+        self._bit_inicial = geometria.bits[tuple(pos_inicial)] if pos_inicial is not None else 0
+        if estado is None:
+            self.bits = geometria.tabuleiro_cheio & ~self._bit_inicial
+        else:
+            self.bits = estado
+        self.pecas_restantes = bin(self.bits).count('1')
+        self.peca_final_no_buraco_inicial = peca_final_no_buraco_inicial
 
-        for linha, coluna in COORDS_VALIDAS:
-            for direcao in DIRECOES:
-                movimento = Movimento((linha, coluna), direcao)
-                if self.jogo.mover(movimento):
-                    self.callback_visualizacao(self)
-                    self.total_de_movimentos += 1
-                    if self._solucionar(movimentos_realizados+1):
-                        return True
-                    
-                    self.jogo.desfazer_movimento()
-                    self.callback_visualizacao(self)
-        
-        # retorna False caso tenha tentado todas as possibilidades
-        # e nenhuma solução foi encontrada
-        return False
+        # pilha de movimentos realizados
+        self.movimentos = []
 
-    def _solucionar_nao_recursivo(self):
-        """Tenta solucionar o jogo utilizando backtracking sem o uso de recursão.
+        # saltos válidos, como em Tabuleiro
+        self.validos = self._varrer_validos()
+        self._validos_anteriores = []
+
+    @property
+    def tabuleiro(self):
+        """Visão do tabuleiro como lista de listas com os valores 0, 1 e 2.
 
         Returns:
-            bool -- True se existe solução, False se não existe solução.
+            list -- matriz equivalente a Tabuleiro.tabuleiro
         """
-        # mantém uma pilha de movimentos váilidos para cada estado visitado,
-        # quando a pilha fica vazia significa que todos os movimentos 
-        # para aquele estado foram visitados
-        estados = {}
-        id_inicial = self.jogo.ident()
-        estados[id_inicial] = {'visitados': [], 'movimentos': self.jogo.get_movimentos_validos()}
-        movimentos_realizados = 0
-        while estados[id_inicial]['movimentos']:
-            id_jogo = self.jogo.ident()
-
-            if estados[id_jogo]['movimentos']:
-                movimento = estados[id_jogo]['movimentos'].pop()
-            else:
-                self.jogo.desfazer_movimento()
-                movimentos_realizados-=1
-                self.callback_visualizacao(self)
-                continue
+        geometria = self.geometria
+        tabuleiro = [[2] * geometria.largura for _ in range(geometria.altura)]
+        for (linha, coluna), bit in geometria.bits.items():
+            tabuleiro[linha][coluna] = 1 if self.bits & bit else 0
+        return tabuleiro
 
-            if self.jogo.mover(movimento):
-                self.total_de_movimentos += 1
-                self.callback_visualizacao(self)
-                id_jogo = self.jogo.ident()
+    def get(self, posicao: tuple):
+        """Retorna o elemento do tabuleiro na posição indicada
 
-                movimentos_realizados+=1
-                if movimentos_realizados == 31:
-                    if self.jogo.esta_solucionado():
-                        return True
+        Arguments:
+            posicao {tuple} -- (linha, coluna) da posição no tabuleiro
 
-                if not estados.get(id_jogo):
-                    estados[id_jogo] = {'visitados': [movimento], 'movimentos': self.jogo.get_movimentos_validos()}
-                else:
-                    estados[id_jogo]['visitados'].append(movimento)
+        Returns:
+            int -- valor da posição solicitada
+        """
+        bit = self.geometria.bits.get(tuple(posicao))
+        if bit is None:
+            return 2
+        return 1 if self.bits & bit else 0
 
-        # retorna False caso tenha tendado todas as possibilidades
-        # e nenhuma solução foi encontrada
-        return False
+    def set(self, posicao: tuple):
+        """ Coloca uma peça no tabuleiro na posição especificada.
 
+        Arguments:
+            posicao {tuple} -- (linha, coluna) para inserir a peça
+        """
+        self.bits |= self.geometria.bits[tuple(posicao)]
+        self._reavaliar(posicao)
 
-def setup_parser_argumentos():
-    """Configura o parser de argumentos."""
-    parser_argumentos = argparse.ArgumentParser(description='Solucionador para tabuleiro inglês padrão do resta 1',
-                                                formatter_class=argparse.RawTextHelpFormatter)
+    def remover(self, posicao: tuple):
+        """Remove uma peça do tabuleiro na posição indicada
 
-    parser_argumentos.add_argument('--gui', '-g', action='store_true', 
-                                   help='Usar visualização com Pygame e Tkinter')
+        Arguments:
+            posicao {tuple} -- (linha, coluna) da posição que terá a peça removida
+        """
+        self.bits &= ~self.geometria.bits[tuple(posicao)]
+        self._reavaliar(posicao)
 
-    parser_argumentos.add_argument('--recursivo', '-r', action='store_true', 
-                                   help='Usar função recursiva para solucionar')
+    def _varrer_validos(self, saltos=None):
+        """Verifica um a um quais saltos são válidos no estado atual.
 
-    parser_argumentos.add_argument('--posicao', '-p', nargs=2, default=[3, 3], type=int,
-                                    help='Posição inicial na forma linha coluna')
+        Keyword Arguments:
+            saltos {tuple} -- saltos verificados (default: {todos os da geometria})
 
-    parser_argumentos.add_argument('--exigente', '-e', action='store_true', 
-                                    help='Exige que a posição final da última peça seja igual a posição do buraco inicial')
+        Returns:
+            int -- um bit por salto válido, no bit Salto.indice
+        """
+        if saltos is None:
+            saltos = self.geometria.saltos
+        bits = self.bits
+        validos = 0
+        for salto in saltos:
+            if bits & salto.mascara == salto.origem_saltada:
+                validos |= salto.bit
+        return validos
 
-    return parser_argumentos
+    def _valido(self, movimento):
+        """Verifica se um movimento é válido.
 
+        Arguments:
+            movimento {Movimento} -- movimento a ser verificado em relação ao
+            estado atual do tabuleiro.
 
-def exibir_config(argumentos, jogo):
-    print("\nConfiguração:")
+        Returns:
+            bool -- Verdadeiro para movimento válido, e movimento inválido
+        """
+        if not movimento:
+            return False
+        salto = self.geometria.salto_por_movimento.get((tuple(movimento.posicao), movimento.direcao))
+        if salto is None:
+            return False
+        return self.bits & salto.mascara == salto.origem_saltada
+
+    def mover(self, movimento):
+        """Realiza o movimento se este for válido.
+
+        Arguments:
+            movimento {Movimento} -- movimento válido a ser realizado.
+
+        Returns:
+            bool -- Retorna True caso o movimento tenha sido realizado,
+            False caso contrário
+        """
+        if not self._valido(movimento):
+            return False
+        return self.saltar(self.geometria.salto_por_movimento[(tuple(movimento.posicao), movimento.direcao)])
+
+    def saltar(self, salto):
+        """Realiza um salto da tabela de saltos da geometria se este for válido.
+
+        Arguments:
+            salto {Salto} -- salto a ser realizado.
+
+        Returns:
+            bool -- Retorna True caso o salto tenha sido realizado,
+            False caso contrário
+        """
+        if not self.validos & salto.bit:
+            return False
+
+        bits = self.bits ^ salto.mascara
+        self.bits = bits
+        self.pecas_restantes -= 1
+
+        self._validos_anteriores.append(self.validos)
+        validos = self.validos & ~salto.invalidados
+        for outro in salto.candidatos:
+            if bits & outro.mascara == outro.origem_saltada:
+                validos |= outro.bit
+        self.validos = validos
+
+        self.movimentos.append(salto.movimento)
+        return True
+
+    def esta_solucionado(self):
+        """Verifica se o estado atual do jogo é uma solução.
+
+        Returns:
+            bool -- True caso o jogo esteja solucionado, False caso contrário
+        """
+        if self.peca_final_no_buraco_inicial:
+            return self.bits == self._bit_inicial
+        return self.pecas_restantes == 1
+
+    def desfazer_movimento(self):
+        """Desfaz o último movimento realizado.
+        """
+        self.bits ^= self.movimentos.pop().salto.mascara
+        self.validos = self._validos_anteriores.pop()
+
+        # como um movimento foi desfeito, a peça removida por ele voltou
+        self.pecas_restantes += 1
+
+    def ident(self):
+        """Retorna o inteiro que representa o tabuleiro do jogo.
+
+        Returns:
+            int -- bits das posições ocupadas, na ordem de geometria.coords_validas.
+        """
+        return self.bits
+
+    def compactar(self):
+        """Retorna o tabuleiro compactado em um inteiro.
+
+        Returns:
+            int -- bits das posições ocupadas, na ordem de geometria.coords_validas.
+        """
+        return self.bits
+
+
+# Políticas de substituição aceitas pela TabelaTransposicao quando cheia:
+# 'lru' descarta o estado usado há mais tempo, 'profundidade' descarta o estado
+# mais profundo (que representa menos trabalho poupado) e 'substituir'
+# sobrescreve sempre a posição da tabela para onde o novo estado é mapeado
+POLITICAS_SUBSTITUICAO = ('lru', 'profundidade', 'substituir')
+
+# Memória ocupada por entrada em cada política, usada para converter capacidade
+# em MB. Medida com tracemalloc em tabelas cheias que continuam recebendo
+# estados (com descartes), incluindo o int de cada chave. É aproximada: as
+# tabelas de hash crescem em degraus, então o uso real oscila em torno dela.
+# 'lru' paga uma entrada de OrderedDict, 'profundidade' uma de dicionário e
+# outra do conjunto da sua profundidade, e 'substituir' só uma posição de lista.
+BYTES_POR_ENTRADA = {'lru': 210, 'profundidade': 190, 'substituir': 40}
+
+
+def capacidade_por_mb(capacidade_mb: float, politica='lru'):
+    """Converte uma capacidade em megabytes para número de entradas da tabela.
+
+    Arguments:
+        capacidade_mb {float} -- capacidade aproximada em megabytes
+
+    Keyword Arguments:
+        politica {str} -- Uma de POLITICAS_SUBSTITUICAO (default: {'lru'})
+
+    Returns:
+        int -- número de entradas que cabem na capacidade
+    """
+    return int(capacidade_mb * 2**20) // BYTES_POR_ENTRADA[politica]
+
+
+class TabelaTransposicao:
+    """
+    Conjunto de estados já provados sem solução.
+
+    Os estados são guardados pela forma canônica sob as simetrias informadas,
+    de modo que tabuleiros equivalentes por rotação ou reflexão compartilham
+    a mesma entrada. Com capacidade definida a tabela nunca passa desse número
+    de entradas e descarta estados conforme a política de substituição.
+    """
+    def __init__(self, simetrias=SIMETRIAS, capacidade=None, capacidade_mb=None, politica='lru'):
+        """Inicializa a tabela vazia.
+
+        Keyword Arguments:
+            simetrias {tuple} -- Simetrias usadas para a forma canônica (default: {SIMETRIAS})
+            capacidade {int} -- Número máximo de entradas, None para ilimitado (default: {None})
+            capacidade_mb {float} -- Capacidade aproximada em megabytes, usada
+            no lugar de capacidade quando informada e convertida pela memória
+            por entrada da política em BYTES_POR_ENTRADA (default: {None})
+            politica {str} -- Uma de POLITICAS_SUBSTITUICAO (default: {'lru'})
+        """
+        if politica not in POLITICAS_SUBSTITUICAO:
+            raise ValueError(f"Política de substituição inválida: {politica}")
+        if capacidade_mb is not None:
+            capacidade = capacidade_por_mb(capacidade_mb, politica)
+        if capacidade is not None and capacidade < 1:
+            raise ValueError("A capacidade da tabela deve ser de pelo menos uma entrada")
+
+        self.simetrias = tuple(simetrias)
+        self.capacidade = capacidade
+        self.politica = politica
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+        if capacidade is None:
+            self.estados = set()
+        elif politica == 'lru':
+            self.estados = OrderedDict()
+        elif politica == 'profundidade':
+            # estado -> profundidade, e estados agrupados por profundidade
+            self.estados = {}
+            self._por_profundidade = {}
+        else:
+            self.estados = [None] * capacidade
+            self._ocupadas = 0
+
+    def __len__(self):
+        if self.capacidade is not None and self.politica == 'substituir':
+            return self._ocupadas
+        return len(self.estados)
+
+    def __repr__(self):
+        return f"{self.acertos} acertos, {self.falhas} falhas, {len(self)} estados, {self.descartes} descartes"
+
+    def chave(self, bits: int):
+        """Retorna a forma canônica de um tabuleiro compactado.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            int -- menor inteiro entre as imagens do tabuleiro pelas simetrias
+        """
+        return min([simetria.aplicar(bits) for simetria in self.simetrias])
+
+    def contem(self, chave: int):
+        """Verifica se um estado canônico já foi provado sem solução.
+
+        Arguments:
+            chave {int} -- forma canônica retornada por chave()
+
+        Returns:
+            bool -- True se o estado está na tabela
+        """
+        if self.capacidade is not None and self.politica == 'substituir':
+            encontrado = self.estados[hash(chave) % self.capacidade] == chave
+        else:
+            encontrado = chave in self.estados
+
+        if encontrado:
+            self.acertos += 1
+            if self.capacidade is not None and self.politica == 'lru':
+                self.estados.move_to_end(chave)
+            return True
+        self.falhas += 1
+        return False
+
+    def adicionar(self, chave: int, profundidade=0):
+        """Registra um estado canônico sem solução.
+
+        Arguments:
+            chave {int} -- forma canônica retornada por chave()
+
+        Keyword Arguments:
+            profundidade {int} -- número de peças que faltam no estado em
+            relação ao tabuleiro cheio, usado pela política 'profundidade'.
+            Depende só do estado, então vale entre buscas que partem de
+            posições diferentes. (default: {0})
+        """
+        if self.capacidade is None:
+            self.estados.add(chave)
+        elif self.politica == 'lru':
+            self.estados[chave] = None
+            self.estados.move_to_end(chave)
+            if len(self.estados) > self.capacidade:
+                self.estados.popitem(last=False)
+                self.descartes += 1
+        elif self.politica == 'profundidade':
+            self._adicionar_por_profundidade(chave, profundidade)
+        else:
+            posicao = hash(chave) % self.capacidade
+            anterior = self.estados[posicao]
+            if anterior is None:
+                self._ocupadas += 1
+            elif anterior != chave:
+                self.descartes += 1
+            self.estados[posicao] = chave
+
+    def _adicionar_por_profundidade(self, chave, profundidade):
+        """Adiciona um estado preferindo manter os estados mais rasos.
+
+        Arguments:
+            chave {int} -- forma canônica do estado
+            profundidade {int} -- número de peças que faltam no estado
+        """
+        if chave in self.estados:
+            return
+        if len(self.estados) >= self.capacidade:
+            mais_profunda = max(self._por_profundidade)
+            if profundidade >= mais_profunda:
+                # o novo estado vale menos do que qualquer um já guardado
+                self.descartes += 1
+                return
+            grupo = self._por_profundidade[mais_profunda]
+            del self.estados[grupo.pop()]
+            if not grupo:
+                del self._por_profundidade[mais_profunda]
+            self.descartes += 1
+        self.estados[chave] = profundidade
+        self._por_profundidade.setdefault(profundidade, set()).add(chave)
+
+
+class Poda:
+    """
+    Regra de poda admissível: só descarta estados dos quais é impossível
+    alcançar o objetivo do jogo.
+
+    Cada regra conta quantos nós podou em podados. Regras cujo resultado não
+    muda com os saltos definem por_no = False e só são verificadas uma vez,
+    em preparar().
+    """
+    nome = 'poda'
+    por_no = True
+
+    def __init__(self):
+        self.podados = 0
+
+    def __repr__(self):
+        return f"{self.nome}: {self.podados} nós podados"
+
+    def preparar(self, jogo):
+        """Calcula o que depende do objetivo do jogo antes da busca.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo, no estado inicial da busca
+
+        Returns:
+            bool -- True se o objetivo já é inalcançável a partir do estado inicial
+        """
+        self.podados = 0
+        return False
+
+    def podar(self, bits: int):
+        """Verifica se o estado pode ser descartado.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            bool -- True se o objetivo é inalcançável a partir do estado
+        """
+        return False
+
+
+def _classe_posicao(bits: int, mascaras=None):
+    """Retorna a classe de posição de Conway de um tabuleiro compactado.
+
+    Colorindo o tabuleiro pelas diagonais com 3 cores, (linha+coluna) % 3 e
+    (linha-coluna) % 3, todo salto muda a paridade da quantidade de peças de
+    cada cor. Assim as paridades das somas duas a duas são invariantes.
+
+    Arguments:
+        bits {int} -- tabuleiro compactado
+
+    Keyword Arguments:
+        mascaras {tuple} -- Geometria.mascaras_diagonais do tabuleiro
+        (default: {MASCARAS_DIAGONAIS})
+
+    Returns:
+        tuple -- 4 paridades que identificam a classe do tabuleiro
+    """
+    n0, n1, n2, m0, m1, m2 = [bin(bits & mascara).count('1') & 1 for mascara in mascaras or MASCARAS_DIAGONAIS]
+    return (n0 ^ n1, n1 ^ n2, m0 ^ m1, m1 ^ m2)
+
+# Máscaras das três cores de (linha+coluna) % 3 seguidas das três de (linha-coluna) % 3
+MASCARAS_DIAGONAIS = INGLES.mascaras_diagonais
+
+
+def posicoes_finais_possiveis(jogo):
+    """Retorna as posições onde a última peça pode terminar.
+
+    Além da exigência de terminar no buraco inicial, a última peça precisa
+    estar na mesma classe de posição do tabuleiro atual.
+
+    Arguments:
+        jogo {Tabuleiro} -- tabuleiro do jogo
+
+    Returns:
+        tuple -- posições (linha, coluna) possíveis para a última peça
+    """
+    geometria = jogo.geometria
+    mascaras = geometria.mascaras_diagonais
+    classe = _classe_posicao(jogo.compactar(), mascaras)
+    if jogo.peca_final_no_buraco_inicial:
+        candidatas = (tuple(jogo.pos_inicial),)
+    else:
+        candidatas = geometria.coords_validas
+    return tuple(posicao for posicao in candidatas if _classe_posicao(geometria.bits[posicao], mascaras) == classe)
+
+
+class PodaClassePosicao(Poda):
+    """
+    Poda pela classe de posição de Conway: descarta o jogo se a classe do
+    estado inicial não é a de nenhuma posição final possível.
+
+    Como a classe não muda com os saltos, ela é verificada só uma vez, em
+    preparar(), e nunca poda nós durante a busca.
+    """
+    nome = 'classe'
+    por_no = False
+
+    def preparar(self, jogo):
+        super().preparar(jogo)
+        if not posicoes_finais_possiveis(jogo):
+            self.podados += 1
+            return True
+        return False
+
+
+class PodaPagoda(Poda):
+    """
+    Poda por funções pagoda (as contagens de recursos de Conway).
+
+    Uma função pagoda dá um peso a cada posição de forma que, para todo salto,
+    peso(origem) + peso(saltada) >= peso(destino). Assim a soma dos pesos das
+    peças nunca aumenta, e um estado cuja soma é menor que o peso da posição
+    final pode ser descartado.
+    """
+    nome = 'pagoda'
+
+    def __init__(self, pagodas=None):
+        """Inicializa a poda.
+
+        Keyword Arguments:
+            pagodas {list} -- funções pagoda do tabuleiro inglês, cada uma uma
+            matriz 7x7 de pesos (valores fora de COORDS_VALIDAS são ignorados);
+            None usa pagodas_do_tabuleiro em cada tabuleiro (default: {None})
+
+        Raises:
+            ValueError -- se alguma matriz não for uma função pagoda
+        """
+        super().__init__()
+        self.pagodas = pagodas
+        # pesos e tabelas de cada geometria, compilados no primeiro jogo nela
+        self._compiladas = {}
+        if pagodas is not None:
+            self._compilar(INGLES)
+        self.limites = []
+
+    def _compilar(self, geometria):
+        """Retorna os pesos de cada pagoda no tabuleiro e as tabelas que os somam.
+
+        Arguments:
+            geometria {Geometria} -- tabuleiro
+
+        Raises:
+            ValueError -- se alguma matriz não for uma função pagoda do tabuleiro
+
+        Returns:
+            list -- (pesos, tabelas) de cada pagoda
+        """
+        if geometria not in self._compiladas:
+            if self.pagodas is None:
+                pagodas = pagodas_do_tabuleiro(geometria)
+            elif geometria is INGLES:
+                pagodas = self.pagodas
+            else:
+                raise ValueError(f"As funções pagoda dadas são do tabuleiro inglês, não de {geometria.nome}")
+            compiladas = []
+            for pagoda in pagodas:
+                pesos = {(linha, coluna): pagoda[linha][coluna] for linha, coluna in geometria.coords_validas}
+                for salto in geometria.saltos:
+                    if pesos[salto.origem] + pesos[salto.saltada] < pesos[salto.destino]:
+                        raise ValueError(f"Função pagoda inválida para o salto {salto}")
+                compiladas.append((pesos, _tabelas_por_byte([pesos[posicao]
+                                                             for posicao in geometria.coords_validas])))
+            self._compiladas[geometria] = compiladas
+        return self._compiladas[geometria]
+
+    def preparar(self, jogo):
+        impossivel = super().preparar(jogo)
+        compiladas = self._compilar(jogo.geometria)
+        self.pesos = [pesos for pesos, _ in compiladas]
+        self.tabelas = [tabelas for _, tabelas in compiladas]
+        finais = posicoes_finais_possiveis(jogo)
+        # sem posição final possível qualquer limite serve, a soma nunca é menor que infinito
+        self.limites = [(tabelas, min([pesos[posicao] for posicao in finais], default=float('inf')))
+                        for pesos, tabelas in zip(self.pesos, self.tabelas)]
+        return impossivel
+
+    def podar(self, bits: int):
+        for tabelas, limite in self.limites:
+            soma = 0
+            resto = bits
+            for tabela in tabelas:
+                soma += tabela[resto & 255]
+                resto >>= 8
+            if soma < limite:
+                self.podados += 1
+                return True
+        return False
+
+
+# Funções pagoda clássicas do tabuleiro inglês
+PAGODA_CENTRO = [
+    [0, 0, -1, 1, -1, 0, 0],
+    [0, 0, 1, 1, 1, 0, 0],
+    [-1, 1, 0, 1, 0, 1, -1],
+    [1, 1, 1, 2, 1, 1, 1],
+    [-1, 1, 0, 1, 0, 1, -1],
+    [0, 0, 1, 1, 1, 0, 0],
+    [0, 0, -1, 1, -1, 0, 0]
+]
+
+# Pesos de Fibonacci crescendo em direção à linha 6, e suas rotações
+PAGODA_FIBONACCI = [[peso] * 7 for peso in (0, 1, 1, 2, 3, 5, 8)]
+
+PAGODAS = [PAGODA_CENTRO] + [
+    [[PAGODA_FIBONACCI[linha][coluna] for linha, coluna in
+      [simetria.posicao((l, c)) for c in range(7)]] for l in range(7)]
+    for simetria in SIMETRIAS[:4]]
+
+
+def pagodas_do_tabuleiro(geometria):
+    """Retorna funções pagoda para um tabuleiro.
+
+    O tabuleiro inglês usa PAGODAS. Nos outros os pesos são de Fibonacci,
+    crescendo em direção a cada um dos quatro lados, o que vale em qualquer
+    tabuleiro: f(n) + f(n+1) >= f(n+2) e f(n+2) + f(n+1) >= f(n).
+
+    Arguments:
+        geometria {Geometria} -- tabuleiro
+
+    Returns:
+        list -- matrizes altura x largura de pesos
+    """
+    if geometria is INGLES:
+        return PAGODAS
+    altura, largura = geometria.altura, geometria.largura
+    fibonacci = [0, 1]
+    while len(fibonacci) < max(altura, largura):
+        fibonacci.append(fibonacci[-1] + fibonacci[-2])
+    pesos = (lambda l, c: fibonacci[l], lambda l, c: fibonacci[altura - 1 - l],
+             lambda l, c: fibonacci[c], lambda l, c: fibonacci[largura - 1 - c])
+    return [[[peso(linha, coluna) for coluna in range(largura)] for linha in range(altura)]
+            for peso in pesos]
+
+
+# Regras de poda disponíveis, por nome
+PODAS = {
+    'pagoda': PodaPagoda,
+    'classe': PodaClassePosicao,
+}
+
+
+
+class Ordenacao:
+    """
+    Estratégia de ordem em que a busca tenta os saltos de cada estado.
+
+    Esta classe mantém a ordem de SALTOS. As subclasses reordenam os saltos
+    válidos de cada nó em ordenar() e avaliam estados em avaliar(), usada
+    pela busca em feixe para escolher quais estados manter.
+    """
+    nome = 'fixa'
+
+    def __repr__(self):
+        return self.nome
+
+    def preparar(self, jogo):
+        """Calcula o que depende do objetivo do jogo antes da busca.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo, no estado inicial da busca
+        """
+        pass
+
+    def ordenar(self, jogo, saltos: list):
+        """Ordena os saltos válidos do estado atual.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo, no estado a expandir
+            saltos {list} -- saltos válidos, na ordem de SALTOS
+
+        Returns:
+            list -- os mesmos saltos, na ordem em que devem ser tentados
+        """
+        return saltos
+
+    def avaliar(self, bits: int):
+        """Avalia um estado para a busca em feixe.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            int -- menor para estados mais promissores
+        """
+        return 0
+
+    def beco(self, jogo):
+        """Chamado quando a busca chega a um estado sem saltos que não é solução.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo, no estado sem saída
+        """
+        pass
+
+
+class OrdenacaoPesos(Ordenacao):
+    """
+    Ordenação por pesos das posições: cada salto recebe uma chave fixa
+    calculada dos pesos das suas posições, e um estado vale a soma dos pesos
+    das suas peças.
+    """
+    def __init__(self):
+        self.chaves = []
+        self.tabelas = []
+
+    def pesos(self, jogo):
+        """Retorna o peso de cada posição.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Returns:
+            dict -- peso por (linha, coluna)
+        """
+        raise NotImplementedError
+
+    def chave_salto(self, salto, pesos: dict):
+        """Retorna a chave de ordenação de um salto, menor primeiro.
+
+        Arguments:
+            salto {Salto} -- salto a ordenar
+            pesos {dict} -- peso por (linha, coluna)
+
+        Returns:
+            int -- chave do salto
+        """
+        raise NotImplementedError
+
+    def preparar(self, jogo):
+        pesos = self.pesos(jogo)
+        self.chaves = [self.chave_salto(salto, pesos) for salto in jogo.geometria.saltos]
+        self.tabelas = _tabelas_por_byte([pesos[posicao] for posicao in jogo.geometria.coords_validas])
+
+    def ordenar(self, jogo, saltos):
+        chaves = self.chaves
+        return sorted(saltos, key=lambda salto: chaves[salto.indice])
+
+    def avaliar(self, bits):
+        soma = 0
+        for tabela in self.tabelas:
+            soma += tabela[bits & 255]
+            bits >>= 8
+        return soma
+
+
+class OrdenacaoCentro(OrdenacaoPesos):
+    """
+    Tenta primeiro os saltos que mais diminuem a soma das distâncias das
+    peças ao centro do tabuleiro, contando a peça removida: as peças de
+    fora são recolhidas primeiro e as restantes ficam agrupadas.
+    """
+    nome = 'centro'
+
+    def alvos(self, jogo):
+        """Retorna as posições de onde as distâncias são medidas.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Returns:
+            tuple -- posições (linha, coluna)
+        """
+        return (jogo.geometria.centro,)
+
+    def pesos(self, jogo):
+        alvos = self.alvos(jogo)
+        return {posicao: min(_distancia(posicao, alvo) for alvo in alvos)
+                for posicao in jogo.geometria.coords_validas}
+
+    def chave_salto(self, salto, pesos):
+        return pesos[salto.destino] - pesos[salto.origem] - pesos[salto.saltada]
+
+
+class OrdenacaoDistancia(OrdenacaoCentro):
+    """
+    Como OrdenacaoCentro, mas medindo a distância até a posição final
+    possível mais próxima: o buraco inicial quando o jogo é exigente. Com o
+    buraco inicial no centro as duas ordens são iguais.
+    """
+    nome = 'distancia'
+
+    def alvos(self, jogo):
+        return posicoes_finais_possiveis(jogo) or (jogo.geometria.centro,)
+
+
+class OrdenacaoMobilidade(Ordenacao):
+    """
+    Ordena pela mobilidade depois do salto: tenta primeiro os saltos que
+    deixam menos saltos válidos no estado seguinte, os mais restritos, cujas
+    subárvores pequenas são esgotadas (ou guardadas na tabela de
+    transposição) rapidamente.
+
+    Já a busca em feixe, que não volta atrás, mantém os estados com mais
+    saltos válidos.
+    """
+    nome = 'mobilidade'
+    saltos = SALTOS
+
+    def preparar(self, jogo):
+        self.saltos = jogo.geometria.saltos
+
+    def ordenar(self, jogo, saltos):
+        mobilidade = {}
+        for salto in saltos:
+            jogo.saltar(salto)
+            mobilidade[salto.indice] = bin(jogo.validos).count('1')
+            jogo.desfazer_movimento()
+        return sorted(saltos, key=lambda salto: mobilidade[salto.indice])
+
+    def avaliar(self, bits):
+        return -sum(1 for salto in self.saltos if bits & salto.mascara == salto.origem_saltada)
+
+
+class OrdenacaoHistorico(Ordenacao):
+    """
+    Ordenação aprendida durante a busca, com tabelas de histórico e de
+    saltos assassinos (killer moves).
+
+    Cada vez que a busca chega a um beco sem saída com menos peças que
+    qualquer anterior, os saltos do caminho até ele ganham pontos no
+    histórico, mais pontos quanto mais fundo o beco, e cada um passa a ser o
+    assassino do seu número de peças. Os saltos são tentados pelo assassino
+    do número de peças atual, depois por pontos no histórico e depois na
+    ordem da ordenação base.
+    """
+    nome = 'historico'
+
+    def __init__(self, base=None):
+        """Inicializa a ordenação.
+
+        Keyword Arguments:
+            base {Ordenacao} -- ordem usada entre saltos com os mesmos pontos,
+            também usada em avaliar() (default: {Ordenacao()})
+        """
+        self.base = base or Ordenacao()
+        self.historico = []
+        self.assassinos = []
+        self.menos_pecas = 0
+
+    def preparar(self, jogo):
+        self.base.preparar(jogo)
+        self.historico = [0] * len(jogo.geometria.saltos)
+        self.assassinos = [None] * (len(jogo.geometria.coords_validas) + 1)
+        self.menos_pecas = jogo.pecas_restantes
+
+    def ordenar(self, jogo, saltos):
+        historico = self.historico
+        saltos = sorted(self.base.ordenar(jogo, saltos), key=lambda salto: -historico[salto.indice])
+        assassino = self.assassinos[jogo.pecas_restantes]
+        if assassino is not None and assassino in saltos:
+            saltos.remove(assassino)
+            saltos.insert(0, assassino)
+        return saltos
+
+    def avaliar(self, bits):
+        return self.base.avaliar(bits)
+
+    def beco(self, jogo):
+        if jogo.pecas_restantes >= self.menos_pecas:
+            return
+        self.menos_pecas = jogo.pecas_restantes
+        pontos = len(jogo.movimentos) ** 2
+        pecas = jogo.pecas_restantes + len(jogo.movimentos)
+        for movimento in jogo.movimentos:
+            salto = movimento.salto
+            self.historico[salto.indice] += pontos
+            self.assassinos[pecas] = salto
+            pecas -= 1
+
+
+# Estratégias de ordem dos saltos disponíveis, por nome
+ORDENACOES = {
+    'fixa': Ordenacao,
+    'centro': OrdenacaoCentro,
+    'distancia': OrdenacaoDistancia,
+    'mobilidade': OrdenacaoMobilidade,
+    'historico': OrdenacaoHistorico,
+}
+
+
+class EstatisticasBusca:
+    """
+    Contadores de uma busca de SolucionadorResta1, por profundidade.
+
+    Os contadores são listas indexadas pelo número de peças do estado; na
+    exportação a profundidade é o número de saltos desde o tabuleiro com um
+    único buraco (0 com 32 peças, 31 com uma peça). Opcionalmente guarda as
+    subárvores mais lentas a partir de uma profundidade.
+    """
+    def __init__(self, amostras=0, profundidade_amostra=20):
+        """Inicializa os contadores.
+
+        Keyword Arguments:
+            amostras {int} -- número de subárvores mais lentas guardadas, 0
+            para não medir subárvores (default: {0})
+            profundidade_amostra {int} -- profundidade das raízes das
+            subárvores medidas (default: {20})
+        """
+        self.amostras = amostras
+        self.profundidade_amostra = profundidade_amostra
+        self.reiniciar()
+
+    def reiniciar(self, posicoes=len(COORDS_VALIDAS)):
+        """Zera os contadores para uma nova busca.
+
+        Keyword Arguments:
+            posicoes {int} -- número de posições do tabuleiro da busca
+            (default: {len(COORDS_VALIDAS)})
+        """
+        self.posicoes = posicoes
+        tamanho = posicoes + 1
+        # nós cujos saltos foram gerados, saltos gerados, nós que voltaram
+        # sem solução (incluindo os podados e os encontrados na tabela),
+        # nós encontrados na tabela de transposição e nós podados
+        self.expandidos = [0] * tamanho
+        self.gerados = [0] * tamanho
+        self.retrocessos = [0] * tamanho
+        self.acertos_cache = [0] * tamanho
+        self.podas = [0] * tamanho
+        self.tempo = 0
+        self.total_de_movimentos = 0
+        # heap das subárvores mais lentas, (segundos, ordem, nós, movimentos)
+        self.mais_lentas = []
+        self._pecas_amostra = posicoes - 1 - self.profundidade_amostra if self.amostras else None
+        self._abertas = []
+        self._medidas = 0
+
+    def no_expandido(self, pecas: int, gerados: int, nos: int):
+        """Conta um nó cujos saltos foram gerados.
+
+        Arguments:
+            pecas {int} -- peças do estado
+            gerados {int} -- número de saltos válidos do estado
+            nos {int} -- total_de_movimentos do solucionador
+        """
+        self.expandidos[pecas] += 1
+        self.gerados[pecas] += gerados
+        if pecas == self._pecas_amostra:
+            self._abertas.append((time.perf_counter(), nos))
+
+    def retrocesso(self, pecas: int, nos: int, movimentos: list):
+        """Conta um nó expandido que voltou sem solução.
+
+        Arguments:
+            pecas {int} -- peças do estado
+            nos {int} -- total_de_movimentos do solucionador
+            movimentos {list} -- Movimento do início do jogo até o estado
+        """
+        self.retrocessos[pecas] += 1
+        if pecas == self._pecas_amostra and self._abertas:
+            inicio, nos_inicio = self._abertas.pop()
+            amostra = (time.perf_counter() - inicio, self._medidas, nos - nos_inicio)
+            self._medidas += 1
+            if len(self.mais_lentas) < self.amostras:
+                heapq.heappush(self.mais_lentas, amostra + (list(movimentos),))
+            elif amostra > self.mais_lentas[0]:
+                heapq.heapreplace(self.mais_lentas, amostra + (list(movimentos),))
+
+    def no_podado(self, pecas: int):
+        """Conta um nó descartado por uma poda.
+
+        Arguments:
+            pecas {int} -- peças do estado
+        """
+        self.podas[pecas] += 1
+        self.retrocessos[pecas] += 1
+
+    def acerto(self, pecas: int):
+        """Conta um nó encontrado na tabela de transposição.
+
+        Arguments:
+            pecas {int} -- peças do estado
+        """
+        self.acertos_cache[pecas] += 1
+        self.retrocessos[pecas] += 1
+
+    def como_dict(self):
+        """Retorna as estatísticas em um dicionário serializável em JSON.
+
+        Returns:
+            dict -- tempo, nos, nos_por_segundo, contadores por
+            profundidade e subárvores mais lentas, da mais lenta à mais rápida
+        """
+        maximo = self.posicoes - 1
+        return {
+            'tempo': self.tempo,
+            'nos': self.total_de_movimentos,
+            'nos_por_segundo': self.total_de_movimentos / self.tempo if self.tempo else None,
+            'profundidades': [{
+                'profundidade': maximo - pecas,
+                'expandidos': self.expandidos[pecas],
+                'gerados': self.gerados[pecas],
+                'retrocessos': self.retrocessos[pecas],
+                'acertos_cache': self.acertos_cache[pecas],
+                'podas': self.podas[pecas],
+            } for pecas in range(maximo, 0, -1)],
+            'subarvores_mais_lentas': [{
+                'profundidade': self.profundidade_amostra,
+                'movimentos': [[*movimento.posicao, movimento.direcao] for movimento in movimentos],
+                'segundos': segundos,
+                'nos': nos,
+            } for segundos, _, nos, movimentos in sorted(self.mais_lentas, reverse=True)],
+        }
+
+
+# Situações possíveis ao fim de SolucionadorResta1.solucionar()
+SITUACOES = ('solucionado', 'sem_solucao', 'interrompido')
+
+# Número de nós entre as consultas ao relógio quando há prazo para a busca
+INTERVALO_PRAZO = 1024
+
+
+class _BuscaInterrompida(Exception):
+    """Levantada dentro da busca quando o orçamento de tempo ou de nós acaba."""
+
+
+class _TabuleiroObservado:
+    """
+    Tabuleiro que chama os observadores de um solucionador a cada salto e a
+    cada salto desfeito, repassando todo o resto ao tabuleiro original.
+
+    A busca só passa por ele quando há observadores por salto, então sem
+    eles ela não paga nada pela observação.
+    """
+    def __init__(self, jogo, notificar):
+        """Inicializa o tabuleiro observado.
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro original
+            notificar {function} -- chamada sem argumentos após cada alteração
+        """
+        self._jogo = jogo
+        self._notificar = notificar
+
+    def __getattr__(self, nome):
+        return getattr(self._jogo, nome)
+
+    def __str__(self):
+        return str(self._jogo)
+
+    def saltar(self, salto):
+        if self._jogo.saltar(salto):
+            self._notificar()
+            return True
+        return False
+
+    def mover(self, movimento):
+        if self._jogo.mover(movimento):
+            self._notificar()
+            return True
+        return False
+
+    def desfazer_movimento(self):
+        self._jogo.desfazer_movimento()
+        self._notificar()
+
+
+class SolucionadorResta1:
+    def __init__(self, jogo: Tabuleiro, callback_visualizacao = None, transposicao=False,
+                 capacidade_cache=None, capacidade_cache_mb=None, politica_cache='lru', podas=(),
+                 ordenacao=None, largura_feixe=None, estatisticas=None):
+        """Inicializa o solucionador para o jogo.
+
+        A callback_visualizacao quando chamda recebe como parâmetro a instância 
+        do solucionador.
+        Atenção: a callback_visualizacao não deve alterar qualquer estrutura
+        de dados da instância recebida, para que não cause problemas.
+        Ela é registrada como um observador por salto, ver observar().
+
+        Arguments:
+            jogo {Tabuleiro} -- tabuleiro do jogo
+
+        Keyword Arguments:
+            callback_visualizacao {function} -- Função que será chamada
+            para cada alteração do tabuleiro. Está função tem assinatura
+            callback_visualizacao(solucionador). (default: {None})
+            transposicao {bool} -- Se True o algoritmo recursivo guarda os estados
+            sem solução em uma TabelaTransposicao, para não explorá-los novamente
+            quando alcançados por outra ordem de movimentos. O algoritmo não
+            recursivo sempre usa a tabela. (default: {False})
+            capacidade_cache {int} -- Número máximo de estados na tabela,
+            None para ilimitado (default: {None})
+            capacidade_cache_mb {float} -- Capacidade da tabela em megabytes (default: {None})
+            politica_cache {str} -- Política de substituição da tabela, uma de
+            POLITICAS_SUBSTITUICAO (default: {'lru'})
+            podas {list} -- Instâncias de Poda verificadas em cada nó, na ordem
+            informada (default: {()})
+            ordenacao {Ordenacao} -- Estratégia de ordem dos saltos em cada nó,
+            None para a ordem de SALTOS (default: {None})
+            largura_feixe {int} -- Se informado, solucionar() faz uma busca em
+            feixe: a cada salto só os largura_feixe estados mais bem avaliados
+            pela ordenacao são mantidos. A busca é incompleta, e não encontrar
+            solução não prova que ela não existe. (default: {None})
+            estatisticas {EstatisticasBusca} -- Se informado, recebe os
+            contadores de cada busca; sem ele a busca não paga nada por
+            eles além de uma comparação por nó (default: {None})
+        """
+        self.jogo = jogo
+        # observadores chamados a cada salto, e observadores amostrados como
+        # listas [observador, a_cada_nos, a_cada_segundos, próximo nó, próximo instante]
+        self._observadores = []
+        self._amostrados = []
+        self._relogio = False
+        if callback_visualizacao is not None:
+            self.observar(callback_visualizacao)
+        self.total_de_movimentos = 0
+        self.tempo = 0
+        self.transposicao = transposicao
+        self.capacidade_cache = capacidade_cache
+        self.capacidade_cache_mb = capacidade_cache_mb
+        self.politica_cache = politica_cache
+        self.tabela_transposicao = None
+        self.podas = list(podas)
+        self._podas_por_no = [poda for poda in self.podas if poda.por_no]
+        self.ordenacao = ordenacao or Ordenacao()
+        # a ordem fixa dispensa a chamada a cada nó
+        self._ordenacao_por_no = None if type(self.ordenacao) is Ordenacao else self.ordenacao
+        self.largura_feixe = largura_feixe
+        self.estatisticas = estatisticas
+        # resultado da última busca: uma de SITUACOES, e a melhor posição
+        # alcançada (menos peças, depois menor soma das distâncias das peças
+        # à posição final) com os movimentos até ela desde o início do jogo
+        self.situacao = None
+        self.melhor_pecas = None
+        self.melhor_distancia = None
+        self.melhor_movimentos = []
+        self._distancia = OrdenacaoDistancia()
+        # orçamento da busca, ver _verificar_limites
+        self._max_nos = None
+        self._prazo = None
+        self._proxima_verificacao = 0
+        # número de soluções de cada estado canônico, preenchido por contar_solucoes,
+        # com o estado de onde a contagem partiu e a função de chave usada
+        self.contagens = None
+        self._bits_contagem = None
+        self._chave_contagem = None
+        # caminho da busca não recursiva em andamento, usado por ceder_saltos
+        self._caminho = []
+        self._inicio_caminho = 0
+
+    def solucionar(self, recursivo=True, continuar=False, timeout=None, max_nos=None):
+        """Soluciona o jogo se possível.
+
+        Ao fim da busca situacao diz se o jogo foi solucionado, se foi
+        provado que não tem solução ou se a busca foi interrompida sem
+        explorar todos os estados. Interrompida, o jogo fica na melhor
+        posição alcançada, a de melhor_movimentos.
+
+        Keyword Arguments:
+            recursivo {bool} -- Define se será utilizado o algoritmo recursivo. (default: {True})
+            continuar {bool} -- Se True a busca parte do estado atual do tabuleiro,
+            sem reiniciar o jogo, e reaproveita a tabela de transposição de
+            chamadas anteriores. (default: {False})
+            timeout {float} -- Segundos de busca antes de interrompê-la,
+            None para não limitar (default: {None})
+            max_nos {int} -- Número de nós (movimentos realizados) antes de
+            interromper a busca, None para não limitar (default: {None})
+
+        Returns:
+            bool -- Retorna True se encontrar uma solução, False caso contrário.
+        """
+        if not continuar:
+            self.jogo.reset()
+            self.tabela_transposicao = None
+        self.total_de_movimentos = 0
+        if (self.transposicao or not recursivo) and not self.largura_feixe and self.tabela_transposicao is None:
+            self.tabela_transposicao = TabelaTransposicao(simetrias_do_jogo(self.jogo),
+                                                          self.capacidade_cache,
+                                                          self.capacidade_cache_mb,
+                                                          self.politica_cache)
+        impossivel = self._preparar_podas()
+        self.ordenacao.preparar(self.jogo)
+        self._distancia.preparar(self.jogo)
+        jogo = self.jogo
+        inicio = len(jogo.movimentos)
+        self._posicoes = len(jogo.geometria.coords_validas)
+        self.melhor_pecas = self._posicoes + 1
+        self.melhor_distancia = 0
+        self._registrar_melhor(jogo.pecas_restantes, jogo.compactar(), jogo.movimentos)
+        if self.estatisticas is not None:
+            self.estatisticas.reiniciar(self._posicoes)
+        tempo_inicio = time.perf_counter()
+        self._max_nos = max_nos
+        self._prazo = None if timeout is None else tempo_inicio + timeout
+        self._relogio = self._prazo is not None
+        for amostrado in self._amostrados:
+            _, a_cada_nos, a_cada_segundos, _, _ = amostrado
+            amostrado[3] = a_cada_nos if a_cada_nos is not None else float('inf')
+            amostrado[4] = tempo_inicio + a_cada_segundos if a_cada_segundos is not None else float('inf')
+            self._relogio = self._relogio or a_cada_segundos is not None
+        if self._observadores:
+            self.jogo = _TabuleiroObservado(jogo, self._notificar)
+        interrompida = False
+        try:
+            self._verificar_limites()
+            if impossivel and not jogo.esta_solucionado():
+                tem_solucao = False
+            elif self.largura_feixe:
+                tem_solucao = self._solucionar_feixe()
+            elif recursivo:
+                tem_solucao = self._solucionar()
+            else:
+                tem_solucao = self._solucionar_nao_recursivo()
+        except _BuscaInterrompida:
+            tem_solucao = False
+            interrompida = True
+        finally:
+            self.jogo = jogo
+
+        if tem_solucao:
+            self.situacao = 'solucionado'
+        elif interrompida or self.largura_feixe:
+            # a busca em feixe também deixa estados sem explorar
+            self.situacao = 'interrompido'
+            while len(jogo.movimentos) > inicio:
+                jogo.desfazer_movimento()
+            for movimento in self.melhor_movimentos[inicio:]:
+                jogo.mover(movimento)
+        else:
+            self.situacao = 'sem_solucao'
+        self.tempo = time.perf_counter() - tempo_inicio
+        if self.estatisticas is not None:
+            self.estatisticas.tempo = self.tempo
+            self.estatisticas.total_de_movimentos = self.total_de_movimentos
+        return tem_solucao
+
+    def observar(self, observador, a_cada_nos=None, a_cada_ms=None):
+        """Registra uma função chamada com o solucionador durante as buscas.
+
+        Sem a_cada_nos nem a_cada_ms a função é chamada a cada salto e a cada
+        salto desfeito, e a busca passa a alterar o tabuleiro por um
+        _TabuleiroObservado. Com eles a função é chamada quando se passaram
+        a_cada_nos nós ou a_cada_ms milissegundos desde a última chamada,
+        verificados junto com o orçamento da busca, sem custo a cada nó; o
+        relógio é consultado a cada INTERVALO_PRAZO nós, o que limita a
+        precisão de a_cada_ms.
+
+        Arguments:
+            observador {function} -- chamada como observador(solucionador);
+            não deve alterar o solucionador nem o tabuleiro, exceto por
+            ceder_saltos()
+
+        Keyword Arguments:
+            a_cada_nos {int} -- número de nós entre as chamadas (default: {None})
+            a_cada_ms {float} -- milissegundos entre as chamadas (default: {None})
+        """
+        if a_cada_nos is None and a_cada_ms is None:
+            self._observadores.append(observador)
+        else:
+            a_cada_segundos = a_cada_ms / 1000 if a_cada_ms is not None else None
+            self._amostrados.append([observador, a_cada_nos, a_cada_segundos, 0, 0])
+
+    def _notificar(self):
+        """Chama os observadores por salto."""
+        for observador in self._observadores:
+            observador(self)
+
+    def _verificar_limites(self):
+        """Interrompe a busca se o orçamento de nós ou de tempo acabou e
+        chama os observadores amostrados cuja vez chegou.
+
+        Chamado pela busca só quando total_de_movimentos alcança
+        _proxima_verificacao, de modo que cada nó paga apenas uma comparação:
+        sem orçamento nem observadores amostrados a verificação nunca
+        acontece, e com prazo ou observadores por tempo o relógio é
+        consultado a cada INTERVALO_PRAZO nós.
+
+        Raises:
+            _BuscaInterrompida -- se o orçamento acabou
+        """
+        nos = self.total_de_movimentos
+        if self._max_nos is not None and nos >= self._max_nos:
+            raise _BuscaInterrompida()
+        agora = time.perf_counter() if self._relogio else 0
+        if self._prazo is not None and agora >= self._prazo:
+            raise _BuscaInterrompida()
+
+        proxima = float('inf') if self._max_nos is None else self._max_nos
+        for amostrado in self._amostrados:
+            observador, a_cada_nos, a_cada_segundos, proximo_no, proximo_instante = amostrado
+            if nos >= proximo_no or (self._relogio and agora >= proximo_instante):
+                observador(self)
+                if a_cada_nos is not None:
+                    amostrado[3] = nos + a_cada_nos
+                if a_cada_segundos is not None:
+                    amostrado[4] = agora + a_cada_segundos
+            proxima = min(proxima, amostrado[3])
+        if self._relogio:
+            proxima = min(proxima, nos + INTERVALO_PRAZO)
+        self._proxima_verificacao = proxima
+
+    def _registrar_melhor(self, pecas: int, bits: int, movimentos: list):
+        """Guarda o estado como a melhor posição alcançada, se for melhor
+        que a atual.
+
+        Arguments:
+            pecas {int} -- número de peças do estado
+            bits {int} -- tabuleiro compactado
+            movimentos {list} -- Movimento do início do jogo até o estado,
+            copiados só se ele for o melhor
+        """
+        distancia = self._distancia.avaliar(bits)
+        if (pecas, distancia) < (self.melhor_pecas, self.melhor_distancia):
+            self.melhor_pecas = pecas
+            self.melhor_distancia = distancia
+            self.melhor_movimentos = list(movimentos)
+
+    def _preparar_podas(self):
+        """Prepara as podas para o estado atual do jogo.
+
+        Returns:
+            bool -- True se alguma poda já descarta o estado inicial
+        """
+        impossivel = False
+        for poda in self.podas:
+            impossivel = poda.preparar(self.jogo) or impossivel
+        return impossivel
+
+    def _saltos_do_no(self):
+        """Retorna os saltos válidos do estado atual na ordem da ordenação.
+
+        Returns:
+            list -- saltos a tentar, na ordem em que devem ser tentados
+        """
+        saltos = self.jogo.saltos_validos()
+        ordenacao = self._ordenacao_por_no
+        if ordenacao is not None:
+            if saltos:
+                saltos = ordenacao.ordenar(self.jogo, saltos)
+            else:
+                ordenacao.beco(self.jogo)
+        return saltos
+
+    def _solucionar(self):
+        """Tenta solucionar o jogo utilizando backtracking.
+
+        Returns:
+            bool -- True se existe solução, False se não existe solução.
+        """
+        if self.jogo.pecas_restantes == 1:
+            if self.jogo.esta_solucionado():
+                return True
+
+        jogo = self.jogo
+        if jogo.pecas_restantes <= self.melhor_pecas:
+            self._registrar_melhor(jogo.pecas_restantes, jogo.compactar(), jogo.movimentos)
+        if self.total_de_movimentos >= self._proxima_verificacao:
+            self._verificar_limites()
+        tabela = self.tabela_transposicao
+        estatisticas = self.estatisticas
+        if self._podas_por_no or tabela is not None:
+            bits = jogo.compactar()
+            for poda in self._podas_por_no:
+                if poda.podar(bits):
+                    if estatisticas is not None:
+                        estatisticas.no_podado(jogo.pecas_restantes)
+                    return False
+            if tabela is not None:
+                chave = tabela.chave(bits)
+                if tabela.contem(chave):
+                    if estatisticas is not None:
+                        estatisticas.acerto(jogo.pecas_restantes)
+                    return False
+
+        saltos = self._saltos_do_no()
+        if estatisticas is not None:
+            estatisticas.no_expandido(jogo.pecas_restantes, len(saltos), self.total_de_movimentos)
+        for salto in saltos:
+            if jogo.saltar(salto):
+                self.total_de_movimentos += 1
+                if self._solucionar():
+                    return True
+
+                jogo.desfazer_movimento()
+
+        if tabela is not None:
+            tabela.adicionar(chave, self._posicoes - jogo.pecas_restantes)
+        if estatisticas is not None:
+            estatisticas.retrocesso(jogo.pecas_restantes, self.total_de_movimentos, jogo.movimentos)
+
+        # retorna False caso tenha tentado todas as possibilidades
+        # e nenhuma solução foi encontrada
+        return False
+
+    def _solucionar_nao_recursivo(self):
+        """Tenta solucionar o jogo utilizando backtracking sem o uso de recursão.
+
+        Returns:
+            bool -- True se existe solução, False se não existe solução.
+        """
+        # mantém uma pilha com os saltos ainda não tentados de cada estado do
+        # caminho atual, invertida para que sejam tentados na mesma ordem
+        # que no algoritmo recursivo; quando a pilha de um estado fica vazia
+        # ele é guardado na tabela de transposição para não ser visitado novamente
+        jogo = self.jogo
+        tabela = self.tabela_transposicao
+        podas = self._podas_por_no
+        estatisticas = self.estatisticas
+        if jogo.esta_solucionado():
+            return True
+        bits = jogo.compactar()
+        if any(poda.podar(bits) for poda in podas):
+            if estatisticas is not None:
+                estatisticas.no_podado(jogo.pecas_restantes)
+            return False
+        chave = tabela.chave(bits)
+        if tabela.contem(chave):
+            if estatisticas is not None:
+                estatisticas.acerto(jogo.pecas_restantes)
+            return False
+
+        caminho = [(chave, self._saltos_do_no()[::-1])]
+        if estatisticas is not None:
+            estatisticas.no_expandido(jogo.pecas_restantes, len(caminho[-1][1]), self.total_de_movimentos)
+        self._caminho = caminho
+        self._inicio_caminho = len(jogo.movimentos)
+        while caminho:
+            chave, saltos = caminho[-1]
+            if not saltos:
+                caminho.pop()
+                # estados sem chave tiveram saltos cedidos (ver ceder_saltos)
+                if chave is not None:
+                    tabela.adicionar(chave, self._posicoes - jogo.pecas_restantes)
+                if estatisticas is not None:
+                    estatisticas.retrocesso(jogo.pecas_restantes, self.total_de_movimentos, jogo.movimentos)
+                if caminho:
+                    jogo.desfazer_movimento()
+                continue
+
+            jogo.saltar(saltos.pop())
+            self.total_de_movimentos += 1
+
+            if jogo.pecas_restantes == 1:
+                if jogo.esta_solucionado():
+                    return True
+
+            bits = jogo.compactar()
+            if jogo.pecas_restantes <= self.melhor_pecas:
+                self._registrar_melhor(jogo.pecas_restantes, bits, jogo.movimentos)
+            if self.total_de_movimentos >= self._proxima_verificacao:
+                self._verificar_limites()
+            if any(poda.podar(bits) for poda in podas):
+                if estatisticas is not None:
+                    estatisticas.no_podado(jogo.pecas_restantes)
+                jogo.desfazer_movimento()
+                continue
+
+            chave = tabela.chave(bits)
+            if tabela.contem(chave):
+                if estatisticas is not None:
+                    estatisticas.acerto(jogo.pecas_restantes)
+                jogo.desfazer_movimento()
+            else:
+                caminho.append((chave, self._saltos_do_no()[::-1]))
+                if estatisticas is not None:
+                    estatisticas.no_expandido(jogo.pecas_restantes, len(caminho[-1][1]),
+                                              self.total_de_movimentos)
+
+        # retorna False caso tenha tendado todas as possibilidades
+        # e nenhuma solução foi encontrada
+        return False
+
+    def _solucionar_feixe(self):
+        """Busca uma solução em feixe, camada a camada a partir do estado atual.
+
+        Cada camada tem os estados alcançados com um salto a partir dos
+        estados mantidos da anterior, sem repetir estados equivalentes por
+        simetria; só os largura_feixe estados com menor valor em
+        Ordenacao.avaliar passam para a camada seguinte. Nas estatísticas os
+        estados repetidos na camada contam como acertos da tabela.
+
+        Returns:
+            bool -- True se encontrar uma solução, False caso contrário
+        """
+        jogo = self.jogo
+        chave = TabelaTransposicao(simetrias_do_jogo(jogo)).chave
+        podas = self._podas_por_no
+        avaliar = self.ordenacao.avaliar
+        estatisticas = self.estatisticas
+        saltos_geometria = jogo.geometria.saltos
+        alvo = jogo.geometria.bits[tuple(jogo.pos_inicial)] if jogo.peca_final_no_buraco_inicial else None
+
+        # cada estado guarda os saltos que levam a ele a partir do atual
+        feixe = [(jogo.compactar(), ())]
+        pecas = jogo.pecas_restantes
+        while feixe:
+            for bits, saltos in feixe:
+                if bits & (bits - 1) == 0 and (alvo is None or bits == alvo):
+                    for salto in saltos:
+                        jogo.saltar(salto)
+                    return True
+                self._registrar_melhor(pecas, bits, jogo.movimentos + [salto.movimento for salto in saltos])
+
+            camada = {}
+            for bits, saltos in feixe:
+                gerados = 0
+                for salto in saltos_geometria:
+                    if bits & salto.mascara == salto.origem_saltada:
+                        gerados += 1
+                        self.total_de_movimentos += 1
+                        if self.total_de_movimentos >= self._proxima_verificacao:
+                            self._verificar_limites()
+                        filho = bits ^ salto.mascara
+                        chave_filho = chave(filho)
+                        if chave_filho in camada:
+                            if estatisticas is not None:
+                                estatisticas.acerto(pecas - 1)
+                            continue
+                        if any(poda.podar(filho) for poda in podas):
+                            if estatisticas is not None:
+                                estatisticas.no_podado(pecas - 1)
+                            continue
+                        camada[chave_filho] = (filho, saltos + (salto,))
+                if estatisticas is not None:
+                    estatisticas.expandidos[pecas] += 1
+                    estatisticas.gerados[pecas] += gerados
+            feixe = heapq.nsmallest(self.largura_feixe, camada.values(), key=lambda estado: avaliar(estado[0]))
+            pecas -= 1
+        return False
+
+    def ceder_saltos(self):
+        """Retira da busca não recursiva em andamento os saltos ainda não
+        tentados do estado mais raso do caminho atual, para que sejam
+        explorados em outro lugar (por outro processo, por exemplo).
+
+        Deve ser chamado por um observador (ver observar()) durante
+        solucionar(recursivo=False). Os estados do caminho até esse estado
+        deixam de ser guardados na tabela de transposição quando esgotados,
+        já que não terão sido explorados por completo.
+
+        Returns:
+            tuple -- (movimentos, saltos): movimentos é a lista de Movimento
+            do início do jogo até o estado, e saltos os saltos retirados,
+            vazia se nenhum estado do caminho tem saltos a ceder
+        """
+        caminho = self._caminho
+        for nivel, (_, saltos) in enumerate(caminho):
+            if saltos:
+                cedidos = list(saltos)
+                saltos.clear()
+                for anterior in range(nivel + 1):
+                    caminho[anterior] = (None, caminho[anterior][1])
+                return self.jogo.movimentos[:self._inicio_caminho + nivel], cedidos
+        return [], []
+
+    def contar_solucoes(self, continuar=False):
+        """Conta as soluções do jogo, como sequências distintas de saltos.
+
+        O número de soluções de cada estado é guardado em contagens pela
+        forma canônica do estado, de modo que subárvores compartilhadas por
+        várias ordens de movimentos (ou equivalentes por simetria) são
+        contadas uma única vez. As podas informadas são usadas para descartar
+        estados sem solução.
+
+        Keyword Arguments:
+            continuar {bool} -- Se True conta a partir do estado atual do
+            tabuleiro, sem reiniciar o jogo, e reaproveita as contagens de
+            chamadas anteriores. (default: {False})
+
+        Returns:
+            int -- número de soluções
+        """
+        if not continuar:
+            self.jogo.reset()
+            self.contagens = None
+        impossivel = self._preparar_podas()
+        self.total_de_movimentos = 0
+        if self.contagens is None:
+            self.contagens = {}
+        self._bits_contagem = self.jogo.compactar()
+        self._chave_contagem = TabelaTransposicao(simetrias_do_jogo(self.jogo)).chave
+        tempo_inicio = time.perf_counter()
+        if impossivel:
+            total = 0
+        else:
+            total = self._contar(self._bits_contagem, self.jogo.geometria.saltos, self.contagens,
+                                 self._chave_contagem)
+        self.tempo = time.perf_counter() - tempo_inicio
+        return total
+
+    def contar_solucoes_distintas(self):
+        """Conta as soluções distintas a menos de simetria.
+
+        Usa o lema de Burnside sobre as simetrias que preservam o objetivo e
+        o estado inicial: uma solução é fixada por uma simetria quando todos
+        os seus saltos são, então as soluções fixadas são contadas apenas com
+        os saltos invariantes pela simetria.
+
+        Returns:
+            int -- número de classes de soluções equivalentes por simetria
+        """
+        if self.contagens is None:
+            self.contar_solucoes(continuar=True)
+        bits = self._bits_contagem
+        grupo = [simetria for simetria in simetrias_do_jogo(self.jogo) if simetria.aplicar(bits) == bits]
+        fixadas = 0
+        for simetria in grupo:
+            if simetria.nome == 'identidade':
+                fixadas += self._contagem(bits)
+            else:
+                saltos = [salto for salto in self.jogo.geometria.saltos
+                          if simetria.saltos[salto.indice] == salto.indice]
+                fixadas += self._contar(bits, saltos, {}, lambda bits: bits)
+        return fixadas // len(grupo)
+
+    def gerar_solucoes(self):
+        """Gera as soluções uma a uma, percorrendo as contagens sem guardá-las.
+
+        Só os saltos que levam a estados com solução são seguidos, então cada
+        solução é produzida sem exploração inútil.
+
+        Returns:
+            generator -- listas de Movimento a partir do estado contado
+        """
+        if self.contagens is None:
+            self.contar_solucoes(continuar=True)
+        caminho = []
+        saltos = self.jogo.geometria.saltos
+
+        def gerar(bits):
+            if bits & (bits - 1) == 0:
+                yield list(caminho)
+                return
+            for salto in saltos:
+                if bits & salto.mascara == salto.origem_saltada and self._contagem(bits ^ salto.mascara):
+                    caminho.append(salto.movimento)
+                    yield from gerar(bits ^ salto.mascara)
+                    caminho.pop()
+
+        if self._contagem(self._bits_contagem):
+            yield from gerar(self._bits_contagem)
+
+    def _contagem(self, bits: int):
+        """Retorna o número de soluções de um estado já contado.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            int -- número de soluções, 0 para estados podados
+        """
+        if bits & (bits - 1) == 0:
+            return int(not self.jogo.peca_final_no_buraco_inicial
+                       or bits == self.jogo.geometria.bits[tuple(self.jogo.pos_inicial)])
+        return self.contagens.get(self._chave_contagem(bits), 0)
+
+    def _contar(self, bits: int, saltos, contagens: dict, chave):
+        """Conta as soluções a partir de um estado usando apenas os saltos informados.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+            saltos {list} -- saltos da tabela do tabuleiro permitidos
+            contagens {dict} -- memória das contagens por chave
+            chave {function} -- chave do estado na memória
+
+        Returns:
+            int -- número de soluções
+        """
+        if bits & (bits - 1) == 0:
+            return self._contagem(bits)
+        chave_estado = chave(bits)
+        if chave_estado in contagens:
+            return contagens[chave_estado]
+        for poda in self._podas_por_no:
+            if poda.podar(bits):
+                return 0
+
+        total = 0
+        for salto in saltos:
+            if bits & salto.mascara == salto.origem_saltada:
+                self.total_de_movimentos += 1
+                total += self._contar(bits ^ salto.mascara, saltos, contagens, chave)
+        contagens[chave_estado] = total
+        return total
+
+
+def _positivo(tipo):
+    """Retorna um tipo para o argparse que só aceita valores maiores que zero.
+
+    Arguments:
+        tipo {type} -- int ou float
+
+    Returns:
+        function -- conversor do texto do argumento
+    """
+    def converter(texto):
+        valor = tipo(texto)
+        if valor <= 0:
+            raise argparse.ArgumentTypeError(f"o valor deve ser maior que zero: {texto}")
+        return valor
+    converter.__name__ = tipo.__name__
+    return converter
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Solucionador do resta 1, por padrão no tabuleiro inglês',
+                                                formatter_class=argparse.RawTextHelpFormatter)
+
+    parser_argumentos.add_argument('--gui', '-g', action='store_true', 
+                                   help='Usar visualização com Pygame e Tkinter')
+
+    parser_argumentos.add_argument('--recursivo', '-r', action='store_true', 
+                                   help='Usar função recursiva para solucionar')
+
+    parser_argumentos.add_argument('--tabuleiro', default='ingles',
+                                    help=f'Formato do tabuleiro: {", ".join(MASCARAS_TABULEIROS)}, ou um arquivo\n'
+                                         'com a máscara (uma linha de texto por linha, o nas posições) ou\n'
+                                         'com uma lista JSON de posições [linha, coluna]')
+
+    parser_argumentos.add_argument('--posicao', '-p', nargs=2, default=None, type=int,
+                                    help='Posição inicial na forma linha coluna (padrão: centro do tabuleiro)')
+
+    parser_argumentos.add_argument('--exigente', '-e', action='store_true', 
+                                    help='Exige que a posição final da última peça seja igual a posição do buraco inicial')
+
+    parser_argumentos.add_argument('--bits', '-b', action='store_true',
+                                    help='Usar tabuleiro compactado em um inteiro (operações de bits)')
+
+    parser_argumentos.add_argument('--verificar-movimentos', action='store_true',
+                                    help='Conferir a cada nó os saltos válidos mantidos pelo tabuleiro com uma\n'
+                                         'varredura completa (depuração, mais lento)')
+
+    parser_argumentos.add_argument('--transposicao', '-t', action='store_true',
+                                    help='Guardar estados sem solução, considerando simetrias (apenas recursivo)')
+
+    parser_argumentos.add_argument('--cache', type=_positivo(int), default=None,
+                                    help='Número máximo de estados na tabela de transposição')
+
+    parser_argumentos.add_argument('--cache-mb', type=_positivo(float), default=None,
+                                    help='Memória aproximada da tabela de transposição em MB')
+
+    parser_argumentos.add_argument('--politica', choices=POLITICAS_SUBSTITUICAO, default=None,
+                                    help='Política de substituição da tabela de transposição cheia (padrão: lru)')
+
+    parser_argumentos.add_argument('--podas', nargs='+', choices=list(PODAS), default=[],
+                                    help='Regras de poda admissíveis verificadas em cada estado')
+
+    parser_argumentos.add_argument('--ordenacao', choices=list(ORDENACOES), default='fixa',
+                                    help='Ordem em que os saltos de cada estado são tentados')
+
+    parser_argumentos.add_argument('--feixe', type=_positivo(int), default=None,
+                                    help='Busca em feixe mantendo esse número de estados por salto,\n'
+                                         'escolhidos pela --ordenacao (incompleta: pode não achar solução)')
+
+    parser_argumentos.add_argument('--timeout', type=_positivo(float), default=None,
+                                    help='Segundos de busca antes de interrompê-la e mostrar a melhor posição\n'
+                                         'alcançada (também por consulta com --jsonl)')
+
+    parser_argumentos.add_argument('--max-nos', type=_positivo(int), default=None,
+                                    help='Número de nós antes de interromper a busca e mostrar a melhor posição\n'
+                                         'alcançada (também por consulta com --jsonl)')
+
+    parser_argumentos.add_argument('--stats', nargs='?', const='-', default=None, metavar='ARQUIVO',
+                                    help='Gravar em JSON os contadores da busca por profundidade\n'
+                                         '(sem ARQUIVO, na saída padrão)')
+
+    parser_argumentos.add_argument('--amostras-lentas', type=int, default=0,
+                                    help='Com --stats, guardar esse número de subárvores mais lentas')
+
+    parser_argumentos.add_argument('--profundidade-amostra', type=int, default=20,
+                                    help='Profundidade das raízes das subárvores medidas por --amostras-lentas')
+
+    parser_argumentos.add_argument('--rastro', default=None, metavar='ARQUIVO',
+                                    help='Gravar em ARQUIVO o rastro binário dos saltos e saltos desfeitos da busca\n'
+                                         '(com --gui, o rastro reproduzido)')
+
+    parser_argumentos.add_argument('--reproduzir', default=None, metavar='ARQUIVO',
+                                    help='Reproduzir na visualização um rastro gravado com --rastro')
+
+    parser_argumentos.add_argument('--workers', '-w', type=int, default=0,
+                                    help='Número de processos para solucionar em paralelo (usa o algoritmo recursivo)')
+
+    parser_argumentos.add_argument('--profundidade-prefixo', type=int, default=3,
+                                    help='Saltos expandidos antes de distribuir as subárvores entre os processos')
+
+    parser_argumentos.add_argument('--limite-nos', type=_positivo(int), default=None,
+                                    help='A cada esse número de nós um processo cede os saltos ainda não tentados\n'
+                                         'do seu caminho se houver processos ociosos')
+
+    parser_argumentos.add_argument('--jsonl', action='store_true',
+                                    help='Ler posições do jogo em JSONL da entrada padrão e escrever as soluções na saída padrão')
+
+    parser_argumentos.add_argument('--em-voo', type=int, default=None,
+                                    help='Máximo de consultas --jsonl em processamento ao mesmo tempo (padrão: 2 x --workers)')
+
+    parser_argumentos.add_argument('--servir', default=None, metavar='ENDERECO',
+                                    help='Atender consultas JSON por linha em host:porta, porta ou unix:CAMINHO,\n'
+                                         'mantendo as tabelas entre as consultas (ver servidor_resta_um)')
+
+    parser_argumentos.add_argument('--banco', nargs='+', default=[],
+                                    help='Bancos de soluções consultados antes da busca por --servir')
+
+    parser_argumentos.add_argument('--pacotes', nargs='?', const='restrita', default=None,
+                                    choices=['restrita', 'completa'],
+                                    help='Buscar tendo como arestas pacotes, sequências de saltos que limpam blocos\n'
+                                         'de 3 ou 6 posições (ver pacotes_resta_um); restrita só tenta saltos\n'
+                                         'simples onde nenhum pacote se aplica, completa os tenta depois dos pacotes')
+
+    parser_argumentos.add_argument('--bidirecional', action='store_true',
+                                    help='Buscar a partir do início e do fim ao mesmo tempo, encontrando-se no meio\n'
+                                         '(precisa do NumPy)')
+
+    parser_argumentos.add_argument('--profundidade-reversa', type=int, default=None,
+                                    help='Saltos desfeitos a partir do fim com --bidirecional\n'
+                                         '(padrão: expande sempre a fronteira menor)')
+
+    parser_argumentos.add_argument('--contar', action='store_true',
+                                    help='Contar todas as soluções, no total e a menos de simetria')
+
+    parser_argumentos.add_argument('--todas', action='store_true',
+                                    help='Solucionar todas as posições iniciais, com e sem --exigente')
+
+    parser_argumentos.add_argument('--saida', default='resultados_resta_um.json',
+                                    help='Arquivo .json ou .csv com os resultados de --todas')
+
+    parser_argumentos.add_argument('--cache-lote', default='resta_um_cache.json',
+                                    help='Arquivo com os resultados já calculados por --todas')
+
+    return parser_argumentos
+
+
+def exibir_config(argumentos, jogo):
+    print("\nConfiguração:")
     recursivo = 'sim' if argumentos.recursivo else 'não'
     print(f"Usar implementação recursiva: {recursivo}")
 
+    print(f"Formato do tabuleiro: {jogo.geometria.nome} ({len(jogo.geometria.coords_validas)} posições, "
+          f"{len(jogo.geometria.saltos)} saltos)")
     print(f"Posição inicial: {argumentos.posicao}")
 
     exigente = 'sim' if argumentos.exigente else 'não'
     print(f"Exigir peça final na posição inicial: {exigente}")
 
+    bits = 'sim' if argumentos.bits else 'não'
+    print(f"Usar tabuleiro compactado: {bits}")
+
+    transposicao = 'sim' if argumentos.transposicao else 'não'
+    print(f"Usar tabela de transposição: {transposicao}")
+
+    if argumentos.cache is not None or argumentos.cache_mb is not None:
+        capacidade = f"{argumentos.cache} estados" if argumentos.cache_mb is None else f"{argumentos.cache_mb} MB"
+        print(f"Capacidade da tabela: {capacidade} (política {argumentos.politica})")
+
+    podas = ', '.join(argumentos.podas) or 'nenhuma'
+    print(f"Podas: {podas}")
+
+    print(f"Ordenação dos saltos: {argumentos.ordenacao}")
+    if argumentos.feixe:
+        print(f"Busca em feixe: {argumentos.feixe} estados")
+    if argumentos.timeout is not None or argumentos.max_nos is not None:
+        print(f"Orçamento da busca: {argumentos.timeout} segundos, {argumentos.max_nos} nós")
+
+    if argumentos.bidirecional:
+        print("Busca bidirecional: sim")
+
+    if argumentos.pacotes is not None:
+        print(f"Busca por pacotes: {argumentos.pacotes}")
+
+    if argumentos.workers:
+        print(f"Processos: {argumentos.workers} (prefixos de {argumentos.profundidade_prefixo} saltos)")
+
     vis = 'sim' if argumentos.gui else 'não'
     print(f"Usar visualização: {vis}\n")
     print("Tabuleiro: ")
@@ -456,24 +2846,182 @@ def exibir_config(argumentos, jogo):
 if __name__ == "__main__":
     parser_argumentos = setup_parser_argumentos()
     argumentos = parser_argumentos.parse_args()
-    
-    if tuple(argumentos.posicao) not in COORDS_VALIDAS:
+    tabela_configurada = argumentos.cache is not None or argumentos.cache_mb is not None \
+        or argumentos.politica is not None
+    if tabela_configurada and argumentos.recursivo and not argumentos.transposicao:
+        parser_argumentos.error("--cache, --cache-mb e --politica configuram a tabela de transposição, "
+                                "que o algoritmo recursivo só usa com --transposicao")
+    argumentos.politica = argumentos.politica or 'lru'
+    orcamento = argumentos.timeout is not None or argumentos.max_nos is not None
+    consultas = argumentos.jsonl or argumentos.servir is not None
+    if argumentos.banco and argumentos.servir is None:
+        parser_argumentos.error("--banco só vale com --servir")
+    if orcamento and not consultas and (argumentos.bidirecional or argumentos.workers
+                                               or argumentos.todas or argumentos.contar):
+        parser_argumentos.error("--timeout e --max-nos só valem para a busca de um jogo com o "
+                                "solucionador sequencial e para --jsonl e --servir, onde limitam cada consulta")
+    if argumentos.stats is not None and (consultas or argumentos.bidirecional or argumentos.workers
+                                         or argumentos.todas or argumentos.contar or argumentos.gui):
+        parser_argumentos.error("--stats só vale para a busca de um jogo com o solucionador sequencial")
+    if argumentos.rastro is not None and (consultas or argumentos.bidirecional or argumentos.workers
+                                          or argumentos.todas or argumentos.contar or argumentos.feixe):
+        parser_argumentos.error("--rastro só vale para a busca em profundidade de um jogo com o "
+                                "solucionador sequencial")
+    try:
+        geometria = carregar_tabuleiro(argumentos.tabuleiro)
+    except ValueError as erro:
+        parser_argumentos.error(str(erro))
+    if geometria is not INGLES and (argumentos.gui or argumentos.rastro is not None or consultas
+                                    or argumentos.bidirecional or argumentos.workers or argumentos.todas):
+        parser_argumentos.error("--gui, --rastro, --jsonl, --servir, --bidirecional, --workers e --todas só "
+                                "tratam do tabuleiro inglês")
+    if argumentos.posicao is None:
+        argumentos.posicao = list(geometria.centro)
+    if argumentos.pacotes is not None and (consultas or argumentos.bidirecional or argumentos.workers
+                                           or argumentos.todas or argumentos.contar or argumentos.feixe
+                                           or argumentos.gui):
+        parser_argumentos.error("--pacotes só vale para a busca em profundidade de um jogo com o "
+                                "solucionador sequencial")
+    if argumentos.cache_mb is not None and capacidade_por_mb(argumentos.cache_mb, argumentos.politica) < 1:
+        parser_argumentos.error(f"--cache-mb {argumentos.cache_mb} não comporta nenhuma entrada "
+                                f"da política {argumentos.politica}")
+
+    if argumentos.reproduzir is not None:
+        try:
+            import visualizacao_resta_um
+        except ModuleNotFoundError:
+            print('--reproduzir precisa do modulo Pygame e do modulo de visualização')
+            os.sys.exit(1)
+        visualizacao_resta_um.Visualizacao(None, argumentos.recursivo, argumentos.reproduzir).start()
+        os.sys.exit(0)
+
+    if argumentos.servir is not None:
+        import asyncio
+        import servidor_resta_um
+        servidor = servidor_resta_um.ServidorResta1(argumentos.workers, argumentos.recursivo, argumentos.banco,
+                                                    transposicao=argumentos.transposicao,
+                                                    capacidade_cache=argumentos.cache,
+                                                    capacidade_cache_mb=argumentos.cache_mb,
+                                                    politica_cache=argumentos.politica,
+                                                    podas=[PODAS[nome]() for nome in argumentos.podas],
+                                                    ordenacao=ORDENACOES[argumentos.ordenacao](),
+                                                    largura_feixe=argumentos.feixe,
+                                                    timeout=argumentos.timeout, max_nos=argumentos.max_nos)
+        try:
+            asyncio.run(servidor.servir(argumentos.servir,
+                                        lambda endereco: print(f"Atendendo em {endereco}", flush=True)))
+        except KeyboardInterrupt:
+            pass
+        os.sys.exit(0)
+
+    if argumentos.jsonl:
+        import consultas_resta_um
+        consultas_resta_um.processar_fluxo(os.sys.stdin, os.sys.stdout, argumentos.workers,
+                                           argumentos.em_voo, argumentos.recursivo,
+                                           transposicao=argumentos.transposicao,
+                                           capacidade_cache=argumentos.cache,
+                                           capacidade_cache_mb=argumentos.cache_mb,
+                                           politica_cache=argumentos.politica,
+                                           podas=[PODAS[nome]() for nome in argumentos.podas],
+                                           ordenacao=ORDENACOES[argumentos.ordenacao](),
+                                           largura_feixe=argumentos.feixe,
+                                           timeout=argumentos.timeout, max_nos=argumentos.max_nos)
+        os.sys.exit(0)
+
+    if argumentos.todas:
+        import lote_resta_um
+
+        def exibir_progresso(posicao, exigente, calculado):
+            origem = 'calculado' if calculado else 'em cache'
+            print(f"Posição {posicao}, exigente {'sim' if exigente else 'não'}: {origem}")
+
+        resultados = lote_resta_um.solucionar_todas(argumentos.recursivo, argumentos.cache_lote,
+                                                    exibir_progresso, argumentos.contar,
+                                                    transposicao=argumentos.transposicao,
+                                                    capacidade_cache=argumentos.cache,
+                                                    capacidade_cache_mb=argumentos.cache_mb,
+                                                    politica_cache=argumentos.politica,
+                                                    podas=[PODAS[nome]() for nome in argumentos.podas],
+                                                    ordenacao=ORDENACOES[argumentos.ordenacao](),
+                                                    largura_feixe=argumentos.feixe)
+        lote_resta_um.salvar_resultados(resultados, argumentos.saida)
+        solucionaveis = sum(resultado['solucionavel'] is True for resultado in resultados)
+        print(f"{solucionaveis} de {len(resultados)} jogos têm solução. Resultados em {argumentos.saida}")
+        os.sys.exit(0)
+
+    if tuple(argumentos.posicao) not in geometria.bits:
         print("Posição inicial inválida")
         os.sys.exit(1)
 
-    jogo = Tabuleiro(argumentos.posicao, argumentos.exigente)
+    classe_tabuleiro = TabuleiroBits if argumentos.bits else Tabuleiro
+    classe_tabuleiro.verificar_movimentos = argumentos.verificar_movimentos
+    jogo = classe_tabuleiro(tuple(argumentos.posicao), argumentos.exigente, geometria=geometria)
     exibir_config(argumentos, jogo)
     if argumentos.gui:
-        if no_pygame:
+        # importado só aqui para que o Pygame não escreva na saída padrão dos
+        # outros modos, como --jsonl
+        try:
+            import visualizacao_resta_um
+        except ModuleNotFoundError:
             print('--gui ignorado por falta do modulo Pygame ou do modulo de visualização')
         else:
-            vis = visualizacao_resta_um.Visualizacao(jogo, argumentos.recursivo)
+            vis = visualizacao_resta_um.Visualizacao(jogo, argumentos.recursivo, argumentos.rastro)
             vis.start()
     else:
-        solver = SolucionadorResta1(jogo)
+        opcoes = dict(transposicao=argumentos.transposicao,
+                      capacidade_cache=argumentos.cache,
+                      capacidade_cache_mb=argumentos.cache_mb,
+                      politica_cache=argumentos.politica,
+                      podas=[PODAS[nome]() for nome in argumentos.podas],
+                      ordenacao=ORDENACOES[argumentos.ordenacao](),
+                      largura_feixe=argumentos.feixe)
+        if argumentos.contar:
+            solver = SolucionadorResta1(jogo, podas=opcoes['podas'])
+            print("Por favor aguarde.")
+            total = solver.contar_solucoes()
+            print(f"Tempo de execução: {solver.tempo} segundos")
+            print(f"Soluções: {total}")
+            print(f"Soluções distintas a menos de simetria: {solver.contar_solucoes_distintas()}")
+            print(f"Estados contados: {len(solver.contagens)}")
+            os.sys.exit(0)
+
+        if argumentos.bidirecional:
+            import bidirecional_resta_um
+            if bidirecional_resta_um.enumeracao_resta_um.no_numpy:
+                print("--bidirecional precisa do módulo NumPy")
+                os.sys.exit(1)
+            solver = bidirecional_resta_um.SolucionadorBidirecional(jogo, argumentos.profundidade_reversa)
+        elif argumentos.workers:
+            import paralelo_resta_um
+            solver = paralelo_resta_um.SolucionadorParalelo(jogo, argumentos.workers,
+                                                            argumentos.profundidade_prefixo,
+                                                            argumentos.limite_nos, **opcoes)
+        else:
+            estatisticas = None
+            if argumentos.stats is not None:
+                estatisticas = EstatisticasBusca(argumentos.amostras_lentas, argumentos.profundidade_amostra)
+            if argumentos.pacotes is not None:
+                import pacotes_resta_um
+                solver = pacotes_resta_um.SolucionadorPacotes(jogo, argumentos.pacotes == 'completa',
+                                                              estatisticas=estatisticas, **opcoes)
+            else:
+                solver = SolucionadorResta1(jogo, estatisticas=estatisticas, **opcoes)
+
+        gravador = None
+        if argumentos.rastro is not None:
+            import rastro_resta_um
+            gravador = rastro_resta_um.GravadorRastro(argumentos.rastro, jogo)
+            solver.observar(gravador)
 
         print("Por favor aguarde.")
-        tem_solucao = solver.solucionar(argumentos.recursivo)
+        if argumentos.workers or argumentos.bidirecional:
+            tem_solucao = solver.solucionar()
+        else:
+            tem_solucao = solver.solucionar(argumentos.recursivo, timeout=argumentos.timeout,
+                                            max_nos=argumentos.max_nos)
+        if gravador is not None:
+            gravador.fechar(solver.situacao)
+            print(f"Rastro: {gravador.eventos} eventos em {argumentos.rastro}")
 
         print(f"Tempo de execução: {solver.tempo} segundos")
         print("Solução: ")
@@ -488,5 +3036,41 @@ if __name__ == "__main__":
             print(f"Total de movimentos válidos realizados até alcançar a solução: {solver.total_de_movimentos}")
             print("Tabuleiro final: ")
             print(jogo)
+        elif getattr(solver, 'situacao', None) == 'interrompido':
+            if argumentos.feixe:
+                print("A busca em feixe não encontrou solução, o que não prova que o jogo não tem solução.")
+            elif argumentos.pacotes is not None and solver.restrita_esgotada:
+                print("A busca restrita aos pacotes não encontrou solução, o que não prova que o jogo "
+                      "não tem solução.")
+            else:
+                print("Busca interrompida antes de encontrar uma solução.")
+            print(f"Melhor posição alcançada, com {solver.melhor_pecas} peças:")
+            for mov in jogo.movimentos:
+                print(str(mov))
+            print(jogo)
+        elif argumentos.feixe and not argumentos.bidirecional:
+            print("A busca em feixe não encontrou solução, o que não prova que o jogo não tem solução.")
         else:
             print("Este jogo não tem solução.")
+
+        if argumentos.bidirecional:
+            print(f"Estados canônicos por camada a partir do início: {solver.camadas_diretas}")
+            print(f"Estados canônicos por camada a partir do fim: {solver.camadas_reversas}")
+        elif argumentos.workers:
+            print(f"Subárvores solucionadas: {solver.subarvores} ({solver.divisoes} cessões a processos ociosos)")
+        elif solver.tabela_transposicao is not None:
+            print(f"Tabela de transposição: {solver.tabela_transposicao}")
+        if argumentos.pacotes is not None:
+            print(f"Pacotes usados: {solver.pacotes_usados} ({solver.biblioteca})")
+
+        for poda in solver.podas:
+            print(f"Poda {poda}")
+
+        if argumentos.stats is not None:
+            dados = solver.estatisticas.como_dict()
+            if argumentos.stats == '-':
+                print(json.dumps(dados, indent=2))
+            else:
+                with open(argumentos.stats, 'w', encoding='utf-8') as arquivo:
+                    json.dump(dados, arquivo, indent=2)
+                print(f"Estatísticas da busca em {argumentos.stats}")
@@ -0,0 +1,353 @@
+#encoding: utf-8
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import socket
+import sys
+
+import consultas_resta_um
+import resta_um
+
+ENDERECO_PADRAO = '127.0.0.1:8765'
+
+# campos de uma consulta que definem a resposta; consultas iguais nesses
+# campos enquanto a primeira ainda está sendo resolvida esperam por ela
+CAMPOS_CONSULTA = ('posicao', 'exigente', 'estado', 'alvo', 'timeout', 'max_nos')
+
+# maior linha aceita em uma conexão, em bytes
+LIMITE_LINHA = 1 << 24
+
+
+def ler_endereco(endereco: str):
+    """Interpreta o endereço do servidor.
+
+    Arguments:
+        endereco {str} -- 'unix:CAMINHO' para um socket Unix, 'host:porta'
+        ou só 'porta' para TCP em 127.0.0.1
+
+    Raises:
+        ValueError -- se a porta não for um número
+
+    Returns:
+        tuple -- ('unix', caminho) ou ('tcp', host, porta)
+    """
+    if endereco.startswith('unix:'):
+        return ('unix', endereco[len('unix:'):])
+    host, _, porta = endereco.rpartition(':')
+    try:
+        return ('tcp', host or '127.0.0.1', int(porta))
+    except ValueError:
+        raise ValueError(f"Endereço inválido: {endereco!r}")
+
+
+def _resolver(consulta: dict, recursivo, opcoes):
+    return consultas_resta_um.resolver_consulta(consulta, recursivo, **opcoes)
+
+
+class ServidorResta1:
+    """
+    Servidor de consultas ao solucionador que fica aberto entre as consultas.
+
+    Cada linha recebida é uma consulta JSON de consultas_resta_um, ou uma
+    lista JSON de consultas, e é respondida com uma linha com a resposta ou
+    a lista das respostas, na ordem em que as linhas chegaram. As consultas
+    são resolvidas por um conjunto de processos (ou por uma thread, sem
+    processos) que guardam entre as consultas as tabelas de transposição e
+    os bancos de soluções abertos; consultas iguais feitas enquanto a
+    primeira está em andamento recebem a mesma resposta, com o próprio id.
+
+    A linha {"comando": "estatisticas"} é respondida com os contadores do
+    servidor.
+    """
+    def __init__(self, trabalhadores=0, recursivo=True, bancos=(), **opcoes):
+        """Inicializa o servidor.
+
+        Keyword Arguments:
+            trabalhadores {int} -- número de processos; 0 resolve as consultas
+            em uma thread do próprio processo (default: {0})
+            recursivo {bool} -- usar o algoritmo recursivo (default: {True})
+            bancos {list} -- arquivos de bancos de soluções abertos em cada
+            processo (default: {()})
+            opcoes -- timeout e max_nos de consultas_resta_um.resolver_consulta
+            e argumentos de resta_um.SolucionadorResta1
+        """
+        self.trabalhadores = trabalhadores
+        self.recursivo = recursivo
+        self.bancos = list(bancos)
+        self.opcoes = opcoes
+        self._executor = None
+        self._em_voo = {}
+        self.consultas = 0
+        self.resolvidas = 0
+        self.deduplicadas = 0
+        self.conexoes = 0
+
+    def _iniciar_executor(self):
+        if self.trabalhadores:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.trabalhadores, initializer=consultas_resta_um.carregar_bancos,
+                initargs=(self.bancos,))
+        else:
+            # uma única thread, porque as tabelas do processo não são
+            # protegidas contra acesso concorrente
+            consultas_resta_um.carregar_bancos(self.bancos)
+            self._executor = concurrent.futures.ThreadPoolExecutor(1)
+
+    def fechar(self):
+        """Encerra os processos de trabalho."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def estatisticas(self):
+        """Retorna os contadores do servidor.
+
+        Returns:
+            dict -- consultas recebidas, resolvidas pelos processos,
+            deduplicadas, em andamento e conexões atendidas
+        """
+        return {'consultas': self.consultas, 'resolvidas': self.resolvidas,
+                'deduplicadas': self.deduplicadas, 'em_voo': len(self._em_voo),
+                'conexoes': self.conexoes}
+
+    async def resolver(self, consulta):
+        """Resolve uma consulta, aproveitando uma igual em andamento.
+
+        Arguments:
+            consulta {dict} -- consulta de consultas_resta_um.resolver_consulta
+
+        Returns:
+            dict -- resposta, com o id da consulta
+        """
+        if not isinstance(consulta, dict):
+            return {'id': None, 'erro': "A consulta deve ser um objeto JSON"}
+        self.consultas += 1
+        campos = {campo: consulta[campo] for campo in CAMPOS_CONSULTA if campo in consulta}
+        chave = json.dumps(campos, sort_keys=True)
+        futuro = self._em_voo.get(chave)
+        if futuro is None:
+            if self._executor is None:
+                self._iniciar_executor()
+            futuro = asyncio.get_running_loop().run_in_executor(
+                self._executor, _resolver, campos, self.recursivo, self.opcoes)
+            self._em_voo[chave] = futuro
+            futuro.add_done_callback(lambda _: self._em_voo.pop(chave, None))
+            self.resolvidas += 1
+        else:
+            self.deduplicadas += 1
+        resposta = await asyncio.shield(futuro)
+        return dict(resposta, id=consulta.get('id'))
+
+    async def _responder_linha(self, linha: bytes):
+        try:
+            mensagem = json.loads(linha)
+        except ValueError as erro:
+            return {'id': None, 'erro': f"JSON inválido: {erro}"}
+        if isinstance(mensagem, list):
+            return list(await asyncio.gather(*(self.resolver(consulta) for consulta in mensagem)))
+        if isinstance(mensagem, dict) and 'comando' in mensagem:
+            if mensagem['comando'] == 'estatisticas':
+                return self.estatisticas()
+            return {'id': mensagem.get('id'), 'erro': f"Comando desconhecido: {mensagem['comando']!r}"}
+        return await self.resolver(mensagem)
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão: as linhas são resolvidas ao mesmo tempo e as
+        respostas escritas na ordem das linhas.
+
+        Arguments:
+            leitor {asyncio.StreamReader} -- entrada da conexão
+            escritor {asyncio.StreamWriter} -- saída da conexão
+        """
+        self.conexoes += 1
+        respostas = asyncio.Queue()
+
+        async def escrever():
+            while True:
+                tarefa = await respostas.get()
+                if tarefa is None:
+                    return
+                escritor.write(json.dumps(await tarefa).encode() + b'\n')
+                await escritor.drain()
+
+        escrita = asyncio.ensure_future(escrever())
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except ValueError:
+                    # linha maior que LIMITE_LINHA
+                    break
+                if not linha:
+                    break
+                if linha.strip():
+                    await respostas.put(asyncio.ensure_future(self._responder_linha(linha)))
+            await respostas.put(None)
+            await escrita
+        except (ConnectionError, asyncio.CancelledError):
+            # conexão perdida ou servidor encerrado
+            escrita.cancel()
+        finally:
+            escritor.close()
+
+    async def servir(self, endereco=ENDERECO_PADRAO, pronto=None):
+        """Atende conexões até ser cancelado.
+
+        Arguments:
+            endereco {str} -- ver ler_endereco (default: {ENDERECO_PADRAO})
+
+        Keyword Arguments:
+            pronto {function} -- chamada com o endereço quando o servidor
+            começa a aceitar conexões (default: {None})
+        """
+        tipo, *local = ler_endereco(endereco)
+        if tipo == 'unix':
+            servidor = await asyncio.start_unix_server(self.atender, local[0], limit=LIMITE_LINHA)
+        else:
+            servidor = await asyncio.start_server(self.atender, *local, limit=LIMITE_LINHA)
+        if self._executor is None:
+            self._iniciar_executor()
+        try:
+            async with servidor:
+                if pronto is not None:
+                    pronto(endereco)
+                await servidor.serve_forever()
+        finally:
+            self.fechar()
+
+
+class ClienteResta1:
+    """
+    Cliente do ServidorResta1, com uma conexão aberta entre as consultas.
+
+        with ClienteResta1('127.0.0.1:8765') as cliente:
+            resposta = cliente.consultar({'posicao': [3, 3], 'exigente': True})
+    """
+    def __init__(self, endereco=ENDERECO_PADRAO, timeout=None):
+        """Conecta ao servidor.
+
+        Keyword Arguments:
+            endereco {str} -- ver ler_endereco (default: {ENDERECO_PADRAO})
+            timeout {float} -- segundos de espera por uma resposta, None para
+            esperar sem limite (default: {None})
+        """
+        tipo, *local = ler_endereco(endereco)
+        if tipo == 'unix':
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(local[0])
+        else:
+            self._socket = socket.create_connection(tuple(local), timeout)
+        self._arquivo = self._socket.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        self._arquivo.close()
+        self._socket.close()
+
+    def enviar(self, mensagem):
+        """Envia uma linha ao servidor e espera a resposta.
+
+        Arguments:
+            mensagem {dict, list} -- consulta, lista de consultas ou comando
+
+        Raises:
+            ConnectionError -- se o servidor fechar a conexão
+
+        Returns:
+            dict, list -- resposta do servidor
+        """
+        self._arquivo.write(json.dumps(mensagem).encode() + b'\n')
+        self._arquivo.flush()
+        linha = self._arquivo.readline()
+        if not linha:
+            raise ConnectionError("O servidor fechou a conexão")
+        return json.loads(linha)
+
+    def consultar(self, consulta: dict):
+        """Resolve uma consulta, ver consultas_resta_um.resolver_consulta."""
+        return self.enviar(consulta)
+
+    def consultar_lote(self, consultas):
+        """Resolve várias consultas em uma única linha, respondidas juntas."""
+        return self.enviar(list(consultas))
+
+    def estatisticas(self):
+        """Retorna os contadores do servidor, ver ServidorResta1.estatisticas."""
+        return self.enviar({'comando': 'estatisticas'})
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Servidor de consultas do resta 1',
+                                                formatter_class=argparse.RawTextHelpFormatter)
+    comandos = parser_argumentos.add_subparsers(dest='comando', required=True)
+
+    servidor = comandos.add_parser('serve', help='Atende consultas JSON por linha em um socket')
+    servidor.add_argument('--endereco', default=ENDERECO_PADRAO,
+                          help="host:porta, porta ou unix:CAMINHO (padrão: %(default)s)")
+    servidor.add_argument('--workers', type=int, default=0,
+                          help='Processos que resolvem as consultas (padrão: uma thread)')
+    servidor.add_argument('--recursivo', '-r', action='store_true', help='Usar o algoritmo recursivo')
+    servidor.add_argument('--banco', nargs='+', default=[],
+                          help='Bancos de soluções consultados antes da busca')
+    servidor.add_argument('--timeout', type=float, default=None, help='Segundos de busca por consulta')
+    servidor.add_argument('--max-nos', type=int, default=None, help='Nós de busca por consulta')
+    servidor.add_argument('--podas', nargs='*', default=[], choices=list(resta_um.PODAS),
+                          help='Regras de poda')
+    servidor.add_argument('--ordenacao', default='fixa', choices=list(resta_um.ORDENACOES),
+                          help='Ordem em que os saltos são tentados')
+
+    cliente = comandos.add_parser('consultar', help='Envia consultas JSONL da entrada padrão, ou uma '
+                                                    'posição inicial, e escreve as respostas')
+    cliente.add_argument('--endereco', default=ENDERECO_PADRAO,
+                         help="host:porta, porta ou unix:CAMINHO (padrão: %(default)s)")
+    cliente.add_argument('--posicao', '-p', nargs=2, type=int, default=None,
+                         help='Consultar só esta posição inicial')
+    cliente.add_argument('--exigente', '-e', action='store_true',
+                         help='Exigir a peça final na posição inicial, com --posicao')
+    cliente.add_argument('--lote', type=int, default=1,
+                         help='Consultas da entrada padrão enviadas por linha')
+    cliente.add_argument('--estatisticas', action='store_true', help='Mostrar os contadores do servidor')
+    return parser_argumentos
+
+
+if __name__ == "__main__":
+    argumentos = setup_parser_argumentos().parse_args()
+
+    if argumentos.comando == 'serve':
+        servidor = ServidorResta1(argumentos.workers, argumentos.recursivo, argumentos.banco,
+                                  timeout=argumentos.timeout, max_nos=argumentos.max_nos,
+                                  podas=[resta_um.PODAS[nome]() for nome in argumentos.podas],
+                                  ordenacao=resta_um.ORDENACOES[argumentos.ordenacao]())
+        try:
+            asyncio.run(servidor.servir(argumentos.endereco,
+                                        lambda endereco: print(f"Atendendo em {endereco}", flush=True)))
+        except KeyboardInterrupt:
+            pass
+    else:
+        with ClienteResta1(argumentos.endereco) as cliente:
+            if argumentos.posicao is not None:
+                print(json.dumps(cliente.consultar({'posicao': argumentos.posicao,
+                                                    'exigente': argumentos.exigente})))
+            elif not argumentos.estatisticas:
+                lote = []
+                for linha in sys.stdin:
+                    if linha.strip():
+                        lote.append(json.loads(linha))
+                    if len(lote) == argumentos.lote:
+                        for resposta in cliente.consultar_lote(lote):
+                            print(json.dumps(resposta), flush=True)
+                        lote = []
+                if lote:
+                    for resposta in cliente.consultar_lote(lote):
+                        print(json.dumps(resposta), flush=True)
+            if argumentos.estatisticas:
+                print(json.dumps(cliente.estatisticas()))
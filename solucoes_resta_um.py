@@ -0,0 +1,475 @@
+#encoding: utf-8
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import resta_um
+
+# Cabeçalho do arquivo: identificação, versão do formato, saltos por solução,
+# número de saltos da tabela SALTOS, se as soluções estão na forma canônica e
+# o tabuleiro compactado de onde todas partem (0 quando cada solução começa
+# com o tabuleiro cheio menos o destino do seu primeiro salto)
+CABECALHO = struct.Struct('<4sBBBBQ')
+IDENTIFICACAO = b'R1SL'
+VERSAO_FORMATO = 1
+
+# Cada solução ocupa um byte por salto, o Salto.indice do salto em SALTOS:
+# 31 bytes para uma solução que parte do tabuleiro inglês com um buraco
+COMPRIMENTO_PADRAO = len(resta_um.COORDS_VALIDAS) - 2
+
+# Soluções lidas ou gravadas no arquivo de uma vez
+BLOCO_PADRAO = 4096
+
+# Índices de SALTOS de cada simetria, como tabela de bytes.translate; os bytes
+# sem salto correspondente ficam inalterados, para continuarem inválidos
+_TRADUCOES = tuple(bytes(simetria.saltos) + bytes(range(len(resta_um.SALTOS), 256))
+                   for simetria in resta_um.SIMETRIAS)
+
+# Tabelas da verificação em massa, completadas até 256 com um salto impossível
+_MASCARAS = tuple(salto.mascara for salto in resta_um.SALTOS) + (0,) * (256 - len(resta_um.SALTOS))
+_ORIGENS = tuple(salto.origem_saltada for salto in resta_um.SALTOS) + (-1,) * (256 - len(resta_um.SALTOS))
+_DESTINOS = tuple(salto.bit_destino for salto in resta_um.SALTOS) + (0,) * (256 - len(resta_um.SALTOS))
+
+
+def comprimento_solucao(inicial=0):
+    """Retorna o número de saltos de uma solução que parte de um tabuleiro.
+
+    Keyword Arguments:
+        inicial {int} -- tabuleiro compactado de onde a solução parte, 0 para
+        o tabuleiro cheio com um buraco (default: {0})
+
+    Returns:
+        int -- saltos até restar uma peça
+    """
+    return bin(inicial).count('1') - 1 if inicial else COMPRIMENTO_PADRAO
+
+
+def codificar(saltos):
+    """Codifica uma solução com um byte por salto.
+
+    Arguments:
+        saltos {list} -- índices de SALTOS (como em lote_resta_um), instâncias
+        de Salto ou de Movimento (como em Tabuleiro.movimentos)
+
+    Returns:
+        bytes -- índices dos saltos em SALTOS
+
+    Raises:
+        ValueError -- se um índice não estiver em SALTOS
+    """
+    indices = []
+    for salto in saltos:
+        if isinstance(salto, resta_um.Movimento):
+            salto = resta_um.SALTO_POR_MOVIMENTO[(tuple(salto.posicao), salto.direcao)]
+        indice = salto if isinstance(salto, int) else salto.indice
+        if not 0 <= indice < len(resta_um.SALTOS):
+            raise ValueError(f"Salto inválido: {indice}")
+        indices.append(indice)
+    return bytes(indices)
+
+
+def decodificar(codigo: bytes):
+    """Retorna os movimentos de uma solução codificada.
+
+    Arguments:
+        codigo {bytes} -- solução codificada por codificar
+
+    Returns:
+        list -- instâncias de Movimento, na ordem da solução
+    """
+    return [resta_um.SALTOS[indice].movimento for indice in codigo]
+
+
+def estado_inicial(codigo: bytes, inicial=0):
+    """Retorna o tabuleiro de onde parte uma solução codificada.
+
+    Arguments:
+        codigo {bytes} -- solução codificada por codificar
+
+    Keyword Arguments:
+        inicial {int} -- tabuleiro compactado de onde a solução parte, 0 para
+        o tabuleiro cheio menos o destino do primeiro salto (default: {0})
+
+    Returns:
+        int -- tabuleiro compactado (ver TabuleiroBits)
+    """
+    return inicial or resta_um.TABULEIRO_CHEIO ^ _DESTINOS[codigo[0]]
+
+
+def traducoes(inicial=0):
+    """Retorna as tabelas de tradução das simetrias aplicáveis às soluções.
+
+    Sem tabuleiro inicial fixo, todas as simetrias levam uma solução a outra
+    solução, que parte do buraco inicial transformado; com tabuleiro inicial
+    fixo, só as simetrias que o preservam.
+
+    Keyword Arguments:
+        inicial {int} -- tabuleiro compactado de onde as soluções partem, 0
+        para o tabuleiro cheio com um buraco (default: {0})
+
+    Returns:
+        tuple -- tabelas de bytes.translate, a primeira é a identidade
+    """
+    if not inicial:
+        return _TRADUCOES
+    return tuple(traducao for simetria, traducao in zip(resta_um.SIMETRIAS, _TRADUCOES)
+                 if simetria.aplicar(inicial) == inicial)
+
+
+def canonizar(codigo: bytes, inicial=0):
+    """Retorna a forma canônica de uma solução codificada.
+
+    A forma canônica é a menor das imagens da solução pelas simetrias, de
+    modo que soluções simétricas têm a mesma codificação canônica.
+
+    Arguments:
+        codigo {bytes} -- solução codificada por codificar
+
+    Keyword Arguments:
+        inicial {int} -- tabuleiro compactado de onde a solução parte, 0 para
+        o tabuleiro cheio com um buraco (default: {0})
+
+    Returns:
+        bytes -- solução canônica, com o mesmo comprimento
+    """
+    return min(codigo.translate(traducao) for traducao in traducoes(inicial))
+
+
+class GravadorSolucoes:
+    """
+    Grava soluções codificadas em um arquivo, uma após a outra.
+
+    As soluções são acumuladas e gravadas em blocos, de modo que arquivos
+    com milhões de soluções são gravados sem guardá-las na memória:
+
+        with GravadorSolucoes('solucoes.r1s') as gravador:
+            for solucao in solucoes:
+                gravador.gravar(solucao)
+    """
+    def __init__(self, arquivo: str, inicial=0, canonicas=True, acrescentar=False, bloco=BLOCO_PADRAO):
+        """Cria o arquivo de soluções, ou o abre para acrescentar soluções.
+
+        Arguments:
+            arquivo {str} -- caminho do arquivo de soluções
+
+        Keyword Arguments:
+            inicial {int} -- tabuleiro compactado de onde todas as soluções
+            partem, 0 para soluções que partem do tabuleiro cheio com um
+            buraco (default: {0})
+            canonicas {bool} -- gravar as soluções na forma canônica (default: {True})
+            acrescentar {bool} -- acrescentar a um arquivo existente, que deve
+            ter o mesmo cabeçalho (default: {False})
+            bloco {int} -- soluções acumuladas antes de cada gravação (default: {BLOCO_PADRAO})
+
+        Raises:
+            ValueError -- se o arquivo existente tiver outro cabeçalho, ou se
+            os índices de SALTOS não couberem em um byte
+        """
+        if len(resta_um.SALTOS) > 0xFF:
+            raise ValueError("Os índices de SALTOS não cabem em um byte")
+        self.inicial = inicial
+        self.comprimento = comprimento_solucao(inicial)
+        self.canonicas = canonicas
+        self.solucoes = 0
+        self._limite = bloco * self.comprimento
+        self._traducoes = traducoes(inicial) if canonicas else None
+        self._bloco = bytearray()
+        cabecalho = CABECALHO.pack(IDENTIFICACAO, VERSAO_FORMATO, self.comprimento,
+                                   len(resta_um.SALTOS), canonicas, inicial)
+        if acrescentar and os.path.exists(arquivo):
+            with LeitorSolucoes(arquivo) as leitor:
+                if (leitor.inicial, leitor.canonicas) != (inicial, canonicas):
+                    raise ValueError(f"O arquivo {arquivo} tem outro estado inicial ou outra forma das soluções")
+                self.solucoes = len(leitor)
+            self._arquivo = open(arquivo, 'ab')
+        else:
+            self._arquivo = open(arquivo, 'wb')
+            self._arquivo.write(cabecalho)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def gravar(self, solucao):
+        """Acrescenta uma solução ao arquivo.
+
+        A solução não é verificada; use verificar_arquivo no arquivo gravado.
+
+        Arguments:
+            solucao {bytes} -- solução codificada, ou saltos aceitos por codificar
+
+        Returns:
+            bytes -- solução como foi gravada
+
+        Raises:
+            ValueError -- se a solução não tiver o número de saltos do arquivo
+        """
+        codigo = solucao if isinstance(solucao, bytes) else codificar(solucao)
+        if len(codigo) != self.comprimento:
+            raise ValueError(f"Solução com {len(codigo)} saltos, o arquivo guarda soluções com {self.comprimento}")
+        if self._traducoes:
+            codigo = min(codigo.translate(traducao) for traducao in self._traducoes)
+        self._bloco += codigo
+        self.solucoes += 1
+        if len(self._bloco) >= self._limite:
+            self._descarregar()
+        return codigo
+
+    def _descarregar(self):
+        self._arquivo.write(self._bloco)
+        self._arquivo.flush()
+        self._bloco.clear()
+
+    def fechar(self):
+        """Grava as soluções pendentes e fecha o arquivo."""
+        if self._arquivo.closed:
+            return
+        self._descarregar()
+        self._arquivo.close()
+
+
+class LeitorSolucoes:
+    """
+    Lê as soluções de um arquivo gravado por GravadorSolucoes, um bloco por
+    vez, sem carregar o arquivo inteiro na memória.
+    """
+    def __init__(self, arquivo: str, bloco=BLOCO_PADRAO):
+        """Abre o arquivo de soluções.
+
+        Arguments:
+            arquivo {str} -- caminho do arquivo de soluções
+
+        Keyword Arguments:
+            bloco {int} -- soluções lidas de cada vez (default: {BLOCO_PADRAO})
+
+        Raises:
+            ValueError -- se o arquivo não for um arquivo de soluções válido
+            para a tabela SALTOS
+        """
+        self.arquivo = arquivo
+        self.bloco = bloco
+        self._arquivo = open(arquivo, 'rb')
+        cabecalho = self._arquivo.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            self._arquivo.close()
+            raise ValueError(f"Arquivo de soluções inválido: {arquivo}")
+        identificacao, versao, self.comprimento, saltos, canonicas, self.inicial = CABECALHO.unpack(cabecalho)
+        self.canonicas = bool(canonicas)
+        tamanho = os.fstat(self._arquivo.fileno()).st_size - CABECALHO.size
+        if identificacao != IDENTIFICACAO or versao != VERSAO_FORMATO or saltos != len(resta_um.SALTOS) \
+                or self.comprimento != comprimento_solucao(self.inicial) or tamanho % self.comprimento:
+            self._arquivo.close()
+            raise ValueError(f"Arquivo de soluções inválido: {arquivo}")
+        self._solucoes = tamanho // self.comprimento
+
+    def __repr__(self):
+        return f"LeitorSolucoes({self.arquivo!r}, {self._solucoes} soluções)"
+
+    def __len__(self):
+        return self._solucoes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Fecha o arquivo."""
+        self._arquivo.close()
+
+    def blocos(self):
+        """Percorre o arquivo em blocos de soluções inteiras.
+
+        Returns:
+            iterator -- bytes com até bloco soluções concatenadas
+        """
+        self._arquivo.seek(CABECALHO.size)
+        restantes = self._solucoes * self.comprimento
+        while restantes:
+            dados = self._arquivo.read(min(restantes, self.bloco * self.comprimento))
+            if not dados:
+                raise ValueError(f"Arquivo de soluções truncado: {self.arquivo}")
+            restantes -= len(dados)
+            yield dados
+
+    def __iter__(self):
+        """Percorre as soluções do arquivo.
+
+        Returns:
+            iterator -- bytes de cada solução codificada
+        """
+        comprimento = self.comprimento
+        for dados in self.blocos():
+            for inicio in range(0, len(dados), comprimento):
+                yield dados[inicio:inicio + comprimento]
+
+
+def verificar_solucoes(dados: bytes, comprimento=COMPRIMENTO_PADRAO, inicial=0, exigente=False, canonicas=False):
+    """Refaz soluções codificadas em um tabuleiro compactado e retorna as inválidas.
+
+    Cada salto é conferido e aplicado com as máscaras da tabela SALTOS, sem
+    construir um Tabuleiro. Depois de comprimento saltos válidos resta uma
+    peça.
+
+    Arguments:
+        dados {bytes} -- soluções codificadas, concatenadas
+
+    Keyword Arguments:
+        comprimento {int} -- saltos por solução (default: {COMPRIMENTO_PADRAO})
+        inicial {int} -- tabuleiro compactado de onde todas as soluções
+        partem, 0 para o tabuleiro cheio menos o destino do primeiro salto
+        (default: {0})
+        exigente {bool} -- exigir que a última peça termine no buraco
+        inicial; só vale sem tabuleiro inicial fixo (default: {False})
+        canonicas {bool} -- exigir que as soluções estejam na forma canônica
+        (default: {False})
+
+    Returns:
+        list -- posições em dados, contadas em soluções, das soluções inválidas
+
+    Raises:
+        ValueError -- se exigente for usado com um tabuleiro inicial fixo
+    """
+    if exigente and inicial:
+        raise ValueError("A exigência da última peça no buraco inicial não vale com um tabuleiro inicial fixo")
+    mascaras, origens, destinos = _MASCARAS, _ORIGENS, _DESTINOS
+    cheio = resta_um.TABULEIRO_CHEIO
+    tabelas = traducoes(inicial) if canonicas else ()
+    invalidas = []
+    for numero, inicio in enumerate(range(0, len(dados), comprimento)):
+        codigo = dados[inicio:inicio + comprimento]
+        buraco = destinos[codigo[0]]
+        bits = inicial or cheio ^ buraco
+        for indice in codigo:
+            mascara = mascaras[indice]
+            if bits & mascara != origens[indice]:
+                invalidas.append(numero)
+                break
+            bits ^= mascara
+        else:
+            if (exigente and bits != buraco) or (tabelas and codigo != min(codigo.translate(traducao)
+                                                                           for traducao in tabelas)):
+                invalidas.append(numero)
+    return invalidas
+
+
+def verificar_arquivo(arquivo: str, exigente=False, progresso=None):
+    """Verifica todas as soluções de um arquivo gravado por GravadorSolucoes.
+
+    Arguments:
+        arquivo {str} -- caminho do arquivo de soluções
+
+    Keyword Arguments:
+        exigente {bool} -- exigir que a última peça termine no buraco inicial
+        (default: {False})
+        progresso {function} -- chamada com o número de soluções verificadas
+        a cada bloco (default: {None})
+
+    Returns:
+        tuple -- (número de soluções, índices das soluções inválidas)
+    """
+    with LeitorSolucoes(arquivo) as leitor:
+        invalidas = []
+        verificadas = 0
+        for dados in leitor.blocos():
+            invalidas.extend(verificadas + numero for numero in
+                             verificar_solucoes(dados, leitor.comprimento, leitor.inicial,
+                                                exigente, leitor.canonicas))
+            verificadas += len(dados) // leitor.comprimento
+            if progresso:
+                progresso(verificadas)
+        return verificadas, invalidas
+
+
+def importar_resultados(caminho_resultados: str, arquivo: str, distintas=False):
+    """Grava as soluções de um arquivo de resultados de lote_resta_um.
+
+    Arguments:
+        caminho_resultados {str} -- arquivo JSON gravado por lote_resta_um.salvar_resultados
+        arquivo {str} -- arquivo de soluções a ser gravado
+
+    Keyword Arguments:
+        distintas {bool} -- gravar uma só vez as soluções com a mesma forma
+        canônica (default: {False})
+
+    Returns:
+        int -- número de soluções gravadas
+    """
+    with open(caminho_resultados, encoding='utf-8') as entrada:
+        resultados = json.load(entrada)['resultados']
+    vistas = set()
+    with GravadorSolucoes(arquivo) as gravador:
+        for resultado in resultados:
+            if not resultado['solucionavel']:
+                continue
+            codigo = codificar(resta_um.SALTO_POR_MOVIMENTO[((linha, coluna), direcao)]
+                               for linha, coluna, direcao in resultado['movimentos'])
+            codigo = canonizar(codigo)
+            if distintas:
+                if codigo in vistas:
+                    continue
+                vistas.add(codigo)
+            gravador.gravar(codigo)
+        return gravador.solucoes
+
+
+def setup_parser_argumentos():
+    """Configura o parser de argumentos."""
+    parser_argumentos = argparse.ArgumentParser(description='Arquivos de soluções codificadas do resta 1')
+    comandos = parser_argumentos.add_subparsers(dest='comando', required=True)
+
+    verificar = comandos.add_parser('verificar', help='Refaz e confere todas as soluções de um arquivo')
+    verificar.add_argument('arquivo', help='Arquivo de soluções')
+    verificar.add_argument('--exigente', '-e', action='store_true',
+                           help='Exige que a última peça termine na posição do buraco inicial')
+
+    exibir = comandos.add_parser('exibir', help='Exibe os movimentos das soluções de um arquivo')
+    exibir.add_argument('arquivo', help='Arquivo de soluções')
+    exibir.add_argument('--quantidade', '-n', type=int, default=10,
+                        help='Número de soluções exibidas (0 exibe todas)')
+
+    importar = comandos.add_parser('importar', help='Grava as soluções de um arquivo de resultados de lote_resta_um')
+    importar.add_argument('resultados', help='Arquivo JSON gravado com resta_um.py --todas --saida')
+    importar.add_argument('arquivo', help='Arquivo de soluções')
+    importar.add_argument('--distintas', '-d', action='store_true',
+                          help='Grava uma só vez as soluções simétricas')
+
+    return parser_argumentos
+
+
+if __name__ == "__main__":
+    argumentos = setup_parser_argumentos().parse_args()
+
+    try:
+        if argumentos.comando == 'verificar':
+            tempo_inicio = time.time()
+            total, invalidas = verificar_arquivo(argumentos.arquivo, argumentos.exigente)
+            tempo = time.time() - tempo_inicio
+            for numero in invalidas[:20]:
+                print(f"Solução {numero} inválida")
+            print(f"{total} soluções verificadas, {len(invalidas)} inválidas "
+                  f"({tempo:.2f} segundos, {total / max(tempo, 1e-9):.0f} soluções/s)")
+            if invalidas:
+                sys.exit(1)
+        elif argumentos.comando == 'exibir':
+            with LeitorSolucoes(argumentos.arquivo) as leitor:
+                print(leitor)
+                for numero, codigo in enumerate(leitor):
+                    if argumentos.quantidade and numero == argumentos.quantidade:
+                        break
+                    movimentos = ', '.join(str(movimento) for movimento in decodificar(codigo))
+                    print(f"{numero}: {movimentos}")
+        else:
+            total = importar_resultados(argumentos.resultados, argumentos.arquivo, argumentos.distintas)
+            print(f"{total} soluções gravadas em {argumentos.arquivo} "
+                  f"({os.path.getsize(argumentos.arquivo)} bytes)")
+    except ValueError as erro:
+        print(erro)
+        sys.exit(1)
@@ -1,9 +1,12 @@
 from threading import Thread
+import os
 import sys
+import tempfile
 import tkinter as tk
 import time
 import pygame
 import resta_um
+import rastro_resta_um
 
 BRANCO = (255,255,255)
 PRETO = (0,0,0)
@@ -13,13 +16,56 @@ TAMANHO_CELULA = 70
 LARGURA = 7*TAMANHO_CELULA
 ALTURA = 7*TAMANHO_CELULA
 
+# intervalo entre quadros; quadros atrasados são descartados
+INTERVALO_QUADRO_MS = 33
+
+# limites da velocidade de reprodução, em eventos por segundo
+VELOCIDADE_MINIMA = 0.25
+VELOCIDADE_MAXIMA = 1_000_000
+
+AJUDA = ('Esquerda/direita: velocidade  Espaço: pausa  ,/.: passo\n'
+         'PgUp/PgDn: recuar/avançar 10%  Home/End: início/fim  S: solução')
+
 class Visualizacao:
+    """
+    Reproduz o rastro de uma busca (ver rastro_resta_um).
+
+    A busca grava o rastro em disco na velocidade máxima e a visualização o
+    reproduz na velocidade escolhida, podendo voltar, avançar e ir direto
+    para a solução; um rastro gravado antes também pode ser reproduzido.
+    """
+
+    def __init__(self, jogo, recursivo, arquivo_rastro=None):
+        """Inicializa a visualização.
+
+        Arguments:
+            jogo {Tabuleiro} -- jogo a solucionar, None para só reproduzir o rastro
+            recursivo {bool} -- usar o algoritmo recursivo
 
-    def __init__(self, jogo, recursivo):
+        Keyword Arguments:
+            arquivo_rastro {str} -- arquivo onde o rastro é gravado, ou de onde
+            é lido quando jogo é None; None grava em um arquivo temporário
+            removido ao sair (default: {None})
+        """
         self.jogo = jogo
         self.recursivo = recursivo
-        self.caminho = ''
-        self.delay = 1.0
+        self.arquivo_rastro = arquivo_rastro
+        self.temporario = None
+        self.leitor = None
+        # eventos reproduzidos por segundo, posição no rastro e caminho nela
+        self.velocidade = 1.0
+        self.pausado = False
+        self.posicao = 0
+        self.caminho = []
+        self._acumulado = 0.0
+        self._instante = time.perf_counter()
+        # o que está na tela, para redesenhar só o que mudou: tabuleiro
+        # compactado, saltos listados na caixa de texto e texto do status
+        self._bits_exibidos = None
+        self._caminho_exibido = []
+        self._status_exibido = None
+        # duração do último quadro, em segundos
+        self.custo_quadro = 0.0
 
         # Pygame setup
         pygame.init()
@@ -38,40 +84,149 @@ class Visualizacao:
         self.text_box_caminho.pack()
 
         self.status_var = tk.StringVar()
-        self.statusbar = tk.Label(self.root, textvariable=self.status_var)
+        self.statusbar = tk.Label(self.root, textvariable=self.status_var, justify=tk.LEFT)
         self.statusbar.config(font=('Arial', 12, 'bold'))
         self.statusbar.pack(side=tk.LEFT)
 
         self.root.geometry('+670+30')
-    
+
     def start(self):
-        self.ler_tabuleiro(self.jogo.tabuleiro)
-        solver = resta_um.SolucionadorResta1(self.jogo, callback_visualizacao=self.callback_exibir)
-        solverThread = Thread(target=solver.solucionar, kwargs={'recursivo': self.recursivo}, name="Solucionador", daemon=True)
-        solverThread.start()
-        self.root.after(100, self.atualizar_tk_e_pygame)
+        if self.jogo is not None:
+            if self.arquivo_rastro is None:
+                descritor, self.temporario = tempfile.mkstemp(suffix='.rastro')
+                os.close(descritor)
+                self.arquivo_rastro = self.temporario
+            solver = resta_um.SolucionadorResta1(self.jogo)
+            gravador = rastro_resta_um.GravadorRastro(self.arquivo_rastro, self.jogo)
+            solver.observar(gravador)
+            solverThread = Thread(target=self.solucionar, args=(solver, gravador),
+                                  name="Solucionador", daemon=True)
+            solverThread.start()
+        self.leitor = rastro_resta_um.LeitorRastro(self.arquivo_rastro)
+        self.ler_tabuleiro(self.leitor.inicial)
+        pygame.display.update()
+        self.root.after(INTERVALO_QUADRO_MS, self.atualizar_tk_e_pygame)
         self.root.mainloop()
 
+    def solucionar(self, solver, gravador):
+        situacao = None
+        try:
+            solver.solucionar(recursivo=self.recursivo)
+            situacao = solver.situacao
+        finally:
+            gravador.fechar(situacao)
+
+    def sair(self):
+        pygame.quit()
+        self.root.quit()
+        self.leitor.fechar()
+        if self.temporario is not None:
+            try:
+                os.remove(self.temporario)
+            except OSError:
+                pass
+        sys.exit()
+
+    def ir_para(self, posicao):
+        """Posiciona a reprodução depois dos primeiros eventos do rastro.
+
+        Arguments:
+            posicao {int} -- número de eventos, limitado ao tamanho do rastro
+        """
+        self.posicao = max(0, min(posicao, len(self.leitor)))
+        self.caminho = self.leitor.caminho(self.posicao)
+        self._acumulado = 0.0
+
+    def avancar(self, eventos):
+        """Reproduz os próximos eventos do rastro, um a um quando são poucos.
+
+        Arguments:
+            eventos {int} -- número de eventos a reproduzir
+        """
+        fim = min(self.posicao + eventos, len(self.leitor))
+        if fim - self.posicao > self.leitor.intervalo:
+            self.ir_para(fim)
+            return
+        caminho = self.caminho
+        for evento in self.leitor.eventos_entre(self.posicao, fim):
+            if evento == rastro_resta_um.DESFAZER:
+                caminho.pop()
+            else:
+                caminho.append(evento)
+        self.posicao = fim
+
     def atualizar_tk_e_pygame(self):
-        self.status_var.set(f"Delay: {self.delay}")
-        texto = self.caminho
-        self.text_box_caminho.delete('1.0', tk.END)
-        self.text_box_caminho.insert(tk.END, texto)
-        self.root.after(100, self.atualizar_tk_e_pygame)
+        leitor = self.leitor
+        leitor.atualizar()
+        agora = time.perf_counter()
+        if not self.pausado:
+            self._acumulado += (agora - self._instante) * self.velocidade
+            passos = int(self._acumulado)
+            self._acumulado -= passos
+            self.avancar(passos)
+        self._instante = agora
+
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
-                pygame.quit()
-                self.root.quit()
-                sys.exit()
+                self.sair()
             elif evento.type == pygame.KEYDOWN:
                 if evento.key == pygame.K_LEFT:
-                    if round(self.delay - 0.1, 1) > 0:
-                        self.delay = round(self.delay - 0.1, 1)
-                if evento.key == pygame.K_RIGHT:
-                    if round(self.delay + 0.1, 1) <= 5:
-                        self.delay = round(self.delay + 0.1, 1)
+                    self.velocidade = max(VELOCIDADE_MINIMA, self.velocidade / 2)
+                elif evento.key == pygame.K_RIGHT:
+                    self.velocidade = min(VELOCIDADE_MAXIMA, self.velocidade * 2)
+                elif evento.key == pygame.K_SPACE:
+                    self.pausado = not self.pausado
+                elif evento.key == pygame.K_PERIOD:
+                    self.avancar(1)
+                elif evento.key == pygame.K_COMMA:
+                    self.ir_para(self.posicao - 1)
+                elif evento.key == pygame.K_PAGEUP:
+                    self.ir_para(self.posicao - max(1, len(leitor) // 10))
+                elif evento.key == pygame.K_PAGEDOWN:
+                    self.ir_para(self.posicao + max(1, len(leitor) // 10))
+                elif evento.key == pygame.K_HOME:
+                    self.ir_para(0)
+                elif evento.key == pygame.K_END:
+                    self.ir_para(len(leitor))
+                elif evento.key == pygame.K_s and leitor.solucao() is not None:
+                    self.ir_para(leitor.solucao())
 
-        pygame.display.update()
+        # só o estado final do quadro é desenhado: os eventos reproduzidos
+        # entre dois quadros não aparecem
+        situacao = leitor.situacao or 'buscando'
+        pausa = ' (pausado)' if self.pausado else ''
+        status = (f"Velocidade: {self.velocidade:g} eventos/s{pausa}\n"
+                  f"Evento {self.posicao} de {len(leitor)}, busca: {situacao}\n"
+                  f"Quadro: {self.custo_quadro * 1000:.2f} ms\n{AJUDA}")
+        if status != self._status_exibido:
+            self.status_var.set(status)
+            self._status_exibido = status
+        self.atualizar_caminho()
+        retangulos = self.ler_tabuleiro(rastro_resta_um.compactar_caminho(leitor.inicial, self.caminho))
+        if retangulos:
+            pygame.display.update(retangulos)
+
+        # um quadro que passou do intervalo adia o próximo em vez de acumular atraso
+        self.custo_quadro = time.perf_counter() - agora
+        espera = INTERVALO_QUADRO_MS - int(self.custo_quadro * 1000)
+        self.root.after(max(1, espera), self.atualizar_tk_e_pygame)
+
+    def atualizar_caminho(self):
+        """Atualiza na caixa de texto só as linhas do caminho que mudaram."""
+        caminho, exibido = self.caminho, self._caminho_exibido
+        comum = 0
+        limite = min(len(caminho), len(exibido))
+        while comum < limite and caminho[comum] == exibido[comum]:
+            comum += 1
+        if comum == len(caminho) == len(exibido):
+            return
+        if comum < len(exibido):
+            self.text_box_caminho.delete(f'{comum + 1}.0', tk.END)
+        novas = ''.join(f'{i+1:02}. {resta_um.SALTOS[indice].movimento}\n'
+                        for i, indice in enumerate(caminho[comum:], comum))
+        if novas:
+            self.text_box_caminho.insert(tk.END, novas)
+        self._caminho_exibido = list(caminho)
 
     def desenhar_celulas(self):
         for i in range(7):
@@ -87,24 +242,35 @@ class Visualizacao:
             pygame.draw.line(self.surface, PRETO, (0, pos), (LARGURA, pos), 2)
             pygame.draw.line(self.surface, PRETO, (pos, 0), (pos, ALTURA), 2)
 
-    def ler_tabuleiro(self, tabuleiro):
-        for linha in range(7):
-            for coluna in range(7):
-                x = coluna*TAMANHO_CELULA+TAMANHO_CELULA//2
-                y = linha*TAMANHO_CELULA+TAMANHO_CELULA//2
-                if tabuleiro[linha][coluna] == 1:
-                    pygame.draw.circle(self.surface, PRETO, (x,y), 12)
-                elif tabuleiro[linha][coluna] == 0:
-                    pygame.draw.circle(self.surface, BRANCO, (x,y), 12)
-    
-    def callback_exibir(self, solver):
-        time.sleep(self.delay)
-        self.ler_tabuleiro(solver.jogo.tabuleiro)
-        self.caminho = f'Total de movimentos: {solver.total_de_movimentos}\n'
-        for i, mov in enumerate(solver.jogo.movimentos):
-            self.caminho += f'{i+1:02}. {mov}\n'
-
-if __name__ == "__main__":    
-    # Inicialização do Pygame
-    visualizacao = Visualizacao(resta_um.Tabuleiro(), False)
+    def ler_tabuleiro(self, bits):
+        """Desenha as posições que mudaram desde o último desenho.
+
+        Arguments:
+            bits {int} -- tabuleiro compactado
+
+        Returns:
+            list -- retângulos alterados, para pygame.display.update
+        """
+        alterados = ~0 if self._bits_exibidos is None else bits ^ self._bits_exibidos
+        self._bits_exibidos = bits
+        retangulos = []
+        if not alterados:
+            return retangulos
+        for (linha, coluna), bit in resta_um.BITS.items():
+            if not alterados & bit:
+                continue
+            x = coluna*TAMANHO_CELULA+TAMANHO_CELULA//2
+            y = linha*TAMANHO_CELULA+TAMANHO_CELULA//2
+            if bits & bit:
+                retangulos.append(pygame.draw.circle(self.surface, PRETO, (x,y), 12))
+            else:
+                retangulos.append(pygame.draw.circle(self.surface, BRANCO, (x,y), 12))
+        return retangulos
+
+if __name__ == "__main__":
+    # sem argumentos soluciona o jogo padrão; com um arquivo reproduz o rastro gravado nele
+    if len(sys.argv) > 1:
+        visualizacao = Visualizacao(None, False, sys.argv[1])
+    else:
+        visualizacao = Visualizacao(resta_um.Tabuleiro(), False)
     visualizacao.start()